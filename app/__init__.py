@@ -3,19 +3,42 @@ import logging
 from .config import Config
 from .models import db
 from .routes import register_routes
-from .database import init_database
+from .database import (
+    init_database, check_prepared_dataset, configure_engine, refresh_in_memory_indexes,
+    register_dataset_watch
+)
+from .commands import register_commands
+from .cache import register_cache
+from .snapshot import configure_snapshot
+from .encoding import configure_json
+from .metrics import register_metrics
+from .compression import register_compression
 
-def create_app():
+def create_app(config_class=Config):
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(config_class)
+    configure_snapshot(app)
+    configure_json(app)
 
     db.init_app(app)
 
     logging.basicConfig(level=logging.INFO)
 
+    register_metrics(app)
+    register_dataset_watch(app)
+    # After-request hooks run in reverse: the cache stores the plain body,
+    # compression encodes it, and metrics see the bytes actually sent
+    register_compression(app)
+    register_cache(app)
     register_routes(app)
+    register_commands(app)
 
     with app.app_context():
-        init_database(app)
+        configure_engine(app)
+        if app.config['LOAD_DATA_ON_STARTUP']:
+            init_database(app)
+        else:
+            check_prepared_dataset()
+            refresh_in_memory_indexes()
 
     return app
@@ -0,0 +1,214 @@
+import asyncio
+import io
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.http import parse_etags
+from . import create_app
+from .cache import make_etag, matching_etag, response_cache
+from .config import Config
+from .database import check_dataset_version
+from .ifsc_index import get_ifsc_index
+from .metrics import metrics
+from .version import get_dataset_version
+
+logger = logging.getLogger(__name__)
+
+IFSC_PATH_PREFIX = '/api/branches/'
+
+
+def read_header(scope, name):
+    for key, value in scope.get('headers', []):
+        if key == name:
+            return value.decode('latin1')
+    return None
+
+
+def build_environ(scope, body):
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf8').decode('latin1'),
+        'PATH_INFO': scope['path'].encode('utf8').decode('latin1'),
+        'QUERY_STRING': scope['query_string'].decode('latin1'),
+        'SERVER_PROTOCOL': f"HTTP/{scope['http_version']}",
+        'SERVER_NAME': scope['server'][0] if scope.get('server') else 'localhost',
+        'SERVER_PORT': str(scope['server'][1]) if scope.get('server') else '80',
+        'REMOTE_ADDR': scope['client'][0] if scope.get('client') else '',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for key, value in scope.get('headers', []):
+        name = key.decode('latin1').upper().replace('-', '_')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = f'HTTP_{name}'
+        value = value.decode('latin1')
+        environ[name] = f'{environ[name]},{value}' if name in environ else value
+    return environ
+
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+# Serves the Flask app over ASGI. Connections are held by the event loop and
+# only the Flask work runs on a bounded thread pool, so slow clients and
+# bursts queue cheaply instead of pinning worker threads. IFSC lookups that
+# hit the in-memory index are answered on the loop without a thread hop.
+class AsgiApp:
+    def __init__(self, app, max_threads):
+        self.app = app
+        self.executor = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix='asgi-flask')
+        self.watcher = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise ValueError(f"Unsupported ASGI scope type {scope['type']}")
+
+        if await self.serve_ifsc_lookup(scope, send):
+            return
+
+        body = await read_body(receive)
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self.executor, self.run_flask, scope, body, send, loop)
+        if result is not None:
+            status, headers, content = result
+            await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+            await send({'type': 'http.response.body', 'body': content})
+
+    def run_flask(self, scope, body, send, loop):
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [
+                (name.lower().encode('latin1'), value.encode('latin1')) for name, value in headers
+            ]
+
+        iterable = self.app(build_environ(scope, io.BytesIO(body)), start_response)
+        try:
+            # Werkzeug sets Content-Length only on bodies that are already in
+            # memory; those go back to the loop in one piece, and only real
+            # streams are sent chunk by chunk
+            headers = dict(response['headers'])
+            if b'content-length' in headers or response['status'] in (204, 304):
+                return response['status'], response['headers'], b''.join(iterable)
+
+            def emit(message):
+                asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+            started = False
+            for chunk in iterable:
+                if not chunk:
+                    continue
+                if not started:
+                    emit({'type': 'http.response.start', 'status': response['status'],
+                          'headers': response['headers']})
+                    started = True
+                emit({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            if not started:
+                emit({'type': 'http.response.start', 'status': response['status'],
+                      'headers': response['headers']})
+            emit({'type': 'http.response.body', 'body': b''})
+            return None
+        finally:
+            close = getattr(iterable, 'close', None)
+            if close is not None:
+                close()
+
+    def observe(self, start, status, size):
+        if self.app.config.get('METRICS_ENABLED'):
+            metrics.observe_request(
+                'get_branch_by_ifsc', 'GET', status, time.perf_counter() - start, size=size
+            )
+
+    async def serve_ifsc_lookup(self, scope, send):
+        start = time.perf_counter()
+        path = scope['path']
+        if scope['method'] != 'GET' or scope['query_string'] or not path.startswith(IFSC_PATH_PREFIX):
+            return False
+        index = get_ifsc_index()
+        version = get_dataset_version()
+        if index is None or version is None or not self.app.config.get('RESPONSE_CACHE_ENABLED'):
+            return False
+        payload = index.get(path[len(IFSC_PATH_PREFIX):].upper())
+        if payload is None:
+            # Misses (and anything that isn't an IFSC) take the regular route
+            return False
+
+        key = (version, path)
+        entry = response_cache.peek(key)
+        # Entries carried over from an earlier version keep their ETag
+        etag = entry.etag if entry is not None else make_etag(*key)
+        content = entry.body if entry is not None else ('{"data":' + payload + ',"success":true}\n').encode()
+        config = self.app.config
+        if config.get('COMPRESSION_ENABLED') and len(content) >= config['COMPRESSION_MIN_SIZE']:
+            # Large enough to be compressed; Flask negotiates the encoding
+            return False
+
+        headers = [(b'vary', b'Accept-Encoding')] if config.get('COMPRESSION_ENABLED') else []
+        if_none_match = read_header(scope, b'if-none-match')
+        matched = matching_etag(parse_etags(if_none_match), etag) if if_none_match else None
+        if matched is not None:
+            headers.append((b'etag', f'"{matched}"'.encode()))
+            await send({'type': 'http.response.start', 'status': 304, 'headers': headers})
+            await send({'type': 'http.response.body', 'body': b''})
+            self.observe(start, 304, 0)
+            return True
+
+        headers += [
+            (b'etag', f'"{etag}"'.encode()),
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(content)).encode()),
+        ]
+        await send({'type': 'http.response.start', 'status': 200, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': content})
+        self.observe(start, 200, len(content))
+        return True
+
+    async def watch_dataset_version(self, interval):
+        # The fast path bypasses Flask's before_request hooks, so poll here too
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await loop.run_in_executor(self.executor, self.check_dataset_version, interval)
+            except Exception as e:
+                logger.error(f"Error checking dataset version: {str(e)}")
+
+    def check_dataset_version(self, interval):
+        with self.app.app_context():
+            check_dataset_version(interval)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                interval = self.app.config.get('DATASET_VERSION_CHECK_INTERVAL')
+                if interval:
+                    self.watcher = asyncio.create_task(self.watch_dataset_version(interval))
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.watcher is not None:
+                    self.watcher.cancel()
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def create_asgi_app(config_class=Config):
+    app = create_app(config_class)
+    return AsgiApp(app, app.config['ASGI_MAX_THREADS'])
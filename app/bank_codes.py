@@ -0,0 +1,106 @@
+import logging
+import re
+from collections import defaultdict
+from .indexes import current_indexes
+from .models import db, Branch
+from .stored_counts import load_stored_counts
+
+logger = logging.getLogger(__name__)
+
+# Four letters for the bank, a reserved 0, then six characters for the branch
+IFSC_PATTERN = re.compile(r'^[A-Z]{4}0[A-Z0-9]{6}$')
+
+
+# Maps the four-letter bank code of every loaded IFSC to the banks using it
+# and their branch counts, so codes can be validated, and bank-scoped
+# queries turned into IFSC ranges, without touching SQLite.
+class BankCodeIndex:
+    def __init__(self, rows, bank_payloads):
+        self.bank_payloads = bank_payloads
+        self.codes = defaultdict(dict)
+        self.bank_codes = defaultdict(list)
+        for code, bank_id, count in rows:
+            self.codes[code][bank_id] = count
+            self.bank_codes[bank_id].append(code)
+        self.codes = dict(self.codes)
+        self.bank_codes = {bank_id: sorted(codes) for bank_id, codes in self.bank_codes.items()}
+
+    def __len__(self):
+        return len(self.codes)
+
+    def lookup(self, code):
+        banks = self.codes.get(code)
+        if banks is None:
+            return None
+        payloads = self.bank_payloads
+        return {
+            'bank_code': code,
+            'branch_count': sum(banks.values()),
+            'banks': [
+                payloads.get(bank_id) or {'id': bank_id}
+                for bank_id, _ in sorted(banks.items(), key=lambda item: -item[1])
+            ]
+        }
+
+    def exclusive_codes(self, bank_id):
+        # None when the bank shares a code with another bank (or has none)
+        codes = self.bank_codes.get(bank_id)
+        if not codes or any(len(self.codes[code]) > 1 for code in codes):
+            return None
+        return codes
+
+
+def bank_code_count_rows():
+    code = db.func.substr(Branch.ifsc, 1, 4)
+    return db.session.query(code, Branch.bank_id, db.func.count(Branch.id)).group_by(
+        code, Branch.bank_id
+    ).all()
+
+
+def build_bank_code_index(bank_payloads):
+    rows = load_stored_counts('bank_code_counts')
+    if rows is None:
+        rows = bank_code_count_rows()
+    index = BankCodeIndex(rows, bank_payloads)
+    logger.info(f"Bank code index built with {len(index)} codes")
+    return index
+
+
+def get_bank_code_index():
+    return current_indexes().bank_codes
+
+
+def validate_ifsc(ifsc):
+    code = (ifsc or '').strip().upper()
+    result = {
+        'ifsc': code,
+        'valid': False,
+        'valid_format': bool(IFSC_PATTERN.match(code)),
+        'bank_code': None,
+        'bank': None,
+        'bank_branch_count': None,
+        'exists': None,
+        'reason': None
+    }
+    # A malformed code is never attributed to a bank
+    if not result['valid_format']:
+        result['reason'] = 'IFSC must be 4 letters, a 0 and 6 letters or digits'
+        return result
+
+    result['bank_code'] = code[:4]
+
+    indexes = current_indexes()
+    entry = indexes.bank_codes.lookup(code[:4])
+    if entry is None:
+        result['reason'] = 'Unknown bank code'
+        return result
+
+    result['bank'] = entry['banks'][0]
+    result['bank_branch_count'] = entry['branch_count']
+    ifsc_index = indexes.ifsc
+    if ifsc_index is not None:
+        result['exists'] = ifsc_index.get(code) is not None
+        if not result['exists']:
+            result['reason'] = 'No branch with this IFSC'
+    result['valid'] = result['exists'] is not False
+    return result
@@ -0,0 +1,86 @@
+import json
+from .models import Branch
+from .ifsc_index import branch_payload, branch_payload_rows, get_ifsc_index, load_branch
+from .serializers import eager_banks, get_bank_payloads
+
+CHUNK_SIZE = 500
+
+
+class InvalidBulkRequest(ValueError):
+    pass
+
+
+def normalize_codes(codes, max_codes):
+    if not isinstance(codes, list) or not all(isinstance(code, str) for code in codes):
+        raise InvalidBulkRequest('ifscs must be a list of strings')
+    if len(codes) > max_codes:
+        raise InvalidBulkRequest(f'At most {max_codes} IFSC codes can be looked up per request')
+    return list(dict.fromkeys(code.strip().upper() for code in codes))
+
+
+def chunked(codes):
+    for i in range(0, len(codes), CHUNK_SIZE):
+        yield codes[i:i + CHUNK_SIZE]
+
+
+def query_branches(codes):
+    branches = eager_banks(Branch.query.filter(Branch.ifsc.in_(codes))).all()
+    return {branch.ifsc: branch for branch in branches}
+
+
+def query_payloads(codes):
+    # Same JSON as the IFSC index, built from plain column rows
+    banks = get_bank_payloads()
+    rows = branch_payload_rows().filter(Branch.ifsc.in_(codes))
+    return {row.ifsc: branch_payload(row, banks) for row in rows}
+
+
+def lookup_payloads(codes):
+    # Yields (code, serialized branch or None) in request order. The REST
+    # response is spliced together from these strings, without ORM objects.
+    index = get_ifsc_index()
+    if index is not None:
+        for code in codes:
+            yield code, index.get(code)
+        return
+
+    for chunk in chunked(codes):
+        found = query_payloads(chunk)
+        for code in chunk:
+            yield code, found.get(code)
+
+
+def lookup_branches(codes):
+    # GraphQL resolves fields on Branch objects, so only it builds them
+    index = get_ifsc_index()
+    branches = []
+    missing = []
+    for chunk in chunked(codes):
+        if index is not None:
+            found = {}
+            for code in chunk:
+                payload = index.get(code)
+                if payload is not None:
+                    found[code] = load_branch(payload)
+        else:
+            found = query_branches(chunk)
+        for code in chunk:
+            if code in found:
+                branches.append(found[code])
+            else:
+                missing.append(code)
+    return branches, missing
+
+
+def stream_bulk_response(codes):
+    missing = []
+    found = 0
+    yield '{"success":true,"data":['
+    for code, payload in lookup_payloads(codes):
+        if payload is None:
+            missing.append(code)
+            continue
+        yield (',' if found else '') + payload
+        found += 1
+    yield '],"missing":' + json.dumps(missing)
+    yield f',"requested":{len(codes)},"found":{found}}}\n'
@@ -0,0 +1,233 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict, namedtuple
+from urllib.parse import urlencode
+from flask import g, request
+from werkzeug.exceptions import HTTPException
+from .compression import compress, encoded_etag, negotiate_encoding, supported_encodings
+from .version import get_dataset_version
+
+logger = logging.getLogger(__name__)
+
+CACHEABLE_ENDPOINTS = {
+    'index',
+    'get_banks',
+    'get_bank_branches',
+    'get_branches',
+    'get_branch_by_ifsc',
+    'search_branches',
+    'get_suggestions',
+    'get_stats',
+    'get_stats_breakdown',
+    'get_geo_states',
+    'get_geo_districts',
+    'get_geo_cities',
+    'get_geo_banks',
+}
+
+# variants holds the body compressed once per content encoding
+CachedResponse = namedtuple('CachedResponse', ['body', 'mimetype', 'etag', 'variants'])
+
+
+def entry_size(entry):
+    return len(entry.body) + sum(len(body) for body in entry.variants.values())
+
+
+class ResponseCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def peek(self, key):
+        # Lookup for paths that serve around the cache; no LRU or counter update
+        with self.lock:
+            return self.entries.get(key)
+
+    def put(self, key, entry):
+        size = entry_size(entry)
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.size -= entry_size(previous)
+            self.entries[key] = entry
+            self.size += size
+            self.evict()
+
+    def add_variant(self, key, entry, encoding, body):
+        with self.lock:
+            # The entry may have been evicted or replaced meanwhile
+            if self.entries.get(key) is not entry or encoding in entry.variants:
+                return
+            entry.variants[encoding] = body
+            self.size += len(body)
+            self.evict()
+
+    def evict(self):
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= entry_size(evicted)
+            self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def carry_over(self, previous_version, version, keep):
+        # Re-key entries of the previous dataset version that are still valid;
+        # entries already stored for the new version are kept as they are
+        with self.lock:
+            entries = OrderedDict()
+            for (entry_version, path), entry in self.entries.items():
+                if entry_version == version or (entry_version == previous_version and keep(path)):
+                    entries.setdefault((version, path), entry)
+            dropped = len(self.entries) - len(entries)
+            self.entries = entries
+            self.size = sum(entry_size(entry) for entry in entries.values())
+            return len(entries), dropped
+
+    def record_not_modified(self):
+        with self.lock:
+            self.not_modified += 1
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'size_bytes': self.size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+response_cache = ResponseCache(64 * 1024 * 1024)
+
+
+def clear_response_cache():
+    response_cache.clear()
+
+
+def carry_over_response_cache(app, previous_version, version, ifscs, bank_ids):
+    # After an incremental sync only single-branch and per-bank responses
+    # untouched by it survive; lists, search, stats and suggestions are dropped.
+    adapter = app.url_map.bind('localhost')
+
+    def keep(path):
+        try:
+            endpoint, args = adapter.match(path.split('?', 1)[0], method='GET')
+        except HTTPException:
+            return False
+        if endpoint == 'get_branch_by_ifsc':
+            return args['ifsc'].upper() not in ifscs
+        if endpoint == 'get_bank_branches':
+            return args['bank_id'] not in bank_ids
+        return False
+
+    kept, dropped = response_cache.carry_over(previous_version, version, keep)
+    logger.info(f"Response cache kept {kept} entries and dropped {dropped}")
+
+
+def cache_key():
+    args = sorted(request.args.items(multi=True))
+    return f"{request.path}?{urlencode(args)}" if args else request.path
+
+
+def make_etag(version, key):
+    return hashlib.sha1(f"{version}:{key}".encode()).hexdigest()
+
+
+def matching_etag(if_none_match, etag):
+    # Validators of any compressed representation match too
+    candidates = [etag] + [encoded_etag(etag, encoding) for encoding in supported_encodings()]
+    return next((tag for tag in candidates if if_none_match.contains(tag)), None)
+
+
+def encoded_body(key, entry):
+    # Compressed at most once per entry and encoding, then served from memory
+    encoding = negotiate_encoding(len(entry.body), entry.mimetype)
+    if encoding is None:
+        return entry.body, None
+    body = entry.variants.get(encoding)
+    if body is None:
+        body = compress(entry.body, encoding)
+        response_cache.add_variant(key, entry, encoding, body)
+    return body, encoding
+
+
+def encode_response(response, key, entry):
+    body, encoding = encoded_body(key, entry)
+    response.set_data(body)
+    response.set_etag(encoded_etag(entry.etag, encoding))
+    if encoding is not None:
+        response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+    return response
+
+
+def register_cache(app):
+    if not app.config.get('RESPONSE_CACHE_ENABLED'):
+        return
+    response_cache.max_bytes = app.config.get('RESPONSE_CACHE_MAX_BYTES', response_cache.max_bytes)
+
+    @app.before_request
+    def serve_cached_response():
+        if request.method != 'GET' or request.endpoint not in CACHEABLE_ENDPOINTS:
+            return None
+        version = get_dataset_version()
+        if version is None:
+            return None
+
+        key = (version, cache_key())
+        # Entries carried over from an earlier version keep their ETag
+        entry = response_cache.get(key)
+        etag = entry.etag if entry is not None else make_etag(*key)
+        g.response_cache_key = key
+        g.response_cache_etag = etag
+
+        matched = matching_etag(request.if_none_match, etag)
+        if matched is not None:
+            response_cache.record_not_modified()
+            response = app.response_class(status=304)
+            response.set_etag(matched)
+            response.vary.add('Accept-Encoding')
+            return response
+
+        if entry is not None:
+            g.response_cache_key = None
+            return encode_response(app.response_class(mimetype=entry.mimetype), key, entry)
+        return None
+
+    @app.after_request
+    def store_cached_response(response):
+        key = g.pop('response_cache_key', None)
+        if key is None or response.status_code != 200 or response.is_streamed:
+            return response
+
+        etag = g.pop('response_cache_etag')
+        entry = CachedResponse(response.get_data(), response.mimetype, etag, {})
+        response_cache.put(key, entry)
+        return encode_response(response, key, entry)
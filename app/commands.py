@@ -0,0 +1,34 @@
+import json
+import click
+from .database import reload_dataset, reload_status
+from .snapshot import SnapshotError, build_snapshot
+
+def register_commands(app):
+    @app.cli.command('reload-data')
+    @click.option('--source', default=None, help='Local CSV path (defaults to downloading the dataset).')
+    def reload_data(source):
+        """Load the dataset into shadow tables and swap it in atomically."""
+        if not reload_dataset(source):
+            click.echo(json.dumps(reload_status, indent=2))
+            raise click.ClickException('Dataset reload failed or is already running')
+        click.echo(json.dumps(reload_status, indent=2))
+
+    @app.cli.command('sync-data')
+    @click.option('--source', default=None, help='Local CSV path (defaults to downloading the dataset).')
+    def sync_data(source):
+        """Apply only the inserted, updated and deleted branches from the dataset."""
+        if not reload_dataset(source, incremental=True):
+            click.echo(json.dumps(reload_status, indent=2))
+            raise click.ClickException('Dataset sync failed or a reload is already running')
+        click.echo(json.dumps(reload_status, indent=2))
+
+    @app.cli.command('build-snapshot')
+    @click.option('--output', default='snapshots', show_default=True, help='Directory for the snapshot and manifest.json.')
+    @click.option('--source', default=None, help='Local CSV path (defaults to downloading the dataset).')
+    def build_snapshot_command(output, source):
+        """Build a compacted, indexed, read-only database snapshot with a checksum manifest."""
+        try:
+            manifest = build_snapshot(output, source)
+        except SnapshotError as e:
+            raise click.ClickException(str(e))
+        click.echo(json.dumps(manifest, indent=2))
@@ -0,0 +1,106 @@
+import logging
+import zlib
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'application/x-ndjson', 'text/csv', 'text/plain', 'text/html'
+}
+# Streams are flushed to the client whenever this much input has been compressed
+STREAM_FLUSH_BYTES = 64 * 1024
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def supported_encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate_encoding(size, mimetype):
+    # None means send the body as is; size is None for streams
+    config = current_app.config
+    if not config.get('COMPRESSION_ENABLED') or mimetype not in COMPRESSIBLE_MIMETYPES:
+        return None
+    if size is not None and size < config['COMPRESSION_MIN_SIZE']:
+        return None
+    return request.accept_encodings.best_match(supported_encodings())
+
+
+def encoded_etag(etag, encoding):
+    # Each encoding is a different representation, so it needs its own strong ETag
+    return f"{etag}-{encoding}" if encoding else etag
+
+
+def compressor(encoding):
+    config = current_app.config
+    if encoding == 'br':
+        return brotli.Compressor(quality=config['COMPRESSION_BROTLI_QUALITY'])
+    return zlib.compressobj(config['COMPRESSION_GZIP_LEVEL'], zlib.DEFLATED, GZIP_WBITS)
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=current_app.config['COMPRESSION_BROTLI_QUALITY'])
+    stream = compressor(encoding)
+    return stream.compress(data) + stream.flush()
+
+
+def compress_stream(chunks, encoding):
+    stream = compressor(encoding)
+    if encoding == 'br':
+        compress_chunk, flush, finish = stream.process, stream.flush, stream.finish
+    else:
+        compress_chunk = stream.compress
+        flush = lambda: stream.flush(zlib.Z_SYNC_FLUSH)
+        finish = stream.flush
+
+    pending = 0
+    for chunk in chunks:
+        output = compress_chunk(chunk)
+        pending += len(chunk)
+        if pending >= STREAM_FLUSH_BYTES:
+            output += flush()
+            pending = 0
+        if output:
+            yield output
+    yield finish()
+
+
+def register_compression(app):
+    if not app.config.get('COMPRESSION_ENABLED'):
+        return
+    if brotli is None:
+        logger.info("brotli is not installed, compressing responses with gzip only")
+
+    @app.after_request
+    def compress_response(response):
+        if (request.method == 'HEAD' or response.status_code < 200
+                or response.status_code in (204, 206, 304)
+                or response.direct_passthrough or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        if response.is_streamed:
+            encoding = negotiate_encoding(None, response.mimetype)
+            if encoding is None:
+                return response
+            response.response = compress_stream(response.iter_encoded(), encoding)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            encoding = negotiate_encoding(len(data), response.mimetype)
+            if encoding is None:
+                return response
+            response.set_data(compress(data, encoding))
+
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(encoded_etag(etag, encoding), weak)
+        return response
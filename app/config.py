@@ -1,7 +1,73 @@
 import os
+from sqlalchemy.pool import QueuePool
 
 basedir = os.path.abspath(os.path.dirname(__file__))
 
+DATABASE_PATH = os.path.abspath(
+    os.environ.get('DATABASE_PATH', os.path.join(basedir, "..", "indian_banks.db"))
+)
+
 class Config:
-    SQLALCHEMY_DATABASE_URI = f'sqlite:///{os.path.join(basedir, "..", "indian_banks.db")}'
+    SQLALCHEMY_DATABASE_URI = f'sqlite:///{DATABASE_PATH}'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    IFSC_INDEX_ENABLED = True
+    SEARCH_BACKEND = 'fts'
+    ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+    RESPONSE_CACHE_ENABLED = True
+    RESPONSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+    BULK_LOOKUP_MAX_CODES = 10000
+    BULK_LOOKUP_STREAM_THRESHOLD = 1000
+    LOAD_DATA_ON_STARTUP = True
+    DATA_SOURCE = os.environ.get('DATA_SOURCE')
+    DATA_LOCK_PATH = f'{DATABASE_PATH}.lock'
+    DATASET_VERSION_CHECK_INTERVAL = None
+    ALLOW_SAMPLE_DATA = True
+    SNAPSHOT_MANIFEST = os.environ.get('SNAPSHOT_MANIFEST')
+    SNAPSHOT_VERIFY_CHECKSUM = True
+    GRAPHQL_MAX_DEPTH = 10
+    GRAPHQL_MAX_COST = 10000
+    GRAPHQL_LIST_LIMIT = 1000
+    GRAPHQL_QUERY_CACHE_SIZE = 1000
+    METRICS_ENABLED = True
+    # Off unless set: while on, every request records its SQL statements
+    SLOW_REQUEST_THRESHOLD_MS = (
+        float(os.environ['SLOW_REQUEST_THRESHOLD_MS']) if os.environ.get('SLOW_REQUEST_THRESHOLD_MS') else None
+    )
+    JSON_ENCODER = os.environ.get('JSON_ENCODER', 'auto')
+    ASGI_MAX_THREADS = int(os.environ.get('ASGI_MAX_THREADS', 8))
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', '1') != '0'
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+    COMPRESSION_GZIP_LEVEL = 6
+    COMPRESSION_BROTLI_QUALITY = 5
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -65536,
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY',
+    }
+
+class BuildConfig(Config):
+    # Used when preparing data for production: never fall back to the sample rows
+    ALLOW_SAMPLE_DATA = False
+
+class ProductionConfig(Config):
+    # Workers only read; the dataset is prepared once by `python -m app.serving`
+    SQLALCHEMY_DATABASE_URI = f'sqlite:///file:{DATABASE_PATH}?mode=ro&uri=true'
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'poolclass': QueuePool,
+        'pool_size': int(os.environ.get('GUNICORN_THREADS', 4)),
+        'max_overflow': 4,
+        'connect_args': {'check_same_thread': False},
+    }
+    LOAD_DATA_ON_STARTUP = False
+    DATASET_VERSION_CHECK_INTERVAL = 5
+    ALLOW_SAMPLE_DATA = False
+    # The gunicorn master verifies the snapshot checksum once before forking
+    SNAPSHOT_VERIFY_CHECKSUM = False
+    SQLITE_PRAGMAS = {
+        'cache_size': -65536,
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY',
+        'query_only': 'ON',
+    }
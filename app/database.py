@@ -1,108 +1,530 @@
 import csv
+import io
+import os
+import re
+import threading
+import time
 import requests
 import logging
-from .models import db, Bank, Branch
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from flask import current_app
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.schema import CreateIndex, CreateTable
+from .models import db, normalize, Bank, Branch, DatasetVersion
+from .bank_codes import build_bank_code_index
+from .ifsc_index import drop_stored_ifsc_index, load_ifsc_index, update_ifsc_index
+from .indexes import IndexSet, get_indexes, publish_indexes
+from .serializers import build_bank_payloads, build_branch_counts
+from .stats import build_stats_snapshot
+from .stored_counts import drop_stored_counts
+from .suggest import build_suggest_index
+from .version import (
+    current_dataset_version, get_dataset_version, latest_dataset_version, record_dataset_version
+)
+from .cache import carry_over_response_cache, clear_response_cache
+from .search import create_search_index, populate_search_index, rebuild_search_index
+from .sync import affected_ifscs, load_change_set, sync_branch_rows
 
 logger = logging.getLogger(__name__)
 
-def download_and_load_data():
+CSV_URL = "https://raw.githubusercontent.com/snarayanank2/indian_banks/master/bank_branches.csv"
+BATCH_SIZE = 5000
+
+LIVE_TABLES = ('banks', 'branches')
+SEARCH_TABLE = 'branches_fts'
+SHADOW_SUFFIX = '_new'
+RETIRED_SUFFIX = '_old'
+
+reload_lock = threading.Lock()
+reload_status = {'state': 'idle'}
+
+refresh_lock = threading.Lock()
+last_version_check = 0.0
+
+@contextmanager
+def open_csv_source(source=None):
+    if source is None:
+        logger.info(f"Downloading data from: {CSV_URL}")
+        with requests.get(CSV_URL, timeout=60, stream=True) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            yield io.TextIOWrapper(response.raw, encoding='utf-8', newline='')
+    elif isinstance(source, (str, os.PathLike)):
+        logger.info(f"Reading data from: {source}")
+        with open(source, encoding='utf-8', newline='') as f:
+            yield f
+    elif isinstance(source.read(0), bytes):
+        yield io.TextIOWrapper(source, encoding='utf-8', newline='')
+    else:
+        yield source
+
+def iter_branch_rows(lines):
+    for row in csv.DictReader(lines):
+        city = row['city'].strip() if row['city'] else ''
+        district = row['district'].strip() if row['district'] else ''
+        state = row['state'].strip() if row['state'] else ''
+        yield {
+            'ifsc': row['ifsc'].strip(),
+            'branch': row['branch'].strip() if row['branch'] else '',
+            'address': row['address'].strip() if row['address'] else '',
+            'city': city,
+            'district': district,
+            'state': state,
+            'city_norm': normalize(city),
+            'district_norm': normalize(district),
+            'state_norm': normalize(state),
+            'bank_name': row['bank_name'].strip()
+        }
+
+def shadow_name(name):
+    return f"{name}{SHADOW_SUFFIX}"
+
+def shadow_index_name(name):
+    # Index names are global in SQLite and can't be renamed, so alternate
+    # between two names on every reload.
+    if name.endswith(SHADOW_SUFFIX):
+        return name[:-len(SHADOW_SUFFIX)]
+    return shadow_name(name)
+
+def shadow_table(model):
+    return db.table(
+        shadow_name(model.__tablename__),
+        *[db.column(column.name) for column in model.__table__.columns]
+    )
+
+def drop_shadow_tables():
+    for name in (*LIVE_TABLES, SEARCH_TABLE):
+        db.session.execute(text(f"DROP TABLE IF EXISTS {shadow_name(name)}"))
+        db.session.execute(text(f"DROP TABLE IF EXISTS {name}{RETIRED_SUFFIX}"))
+    db.session.commit()
+
+def existing_index_names():
+    return {
+        name for (name,) in db.session.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'index'")
+        )
+    }
+
+def create_shadow_tables():
+    for model in (Bank, Branch):
+        name = model.__tablename__
+        ddl = str(CreateTable(model.__table__).compile(dialect=db.engine.dialect)).strip()
+        ddl = re.sub(rf'^CREATE TABLE\s+"?{name}"?', f'CREATE TABLE {shadow_name(name)}', ddl, count=1)
+        db.session.execute(text(ddl))
+    db.session.commit()
+
+def create_shadow_indexes():
+    existing = existing_index_names()
+    for model in (Bank, Branch):
+        name = model.__tablename__
+        for index in model.__table__.indexes:
+            index_name = shadow_index_name(index.name) if index.name in existing else index.name
+            ddl = str(CreateIndex(index).compile(dialect=db.engine.dialect))
+            ddl = ddl.replace(index.name, index_name, 1)
+            ddl = re.sub(rf'\bON\s+"?{name}"?\s*\(', f'ON {shadow_name(name)} (', ddl, count=1)
+            db.session.execute(text(ddl))
+    db.session.commit()
+
+def upgrade_schema():
+    # Bring a database created by an older release up to the current models
+    for model in (Bank, Branch):
+        name = model.__tablename__
+        columns = {row[1] for row in db.session.execute(text(f"PRAGMA table_info({name})"))}
+        for column in model.__table__.columns:
+            if column.name in columns:
+                continue
+            column_type = column.type.compile(dialect=db.engine.dialect)
+            db.session.execute(text(f"ALTER TABLE {name} ADD COLUMN {column.name} {column_type}"))
+            source = getattr(model, 'NORMALIZED_COLUMNS', {}).get(column.name)
+            if source:
+                db.session.execute(text(f"UPDATE {name} SET {column.name} = upper(trim({source}))"))
+            logger.info(f"Added column {name}.{column.name}")
+
+        existing = existing_index_names()
+        for index in model.__table__.indexes:
+            if index.name not in existing and shadow_index_name(index.name) not in existing:
+                db.session.execute(text(str(CreateIndex(index).compile(dialect=db.engine.dialect))))
+                logger.info(f"Created index {index.name}")
+    db.session.commit()
+
+def swap_shadow_tables():
+    names = (*LIVE_TABLES, SEARCH_TABLE)
+    raw = db.engine.raw_connection()
+    try:
+        dbapi_connection = raw.driver_connection
+        isolation_level = dbapi_connection.isolation_level
+        # pysqlite doesn't open a transaction for DDL, so drive it by hand
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA legacy_alter_table = ON")
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                for name in names:
+                    cursor.execute(f"ALTER TABLE {name} RENAME TO {name}{RETIRED_SUFFIX}")
+                for name in names:
+                    cursor.execute(f"ALTER TABLE {shadow_name(name)} RENAME TO {name}")
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+        finally:
+            cursor.execute("PRAGMA legacy_alter_table = OFF")
+            dbapi_connection.isolation_level = isolation_level
+    finally:
+        raw.close()
+
+    for name in names:
+        db.session.execute(text(f"DROP TABLE IF EXISTS {name}{RETIRED_SUFFIX}"))
+    db.session.commit()
+    drop_stored_ifsc_index()
+    drop_stored_counts()
+
+def insert_branch_rows(rows, banks_table=None, branches_table=None, bank_ids=None):
+    banks_table = banks_table if banks_table is not None else Bank.__table__
+    branches_table = branches_table if branches_table is not None else Branch.__table__
+    # Reuse the IDs of banks already loaded so they stay stable across reloads
+    bank_ids = dict(bank_ids or {})
+    next_id = max(bank_ids.values(), default=0) + 1
+    banks_dict = {}
+    batch = []
+    total = 0
+
+    for row in rows:
+        bank_name = row.pop('bank_name')
+        bank_id = banks_dict.get(bank_name)
+        if bank_id is None:
+            bank_id = bank_ids.get(bank_name)
+            if bank_id is None:
+                bank_id = next_id
+                next_id += 1
+            banks_dict[bank_name] = bank_id
+            db.session.execute(banks_table.insert(), {'id': bank_id, 'name': bank_name})
+
+        row['bank_id'] = bank_id
+        batch.append(row)
+
+        if len(batch) >= BATCH_SIZE:
+            db.session.execute(branches_table.insert(), batch)
+            total += len(batch)
+            batch = []
+
+    if batch:
+        db.session.execute(branches_table.insert(), batch)
+        total += len(batch)
+
+    return len(banks_dict), total
+
+def start_reload_status(mode):
+    # Each run starts from a fresh status so fields of an earlier run don't leak
+    reload_status.clear()
+    reload_status.update({
+        'state': 'running',
+        'mode': mode,
+        'started_at': datetime.now(timezone.utc).isoformat(),
+        'finished_at': None,
+        'error': None
+    })
+
+def download_and_load_data(source=None):
+    start_reload_status('full')
     try:
         logger.info("Starting data download and loading process...")
+        start = time.perf_counter()
         
-        csv_url = "https://raw.githubusercontent.com/snarayanank2/indian_banks/master/bank_branches.csv"
-        
-        logger.info(f"Downloading data from: {csv_url}")
-        response = requests.get(csv_url, timeout=60)
-        response.raise_for_status()
-        
-        csv_data = response.text
-        csv_reader = csv.DictReader(csv_data.splitlines())
-        
-        banks_dict = {}
-        branches_data = []
-        
-        logger.info("Processing CSV data...")
-        for row in csv_reader:
-            bank_name = row['bank_name'].strip()
-            
-            if bank_name not in banks_dict:
-                banks_dict[bank_name] = len(banks_dict) + 1
-            
-            branch_data = {
-                'ifsc': row['ifsc'].strip(),
-                'branch': row['branch'].strip() if row['branch'] else '',
-                'address': row['address'].strip() if row['address'] else '',
-                'city': row['city'].strip() if row['city'] else '',
-                'district': row['district'].strip() if row['district'] else '',
-                'state': row['state'].strip() if row['state'] else '',
-                'bank_name': bank_name
-            }
-            branches_data.append(branch_data)
-        
-        logger.info(f"Found {len(banks_dict)} banks and {len(branches_data)} branches")
-        
-        logger.info("Clearing existing data...")
-        Branch.query.delete()
-        Bank.query.delete()
-        db.session.commit()
+        create_search_index()
+        drop_shadow_tables()
+        create_shadow_tables()
         
-        logger.info("Inserting banks...")
-        bank_objects = []
-        for bank_name, bank_id in banks_dict.items():
-            bank = Bank(id=bank_id, name=bank_name)
-            bank_objects.append(bank)
+        with open_csv_source(source) as lines:
+            logger.info("Streaming CSV rows into shadow tables...")
+            bank_count, branch_count = insert_branch_rows(
+                iter_branch_rows(lines), shadow_table(Bank), shadow_table(Branch),
+                dict(db.session.query(Bank.name, Bank.id).all())
+            )
         
-        db.session.bulk_save_objects(bank_objects)
         db.session.commit()
+        load_seconds = time.perf_counter() - start
+        logger.info(
+            f"Loaded {bank_count} banks and {branch_count} branches in {load_seconds:.2f}s "
+            f"({branch_count / max(load_seconds, 1e-9):.0f} rows/s)"
+        )
         
-        logger.info("Inserting branches...")
-        batch_size = 1000
-        for i in range(0, len(branches_data), batch_size):
-            batch = branches_data[i:i + batch_size]
-            branch_objects = []
-            
-            for branch_data in batch:
-                bank_id = banks_dict[branch_data['bank_name']]
-                branch = Branch(
-                    ifsc=branch_data['ifsc'],
-                    branch=branch_data['branch'],
-                    address=branch_data['address'],
-                    city=branch_data['city'],
-                    district=branch_data['district'],
-                    state=branch_data['state'],
-                    bank_id=bank_id
-                )
-                branch_objects.append(branch)
-            
-            db.session.bulk_save_objects(branch_objects)
-            db.session.commit()
-            logger.info(f"Inserted batch {i//batch_size + 1}/{(len(branches_data)//batch_size) + 1}")
+        index_start = time.perf_counter()
+        create_shadow_indexes()
+        create_search_index(shadow_name(SEARCH_TABLE))
+        populate_search_index(
+            shadow_name(SEARCH_TABLE), shadow_name('branches'), shadow_name('banks')
+        )
+        index_seconds = time.perf_counter() - index_start
+        logger.info(f"Built indexes in {index_seconds:.2f}s")
         
+        swap_start = time.perf_counter()
+        swap_shadow_tables()
+        swap_ms = (time.perf_counter() - swap_start) * 1000
+        logger.info(f"Swapped in new dataset in {swap_ms:.1f}ms")
+        
+        version = record_dataset_version()
+        refresh_in_memory_indexes()
+        reload_status.update({
+            'state': 'succeeded',
+            'finished_at': datetime.now(timezone.utc).isoformat(),
+            'version': version.version,
+            'banks': bank_count,
+            'branches': branch_count,
+            'load_seconds': round(load_seconds, 3),
+            'index_seconds': round(index_seconds, 3),
+            'swap_ms': round(swap_ms, 3),
+            'total_seconds': round(time.perf_counter() - start, 3)
+        })
         logger.info("Data loading completed successfully!")
         return True
         
     except requests.exceptions.RequestException as e:
+        db.session.rollback()
         logger.error(f"Failed to download data: {str(e)}")
+        reload_status.update({
+            'state': 'failed',
+            'finished_at': datetime.now(timezone.utc).isoformat(),
+            'error': str(e)
+        })
         return False
     except Exception as e:
+        db.session.rollback()
         logger.error(f"Error loading data: {str(e)}")
+        reload_status.update({
+            'state': 'failed',
+            'finished_at': datetime.now(timezone.utc).isoformat(),
+            'error': str(e)
+        })
         return False
 
+def sync_dataset(source=None):
+    start_reload_status('sync')
+    try:
+        logger.info("Starting incremental dataset sync...")
+        start = time.perf_counter()
+        
+        base_version = get_dataset_version() or current_dataset_version()
+        with open_csv_source(source) as lines:
+            changes = sync_branch_rows(iter_branch_rows(lines), base_version)
+        
+        sync_seconds = time.perf_counter() - start
+        if changes is None:
+            logger.info(f"Dataset unchanged after {sync_seconds:.2f}s")
+            reload_status.update({'state': 'succeeded', 'inserted': 0, 'updated': 0, 'deleted': 0})
+        else:
+            logger.info(
+                f"Synced dataset version {changes.version}: {len(changes.inserted)} inserted, "
+                f"{len(changes.updated)} updated, {len(changes.deleted)} deleted "
+                f"in {sync_seconds:.2f}s"
+            )
+            drop_stored_ifsc_index()
+            drop_stored_counts()
+            refresh_in_memory_indexes(changes)
+            reload_status.update({
+                'state': 'succeeded',
+                'version': changes.version,
+                'inserted': len(changes.inserted),
+                'updated': len(changes.updated),
+                'deleted': len(changes.deleted)
+            })
+        reload_status.update({
+            'finished_at': datetime.now(timezone.utc).isoformat(),
+            'sync_seconds': round(sync_seconds, 3),
+            'total_seconds': round(time.perf_counter() - start, 3)
+        })
+        return True
+        
+    except requests.exceptions.RequestException as e:
+        db.session.rollback()
+        logger.error(f"Failed to download data: {str(e)}")
+        reload_status.update({
+            'state': 'failed',
+            'finished_at': datetime.now(timezone.utc).isoformat(),
+            'error': str(e)
+        })
+        return False
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error syncing data: {str(e)}")
+        reload_status.update({
+            'state': 'failed',
+            'finished_at': datetime.now(timezone.utc).isoformat(),
+            'error': str(e)
+        })
+        return False
+
+def reload_dataset(source=None, incremental=False):
+    if not reload_lock.acquire(blocking=False):
+        return False
+    try:
+        if incremental:
+            return sync_dataset(source)
+        return download_and_load_data(source)
+    finally:
+        reload_lock.release()
+
+def start_background_reload(app, source=None, incremental=False):
+    if reload_lock.locked():
+        return False
+
+    def run():
+        with app.app_context():
+            reload_dataset(source, incremental)
+            db.session.remove()
+
+    threading.Thread(target=run, name='dataset-reload', daemon=True).start()
+    return True
+
+def configure_engine(app):
+    pragmas = app.config.get('SQLITE_PRAGMAS') or {}
+    if not pragmas:
+        return
+
+    @event.listens_for(db.engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+def check_dataset_version(interval):
+    # Only the version lookup runs on the request path; the new indexes are
+    # built in a background thread while requests keep using the old ones
+    global last_version_check
+    now = time.monotonic()
+    if now - last_version_check < interval or not refresh_lock.acquire(blocking=False):
+        return False
+    started = False
+    try:
+        last_version_check = now
+        latest = latest_dataset_version()
+        version = get_dataset_version()
+        if latest is None or latest.version == version:
+            return False
+        logger.info(f"Dataset version changed to {latest.version}, rebuilding indexes in the background")
+        threading.Thread(
+            target=refresh_indexes_in_background,
+            args=(current_app._get_current_object(), latest.version, version),
+            name='index-refresh', daemon=True
+        ).start()
+        started = True
+        return True
+    finally:
+        if not started:
+            refresh_lock.release()
+
+def refresh_indexes_in_background(app, version, base_version):
+    try:
+        with app.app_context():
+            refresh_in_memory_indexes(load_change_set(version, base_version))
+            db.session.remove()
+    except Exception as e:
+        logger.error(f"Error refreshing indexes: {str(e)}")
+    finally:
+        refresh_lock.release()
+
+def register_dataset_watch(app):
+    # Other processes (a CLI reload, the prepare step) can swap the dataset;
+    # poll its version so each worker rebuilds its in-memory indexes.
+    interval = app.config.get('DATASET_VERSION_CHECK_INTERVAL')
+    if not interval:
+        return
+
+    @app.before_request
+    def watch_dataset_version():
+        check_dataset_version(interval)
+        return None
+
+def check_prepared_dataset():
+    # Apps that don't load data on startup open the database read-only, so
+    # they can neither load a dataset nor record its version themselves
+    prepare = "prepare it with `python -m app.serving` before starting workers"
+    try:
+        tables = {
+            name for (name,) in db.session.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'table'")
+            )
+        }
+    except OperationalError as e:
+        raise RuntimeError(f"Cannot open the dataset database ({e.orig}); {prepare}") from e
+    missing = [name for name in (*LIVE_TABLES, DatasetVersion.__tablename__) if name not in tables]
+    if missing:
+        raise RuntimeError(f"The database is missing tables {', '.join(missing)}; {prepare}")
+    if latest_dataset_version() is None:
+        raise RuntimeError(f"The database has no recorded dataset version; {prepare}")
+
 def init_database(app):
     with app.app_context():
         db.create_all()
+        upgrade_schema()
         
         if Bank.query.first():
             logger.info("Database already contains data. Skipping initialization.")
+            if create_search_index():
+                rebuild_search_index()
+            refresh_in_memory_indexes()
             return
         
         logger.info("Database is empty. Loading Indian banks data...")
         
-        if download_and_load_data():
+        if download_and_load_data(app.config.get('DATA_SOURCE')):
             logger.info("Successfully loaded real Indian banks data!")
+        elif not current_app.config.get('ALLOW_SAMPLE_DATA'):
+            raise RuntimeError("Failed to load the dataset and sample data is disabled")
         else:
             logger.warning("Failed to load real data. Using sample data instead.")
             create_sample_data()
+            rebuild_search_index()
+            record_dataset_version()
+            refresh_in_memory_indexes()
+
+def build_indexes(changes=None, previous=None):
+    # Read the version first: if the dataset moves on during the build, the
+    # next version check sees a newer version and rebuilds again
+    version = current_dataset_version()
+    branch_counts = build_branch_counts()
+    bank_payloads = build_bank_payloads(branch_counts)
+    stats = build_stats_snapshot()
+    ifsc = None
+    if current_app.config.get('IFSC_INDEX_ENABLED'):
+        incremental = (
+            changes is not None and previous is not None and previous.ifsc is not None
+            and changes.base_version == previous.version
+        )
+        if not incremental:
+            ifsc = load_ifsc_index(bank_payloads)
+        else:
+            ifsc = update_ifsc_index(
+                previous.ifsc, bank_payloads,
+                changes.inserted | changes.updated | changes.deleted, changes.resized_bank_ids
+            )
+    return IndexSet(
+        version=version,
+        branch_counts=branch_counts,
+        bank_payloads=bank_payloads,
+        bank_codes=build_bank_code_index(bank_payloads),
+        stats=stats,
+        suggest=build_suggest_index(stats),
+        ifsc=ifsc
+    )
+
+def refresh_in_memory_indexes(changes=None):
+    # With the change set of an incremental sync, keep IFSC payloads and
+    # cached responses for branches and banks the sync didn't touch
+    previous = get_indexes()
+    previous_version = previous.version if previous is not None else None
+    indexes = publish_indexes(build_indexes(changes, previous))
+    if changes is None or changes.base_version != previous_version:
+        clear_response_cache()
+    else:
+        carry_over_response_cache(
+            current_app, previous_version, indexes.version, affected_ifscs(changes), changes.bank_ids
+        )
+    return indexes
 
 def create_sample_data():
     try:
@@ -0,0 +1,72 @@
+import logging
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+JSON_ENCODERS = ('auto', 'orjson', 'stdlib')
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    # Same output rules as Flask's provider (sorted keys, HTTP dates, compact
+    # unless debugging) but encoded by orjson straight to bytes.
+    supports_fragments = orjson is not None and hasattr(orjson, 'Fragment')
+
+    @staticmethod
+    def options(sort_keys=True):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        return option | orjson.OPT_SORT_KEYS if sort_keys else option
+
+    def dumps(self, obj, **kwargs):
+        sort_keys = kwargs.pop('sort_keys', True)
+        # orjson output is always compact, so separators need no mapping
+        options = {key: value for key, value in kwargs.items() if key != 'separators'}
+        if set(options) <= {'indent'} and options.get('indent') in (None, 2):
+            option = self.options(sort_keys)
+            if options.get('indent') == 2:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=self.default, option=option).decode()
+        # Anything else goes to the stdlib encoder, which does not understand
+        # Fragments: a round trip through orjson unwraps them first
+        plain = orjson.loads(orjson.dumps(obj, default=self.default, option=self.options(False)))
+        return super().dumps(plain, sort_keys=sort_keys, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        option = self.options() | orjson.OPT_APPEND_NEWLINE
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=option), mimetype=self.mimetype
+        )
+
+
+def configure_json(app):
+    encoder = app.config.get('JSON_ENCODER', 'auto')
+    if encoder not in JSON_ENCODERS:
+        raise ValueError(f"JSON_ENCODER must be one of: {', '.join(JSON_ENCODERS)}")
+    if encoder == 'stdlib':
+        return
+    if orjson is None:
+        if encoder == 'orjson':
+            logger.warning("orjson is not installed, falling back to the stdlib JSON encoder")
+        return
+    app.json = OrjsonProvider(app)
+
+
+def shared_json(obj):
+    # Encode a value repeated across many rows once; orjson splices the
+    # pre-encoded bytes in verbatim. Other encoders get the object itself.
+    if obj is None or not getattr(current_app.json, 'supports_fragments', False):
+        return obj
+    return orjson.Fragment(orjson.dumps(obj, option=orjson.OPT_SORT_KEYS))
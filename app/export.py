@@ -0,0 +1,61 @@
+import csv
+import io
+import itertools
+import json
+import logging
+from .models import db, Bank, Branch
+from .filters import filter_branches
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+EXPORT_COLUMNS = ('id', 'ifsc', 'branch', 'address', 'city', 'district', 'state', 'bank_id', 'bank_name')
+BATCH_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
+
+def export_rows(filters):
+    # Not a generator: the filters are applied and the first batch fetched
+    # here, so bad input and database errors surface before the response
+    # status is sent
+    bank_names = dict(db.session.query(Bank.id, Bank.name).all())
+    query = db.session.query(
+        Branch.id, Branch.ifsc, Branch.branch, Branch.address,
+        Branch.city, Branch.district, Branch.state, Branch.bank_id
+    )
+    rows = iter(filter_branches(query, **filters).order_by(Branch.id).yield_per(BATCH_SIZE))
+    first = list(itertools.islice(rows, BATCH_SIZE))
+    return ((*row, bank_names.get(row.bank_id)) for row in itertools.chain(first, rows))
+
+
+def stream_ndjson(rows):
+    lines = []
+    try:
+        for row in rows:
+            lines.append(json.dumps(dict(zip(EXPORT_COLUMNS, row)), separators=(',', ':')))
+            if len(lines) >= BATCH_SIZE:
+                yield '\n'.join(lines) + '\n'
+                lines = []
+    except Exception as e:
+        # The 200 is already out; a final error record marks the body as incomplete
+        logger.error(f"Error streaming export: {str(e)}")
+        lines.append(json.dumps({'success': False, 'error': f"Export failed: {str(e)}"}))
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def stream_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    try:
+        for i, row in enumerate(rows, 1):
+            writer.writerow(row)
+            if i % BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+    except Exception as e:
+        # Same as NDJSON: a last row starting with ERROR marks the file as incomplete
+        logger.error(f"Error streaming export: {str(e)}")
+        writer.writerow(('ERROR', f"Export failed: {str(e)}"))
+    yield buffer.getvalue()
@@ -0,0 +1,81 @@
+from .models import db, normalize, Branch
+from .bank_codes import get_bank_code_index
+from .serializers import get_bank_payloads
+
+MATCH_MODES = ('substring', 'exact', 'prefix')
+# Above this many banks an IN on bank_id beats OR-ing IFSC ranges
+BANK_RANGE_LIMIT = 8
+
+
+class InvalidFilter(ValueError):
+    pass
+
+
+def prefix_range(column, prefix):
+    # A half-open range instead of LIKE so SQLite can always use the index
+    if not prefix:
+        return db.true()
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return db.and_(column >= prefix, column < upper)
+
+
+def location_filter(column, norm_column, value, match):
+    if match == 'exact':
+        return norm_column == normalize(value)
+    if match == 'prefix':
+        return prefix_range(norm_column, normalize(value))
+    return column.ilike(f'%{value}%')
+
+
+def matching_bank_ids(bank_name, match):
+    name = normalize(bank_name)
+    banks = [(bank['id'], normalize(bank['name'])) for bank in get_bank_payloads().values()]
+    if match == 'exact':
+        return [bank_id for bank_id, bank in banks if bank == name]
+    if match == 'prefix':
+        return [bank_id for bank_id, bank in banks if bank.startswith(name)]
+    return [bank_id for bank_id, bank in banks if name in bank]
+
+
+def bank_filter(bank_ids):
+    # Banks with IFSC codes of their own become ranges on the unique IFSC
+    # index, which avoids joining banks
+    index = get_bank_code_index()
+    if len(bank_ids) > BANK_RANGE_LIMIT:
+        return Branch.bank_id.in_(bank_ids)
+    conditions = []
+    shared = []
+    for bank_id in bank_ids:
+        codes = index.exclusive_codes(bank_id)
+        if codes is None:
+            shared.append(bank_id)
+        else:
+            conditions.extend(prefix_range(Branch.ifsc, code) for code in codes)
+    if shared:
+        conditions.append(Branch.bank_id.in_(shared))
+    if not conditions:
+        return db.false()
+    return db.or_(*conditions)
+
+
+def filter_branches(query, ifsc=None, city=None, state=None, district=None, bank_name=None,
+                    match='substring'):
+    if match not in MATCH_MODES:
+        raise InvalidFilter(f"match must be one of: {', '.join(MATCH_MODES)}")
+
+    if ifsc:
+        if match == 'exact':
+            query = query.filter(Branch.ifsc == ifsc.strip().upper())
+        elif match == 'prefix':
+            query = query.filter(prefix_range(Branch.ifsc, ifsc.strip().upper()))
+        else:
+            query = query.filter(Branch.ifsc.ilike(f'%{ifsc}%'))
+    if city:
+        query = query.filter(location_filter(Branch.city, Branch.city_norm, city, match))
+    if state:
+        query = query.filter(location_filter(Branch.state, Branch.state_norm, state, match))
+    if district:
+        query = query.filter(location_filter(Branch.district, Branch.district_norm, district, match))
+    if bank_name:
+        query = query.filter(bank_filter(matching_bank_ids(bank_name, match)))
+    return query
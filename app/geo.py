@@ -0,0 +1,118 @@
+from collections import Counter, defaultdict
+from .models import normalize
+
+
+def geo_key(value):
+    return normalize(value) or ''
+
+
+def sort_key(node):
+    return geo_key(node.name)
+
+
+class GeoNode:
+    __slots__ = ('name', 'branch_count', 'banks', 'children')
+
+    def __init__(self, name):
+        self.name = name
+        self.branch_count = 0
+        self.banks = Counter()
+        self.children = {}
+
+    def add(self, bank_id, count):
+        self.branch_count += count
+        self.banks[bank_id] += count
+
+    def child(self, name):
+        key = geo_key(name)
+        node = self.children.get(key)
+        if node is None:
+            node = self.children[key] = GeoNode(name)
+        return node
+
+
+# State -> district -> city -> bank branch counts, built from the grouped
+# location rows of the stats snapshot. This is the one aggregation of those
+# rows; the snapshot's breakdowns are read off the tree. Every listing is
+# materialized up front so a request is a dictionary lookup.
+class GeoHierarchy:
+    def __init__(self, bank_names, rows):
+        self.root = root = GeoNode(None)
+        for bank_id, state, district, city, count in rows:
+            state_node = root.child(state)
+            district_node = state_node.child(district)
+            city_node = district_node.child(city)
+            for node in (root, state_node, district_node, city_node):
+                node.add(bank_id, count)
+
+        self.states = [
+            {
+                'state': node.name,
+                'branch_count': node.branch_count,
+                'bank_count': len(node.banks),
+                'district_count': len(node.children)
+            }
+            for node in sorted(root.children.values(), key=sort_key)
+        ]
+        self.districts = {}
+        self.cities = defaultdict(list)
+        self.banks = defaultdict(list)
+        for state_key, state_node in root.children.items():
+            self.districts[state_key] = [
+                {
+                    'district': node.name,
+                    'state': state_node.name,
+                    'branch_count': node.branch_count,
+                    'bank_count': len(node.banks),
+                    'city_count': len(node.children)
+                }
+                for node in sorted(state_node.children.values(), key=sort_key)
+            ]
+            for district_key, district_node in state_node.children.items():
+                self.cities[district_key].extend(
+                    {
+                        'city': node.name,
+                        'district': district_node.name,
+                        'state': state_node.name,
+                        'branch_count': node.branch_count,
+                        'bank_count': len(node.banks)
+                    }
+                    for node in sorted(district_node.children.values(), key=sort_key)
+                )
+                for city_key, city_node in district_node.children.items():
+                    self.banks[city_key].extend(
+                        {
+                            'bank_id': bank_id,
+                            'bank_name': bank_names.get(bank_id),
+                            'city': city_node.name,
+                            'district': district_node.name,
+                            'state': state_node.name,
+                            'branch_count': count
+                        }
+                        for bank_id, count in sorted(
+                            city_node.banks.items(),
+                            key=lambda item: (-item[1], bank_names.get(item[0]) or '')
+                        )
+                    )
+        self.cities = dict(self.cities)
+        self.banks = dict(self.banks)
+
+    def districts_for_state(self, state):
+        return self.districts.get(geo_key(state))
+
+    def cities_for_district(self, district, state=None):
+        # District names repeat across states; state narrows them down
+        cities = self.cities.get(geo_key(district))
+        if cities is None or not state:
+            return cities
+        return [city for city in cities if geo_key(city['state']) == geo_key(state)] or None
+
+    def banks_for_city(self, city, district=None, state=None):
+        banks = self.banks.get(geo_key(city))
+        if banks is None:
+            return None
+        if district:
+            banks = [bank for bank in banks if geo_key(bank['district']) == geo_key(district)]
+        if state:
+            banks = [bank for bank in banks if geo_key(bank['state']) == geo_key(state)]
+        return banks or None
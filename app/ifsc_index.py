@@ -0,0 +1,149 @@
+import json
+import logging
+from bisect import bisect_left
+from sqlalchemy import text
+from sqlalchemy.orm import make_transient_to_detached
+from .indexes import current_indexes
+from .models import db, Bank, Branch
+
+logger = logging.getLogger(__name__)
+
+# Prebuilt payloads persisted into database snapshots so workers load the
+# index with one sequential read instead of re-serializing every branch.
+STORED_TABLE = 'ifsc_index'
+
+
+# Sorted IFSC codes with the pre-serialized branch JSON in a parallel list,
+# so a lookup is a bisect over plain strings and never touches SQLite.
+class IfscIndex:
+    def __init__(self, codes, payloads):
+        self.codes = codes
+        self.payloads = payloads
+
+    def __len__(self):
+        return len(self.codes)
+
+    def get(self, ifsc):
+        i = bisect_left(self.codes, ifsc)
+        if i < len(self.codes) and self.codes[i] == ifsc:
+            return self.payloads[i]
+        return None
+
+
+def branch_payload(row, banks):
+    return json.dumps({
+        'id': row.id,
+        'ifsc': row.ifsc,
+        'branch': row.branch,
+        'address': row.address,
+        'city': row.city,
+        'district': row.district,
+        'state': row.state,
+        'bank_id': row.bank_id,
+        'bank': banks.get(row.bank_id)
+    }, sort_keys=True, separators=(',', ':'))
+
+
+def branch_payload_rows():
+    return db.session.query(
+        Branch.id, Branch.ifsc, Branch.branch, Branch.address,
+        Branch.city, Branch.district, Branch.state, Branch.bank_id
+    )
+
+
+def build_ifsc_index(banks):
+    rows = branch_payload_rows().order_by(Branch.ifsc).yield_per(10000)
+
+    codes = []
+    payloads = []
+    for row in rows:
+        codes.append(row.ifsc)
+        payloads.append(branch_payload(row, banks))
+
+    return IfscIndex(codes, payloads)
+
+
+def update_ifsc_index(index, banks, ifscs, bank_ids=()):
+    # A copy of index with only the given codes and every branch of the
+    # given banks re-serialized
+    entries = dict(zip(index.codes, index.payloads))
+    codes = list(ifscs)
+    for code in codes:
+        entries.pop(code, None)
+    queries = [branch_payload_rows().filter(Branch.bank_id.in_(bank_ids))] if bank_ids else []
+    queries += [
+        branch_payload_rows().filter(Branch.ifsc.in_(codes[start:start + 500]))
+        for start in range(0, len(codes), 500)
+    ]
+    for query in queries:
+        for row in query.yield_per(10000):
+            entries[row.ifsc] = branch_payload(row, banks)
+
+    ordered = sorted(entries)
+    logger.info(f"IFSC index updated for {len(codes)} branches and {len(bank_ids)} banks")
+    return IfscIndex(ordered, [entries[code] for code in ordered])
+
+
+def store_ifsc_index(index):
+    drop_stored_ifsc_index()
+    db.session.execute(text(
+        f"CREATE TABLE {STORED_TABLE} (ifsc TEXT PRIMARY KEY, payload TEXT NOT NULL) WITHOUT ROWID"
+    ))
+    db.session.execute(
+        text(f"INSERT INTO {STORED_TABLE} (ifsc, payload) VALUES (:ifsc, :payload)"),
+        [{'ifsc': code, 'payload': payload} for code, payload in zip(index.codes, index.payloads)]
+    )
+    db.session.commit()
+
+
+def drop_stored_ifsc_index():
+    db.session.execute(text(f"DROP TABLE IF EXISTS {STORED_TABLE}"))
+    db.session.commit()
+
+
+def load_stored_ifsc_index():
+    exists = db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {'name': STORED_TABLE}
+    ).first()
+    if not exists:
+        return None
+
+    rows = db.session.execute(text(f"SELECT ifsc, payload FROM {STORED_TABLE} ORDER BY ifsc"))
+    codes = []
+    payloads = []
+    for code, payload in rows:
+        codes.append(code)
+        payloads.append(payload)
+    return IfscIndex(codes, payloads)
+
+
+def load_ifsc_index(banks):
+    index = load_stored_ifsc_index()
+    if index is None:
+        index = build_ifsc_index(banks)
+    logger.info(f"IFSC index built with {len(index)} branches")
+    return index
+
+
+def get_ifsc_index():
+    return current_indexes().ifsc
+
+
+def load_bank(bank_data):
+    bank = Bank(id=bank_data['id'], name=bank_data['name'])
+    make_transient_to_detached(bank)
+    return db.session.merge(bank, load=False)
+
+
+def load_branch(payload):
+    # Attach the indexed branch (and its bank) to the session without a query
+    data = json.loads(payload)
+    bank_data = data.pop('bank')
+
+    if bank_data:
+        load_bank(bank_data)
+
+    branch = Branch(**data)
+    make_transient_to_detached(branch)
+    return db.session.merge(branch, load=False)
@@ -0,0 +1,26 @@
+from collections import namedtuple
+
+# Every in-memory structure derived from one dataset version. A refresh
+# builds a complete new set and publishes it with one reference swap, so a
+# request sees either the old set or the new one, never a mix.
+IndexSet = namedtuple('IndexSet', [
+    'version', 'branch_counts', 'bank_payloads', 'bank_codes', 'stats', 'suggest', 'ifsc'
+])
+
+_indexes = None
+
+
+def publish_indexes(indexes):
+    global _indexes
+    _indexes = indexes
+    return indexes
+
+
+def get_indexes():
+    return _indexes
+
+
+def current_indexes():
+    if _indexes is None:
+        raise RuntimeError("In-memory indexes have not been built yet")
+    return _indexes
@@ -0,0 +1,30 @@
+from promise import Promise
+from promise.dataloader import DataLoader
+from sqlalchemy.orm.util import identity_key
+from .models import db, Bank
+
+
+def fetch_banks(bank_ids):
+    return {bank.id: bank for bank in Bank.query.filter(Bank.id.in_(bank_ids))}
+
+
+class BankLoader(DataLoader):
+    def batch_load_fn(self, bank_ids):
+        banks = fetch_banks(bank_ids)
+        return Promise.resolve([banks.get(bank_id) for bank_id in bank_ids])
+
+    def prime_for(self, branches):
+        # Load every missing bank of a result set in one query so the
+        # per-row resolvers hit the identity map instead of promises.
+        missing = {
+            branch.bank_id for branch in branches
+            if db.session.identity_map.get(identity_key(Bank, branch.bank_id)) is None
+        }
+        if missing:
+            for bank_id, bank in fetch_banks(missing).items():
+                self.prime(bank_id, bank)
+        return branches
+
+
+def create_loaders():
+    return {'bank_loader': BankLoader()}
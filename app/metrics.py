@@ -0,0 +1,259 @@
+import heapq
+import itertools
+import logging
+import queue
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from .models import db
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+PROMETHEUS_MIMETYPE = 'text/plain; version=0.0.4'
+EXPLAIN_STATEMENTS = 5
+EXPLAIN_QUEUE_SIZE = 100
+
+statement_order = itertools.count()
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(names, values, extra=''):
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, label_values, value):
+        series = self.series.get(label_values)
+        if series is None:
+            series = self.series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for label_values, (counts, total) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = format_labels(self.labels, label_values, f'le="{bound}"')
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            cumulative += counts[-1]
+            labels = format_labels(self.labels, label_values, 'le="+Inf"')
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            lines.append(f'{self.name}_sum{format_labels(self.labels, label_values)} {total}')
+            lines.append(f'{self.name}_count{format_labels(self.labels, label_values)} {cumulative}')
+        return lines
+
+
+# Per-process request metrics; each gunicorn/uvicorn worker keeps its own.
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = Counter()
+        route = ('endpoint', 'method')
+        self.latency = Histogram(
+            'http_request_duration_seconds', 'Time spent handling a request.', route, LATENCY_BUCKETS
+        )
+        self.response_size = Histogram(
+            'http_response_size_bytes', 'Size of buffered response bodies.', route, SIZE_BUCKETS
+        )
+        self.sql_statements = Histogram(
+            'http_request_sql_statements', 'SQL statements executed per request.', route, COUNT_BUCKETS
+        )
+        self.sql_time = Histogram(
+            'http_request_sql_seconds', 'Time spent in SQL per request.', route, LATENCY_BUCKETS
+        )
+        self.serialization_time = Histogram(
+            'http_request_serialization_seconds', 'Time spent encoding JSON per request.', route,
+            LATENCY_BUCKETS
+        )
+
+    def observe_request(self, endpoint, method, status, seconds, size=None,
+                        sql_count=0, sql_seconds=0.0, serialization_seconds=0.0):
+        route = (endpoint, method)
+        with self.lock:
+            self.requests[(endpoint, method, str(status))] += 1
+            self.latency.observe(route, seconds)
+            if size is not None:
+                self.response_size.observe(route, size)
+            self.sql_statements.observe(route, sql_count)
+            self.sql_time.observe(route, sql_seconds)
+            self.serialization_time.observe(route, serialization_seconds)
+
+    def render(self):
+        with self.lock:
+            lines = [
+                '# HELP http_requests_total Requests handled, by route and status.',
+                '# TYPE http_requests_total counter'
+            ]
+            for label_values, count in sorted(self.requests.items()):
+                labels = format_labels(('endpoint', 'method', 'status'), label_values)
+                lines.append(f'http_requests_total{labels} {count}')
+            for histogram in (self.latency, self.response_size, self.sql_statements,
+                              self.sql_time, self.serialization_time):
+                lines.extend(histogram.render())
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+def instrument_engine(engine):
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_statement(conn, cursor, statement, parameters, context, executemany):
+        # One value per connection: statements on a connection never overlap,
+        # and a statement that raises is simply overwritten by the next one
+        conn.info['metrics_query_start'] = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def finish_statement(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop('metrics_query_start')
+        if not has_request_context() or 'metrics_start' not in g:
+            return
+        seconds = time.perf_counter() - started
+        g.metrics_sql_count += 1
+        g.metrics_sql_seconds += seconds
+        if g.metrics_sql_log is not None:
+            # Only the slowest statements are kept, in a bounded min-heap
+            entry = (seconds, next(statement_order), statement, None if executemany else parameters)
+            if len(g.metrics_sql_log) < EXPLAIN_STATEMENTS:
+                heapq.heappush(g.metrics_sql_log, entry)
+            else:
+                heapq.heappushpop(g.metrics_sql_log, entry)
+
+
+def instrument_json(app):
+    encode = app.json.response
+
+    def timed_response(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return encode(*args, **kwargs)
+        finally:
+            if has_request_context() and 'metrics_start' in g:
+                g.metrics_serialization_seconds += time.perf_counter() - start
+
+    app.json.response = timed_response
+
+
+def explain(statement, parameters):
+    with db.engine.connect() as connection:
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters or ())
+        return [row[-1] for row in rows]
+
+
+# Query plans of slow requests are looked up on a background thread, after
+# the response has gone out, so logging never makes a slow request slower.
+class ExplainWorker:
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=EXPLAIN_QUEUE_SIZE)
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def submit(self, app, label, statements):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='slow-request-explain', daemon=True)
+                self.thread.start()
+        try:
+            self.queue.put_nowait((app, label, statements))
+        except queue.Full:
+            logger.warning(f"Dropped query plans for {label}: explain queue is full")
+
+    def run(self):
+        while True:
+            app, label, statements = self.queue.get()
+            try:
+                with app.app_context():
+                    for statement, parameters in statements:
+                        try:
+                            plan = explain(statement, parameters)
+                        except Exception as e:
+                            plan = [f"EXPLAIN failed: {str(e)}"]
+                        logger.warning(
+                            f"Query plan for {label}: {' '.join(statement.split())}"
+                            + ''.join(f"\n    {detail}" for detail in plan)
+                        )
+            except Exception as e:
+                logger.error(f"Error explaining slow request statements: {str(e)}")
+            finally:
+                self.queue.task_done()
+
+
+explain_worker = ExplainWorker()
+
+
+def log_slow_request(seconds, response):
+    label = f"{request.method} {request.full_path.rstrip('?')}"
+    logger.warning(
+        f"Slow request {label} -> {response.status_code} "
+        f"in {seconds * 1000:.1f}ms ({g.metrics_sql_count} SQL statements, "
+        f"{g.metrics_sql_seconds * 1000:.1f}ms in SQL)"
+    )
+    slowest = sorted(g.metrics_sql_log, reverse=True)
+    for statement_seconds, _, statement, parameters in slowest:
+        logger.warning(f"  {statement_seconds * 1000:.1f}ms {' '.join(statement.split())} {parameters!r}")
+    selects = [
+        (statement, parameters) for _, _, statement, parameters in slowest
+        if statement.lstrip().upper().startswith('SELECT')
+    ]
+    if selects:
+        explain_worker.submit(current_app._get_current_object(), label, selects)
+
+
+def register_metrics(app):
+    if not app.config.get('METRICS_ENABLED'):
+        return
+    slow_threshold = app.config.get('SLOW_REQUEST_THRESHOLD_MS')
+
+    with app.app_context():
+        instrument_engine(db.engine)
+    instrument_json(app)
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_start = time.perf_counter()
+        g.metrics_sql_count = 0
+        g.metrics_sql_seconds = 0.0
+        g.metrics_serialization_seconds = 0.0
+        g.metrics_sql_log = [] if slow_threshold is not None else None
+
+    @app.after_request
+    def record_request_metrics(response):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return response
+        seconds = time.perf_counter() - start
+        metrics.observe_request(
+            request.endpoint or 'unmatched', request.method, response.status_code, seconds,
+            size=None if response.is_streamed else response.content_length,
+            sql_count=g.metrics_sql_count,
+            sql_seconds=g.metrics_sql_seconds,
+            serialization_seconds=g.metrics_serialization_seconds
+        )
+        if slow_threshold is not None and seconds * 1000 >= slow_threshold:
+            log_slow_request(seconds, response)
+        return response
+
+    @app.route('/metrics', methods=['GET'])
+    def get_metrics():
+        return app.response_class(metrics.render(), mimetype=PROMETHEUS_MIMETYPE)
@@ -2,6 +2,14 @@ from flask_sqlalchemy import SQLAlchemy
 
 db = SQLAlchemy()
 
+def normalize(value):
+    return value.strip().upper() if value else value
+
+def normalized(column):
+    def default(context):
+        return normalize(context.get_current_parameters().get(column))
+    return default
+
 class Bank(db.Model):
     __tablename__ = 'banks'
     
@@ -19,6 +27,15 @@ class Bank(db.Model):
 
 class Branch(db.Model):
     __tablename__ = 'branches'
+    __table_args__ = (
+        db.Index('ix_branches_location', 'state_norm', 'district_norm', 'city_norm'),
+        db.Index('ix_branches_district_city', 'district_norm', 'city_norm'),
+        db.Index('ix_branches_city_norm', 'city_norm'),
+        db.Index('ix_branches_bank_city', 'bank_id', 'city_norm'),
+    )
+    
+    # Uppercased copies of the location columns for exact and prefix filters
+    NORMALIZED_COLUMNS = {'city_norm': 'city', 'district_norm': 'district', 'state_norm': 'state'}
     
     id = db.Column(db.Integer, primary_key=True)
     ifsc = db.Column(db.String(20), unique=True, nullable=False, index=True)
@@ -28,6 +45,9 @@ class Branch(db.Model):
     district = db.Column(db.String(50), index=True)
     state = db.Column(db.String(50), index=True)
     bank_id = db.Column(db.Integer, db.ForeignKey('banks.id'), nullable=False)
+    city_norm = db.Column(db.String(50), default=normalized('city'))
+    district_norm = db.Column(db.String(50), default=normalized('district'))
+    state_norm = db.Column(db.String(50), default=normalized('state'))
     
     def to_dict(self):
         return {
@@ -41,3 +61,45 @@ class Branch(db.Model):
             'bank_id': self.bank_id,
             'bank': self.bank.to_dict() if self.bank else None
         }
+
+class DatasetVersion(db.Model):
+    __tablename__ = 'dataset_versions'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.String(64), nullable=False)
+    loaded_at = db.Column(db.DateTime, nullable=False)
+    total_banks = db.Column(db.Integer, nullable=False)
+    total_branches = db.Column(db.Integer, nullable=False)
+    
+    def to_dict(self):
+        return {
+            'version': self.version,
+            'loaded_at': self.loaded_at.isoformat(),
+            'total_banks': self.total_banks,
+            'total_branches': self.total_branches
+        }
+
+class DatasetChange(db.Model):
+    __tablename__ = 'dataset_changes'
+    __table_args__ = (
+        db.Index('ix_dataset_changes_version', 'version', 'base_version'),
+    )
+    
+    # One row per branch inserted, updated or deleted by an incremental sync
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.String(64), nullable=False)
+    base_version = db.Column(db.String(64), nullable=False)
+    ifsc = db.Column(db.String(20), nullable=False)
+    operation = db.Column(db.String(10), nullable=False)
+    bank_id = db.Column(db.Integer)
+    previous_bank_id = db.Column(db.Integer)
+    
+    def to_dict(self):
+        return {
+            'version': self.version,
+            'base_version': self.base_version,
+            'ifsc': self.ifsc,
+            'operation': self.operation,
+            'bank_id': self.bank_id,
+            'previous_bank_id': self.previous_bank_id
+        }
@@ -0,0 +1,69 @@
+import base64
+import binascii
+import json
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class CursorPage:
+    def __init__(self, items, per_page, next_cursor, total=None):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.has_next = next_cursor is not None
+        self.total = total
+
+
+def encode_cursor(*values):
+    raw = json.dumps(list(values), separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, *types):
+    # types gives the expected type of each value; the values end up as SQL
+    # parameters, so anything else is rejected here
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor('Invalid cursor')
+    if not isinstance(values, list) or len(values) != len(types):
+        raise InvalidCursor('Invalid cursor')
+    for value, expected in zip(values, types):
+        if isinstance(value, bool) or not isinstance(value, expected):
+            raise InvalidCursor('Invalid cursor')
+    return values
+
+
+def keyset_paginate(query, column, after, per_page, with_total=False):
+    per_page = max(per_page, 1)
+    total = query.order_by(None).count() if with_total else None
+
+    if after:
+        last_key, = decode_cursor(after, int)
+        query = query.filter(column > last_key)
+
+    items = query.order_by(column).limit(per_page + 1).all()
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        next_cursor = encode_cursor(getattr(items[-1], column.key))
+
+    return CursorPage(items, per_page, next_cursor, total)
+
+
+def wants_total(args):
+    return args.get('with_total', '').lower() in ('1', 'true')
+
+
+def cursor_pagination(page):
+    pagination = {
+        'per_page': page.per_page,
+        'next_cursor': page.next_cursor,
+        'has_next': page.has_next
+    }
+    if page.total is not None:
+        pagination['total'] = page.total
+    return pagination
@@ -0,0 +1,93 @@
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+from graphql import parse, validate
+from graphql.error import GraphQLSyntaxError
+
+PreparedQuery = namedtuple('PreparedQuery', ['document', 'errors'])
+
+
+class PersistedQueryNotFound(LookupError):
+    pass
+
+
+class PersistedQueryMismatch(ValueError):
+    pass
+
+
+# Parsed and validated documents keyed by the SHA-256 of their text, so
+# repeated queries skip parsing and validation. Clients can also send just
+# the hash (Apollo automatic persisted queries) once a query is registered.
+class QueryCache:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+query_cache = QueryCache(1000)
+
+
+def query_hash(query):
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+def prepare_query(schema, query):
+    try:
+        document = parse(query)
+    except GraphQLSyntaxError as e:
+        return PreparedQuery(None, [e])
+    return PreparedQuery(document, validate(schema, document))
+
+
+def resolve_query(schema, query, persisted_hash=None):
+    if query is None:
+        if not persisted_hash:
+            raise ValueError('Must provide query string')
+        prepared = query_cache.get(persisted_hash)
+        if prepared is None:
+            raise PersistedQueryNotFound(persisted_hash)
+        return prepared
+
+    key = query_hash(query)
+    if persisted_hash and persisted_hash != key:
+        raise PersistedQueryMismatch('provided sha does not match query')
+
+    prepared = query_cache.get(key)
+    if prepared is None:
+        prepared = prepare_query(schema, query)
+        if prepared.document is not None:
+            query_cache.put(key, prepared)
+    return prepared
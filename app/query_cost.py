@@ -0,0 +1,150 @@
+import logging
+from graphql.language import ast
+from graphql.type.definition import GraphQLList, GraphQLNonNull
+from .models import Bank, Branch
+from .serializers import get_branch_counts
+from .stats import get_stats_snapshot
+
+logger = logging.getLogger(__name__)
+
+PAGE_ARGUMENTS = ('first', 'last', 'limit')
+
+
+class QueryTooExpensive(ValueError):
+    pass
+
+
+def unwrap(graphql_type):
+    while isinstance(graphql_type, (GraphQLList, GraphQLNonNull)):
+        graphql_type = graphql_type.of_type
+    return graphql_type
+
+
+def graphene_meta(graphql_type):
+    return getattr(getattr(graphql_type, 'graphene_type', None), '_meta', None)
+
+
+def literal_value(value, variables):
+    if isinstance(value, ast.Variable):
+        return variables.get(value.name.value)
+    if isinstance(value, ast.IntValue):
+        return int(value.value)
+    if isinstance(value, ast.ListValue):
+        return [literal_value(item, variables) for item in value.values]
+    if isinstance(value, ast.ObjectValue):
+        return {field.name.value: literal_value(field.value, variables) for field in value.fields}
+    return getattr(value, 'value', None)
+
+
+def table_size(model):
+    snapshot = get_stats_snapshot()
+    return {Bank: snapshot.total_banks, Branch: snapshot.total_branches}.get(model, 0)
+
+
+# Walks a validated document and estimates how many rows resolving it
+# loads: list and connection fields multiply the rows below them by their
+# page size, and every field returning a model object counts its rows.
+class QueryCostAnalyzer:
+    def __init__(self, schema, document, variables, list_limit):
+        self.schema = schema
+        self.variables = variables or {}
+        self.list_limit = list_limit
+        self.operations = [
+            definition for definition in document.definitions
+            if isinstance(definition, ast.OperationDefinition)
+        ]
+        self.fragments = {
+            definition.name.value: definition for definition in document.definitions
+            if isinstance(definition, ast.FragmentDefinition)
+        }
+
+    def analyze(self, operation_name=None):
+        operations = [
+            operation for operation in self.operations
+            if operation_name is None or (operation.name and operation.name.value == operation_name)
+        ]
+        if not operations:
+            return 0, 0
+        return self.selection_cost(
+            self.schema.get_query_type(), operations[0].selection_set, 1, 1, frozenset()
+        )
+
+    def fragment_type(self, fragment, parent_type):
+        if fragment.type_condition is None:
+            return parent_type
+        return self.schema.get_type(fragment.type_condition.name.value) or parent_type
+
+    def field_size(self, parent_type, field, args):
+        for name in PAGE_ARGUMENTS:
+            if args.get(name) is not None:
+                return max(int(args[name]), 0)
+        if 'ifscs' in args:
+            return len(args['ifscs'] or [])
+        if 'limit' in field.args:
+            return self.list_limit
+
+        connection = graphene_meta(unwrap(field.type))
+        node = getattr(connection, 'node', None)
+        if node is None:
+            return 1
+        if parent_type is self.schema.get_query_type():
+            # Root connections are keyset pages capped at the list limit
+            return min(table_size(node._meta.model), self.list_limit)
+        # Unpaged relationship connections, e.g. bank { branches }
+        return max(get_branch_counts().values(), default=0)
+
+    def selection_cost(self, parent_type, selection_set, multiplier, depth, visited):
+        cost = 0
+        max_depth = depth - 1
+        for selection in selection_set.selections:
+            if isinstance(selection, ast.FragmentSpread):
+                name = selection.name.value
+                fragment = self.fragments.get(name)
+                if fragment is None or name in visited:
+                    continue
+                sub_cost, sub_depth = self.selection_cost(
+                    self.fragment_type(fragment, parent_type), fragment.selection_set,
+                    multiplier, depth, visited | {name}
+                )
+            elif isinstance(selection, ast.InlineFragment):
+                sub_cost, sub_depth = self.selection_cost(
+                    self.fragment_type(selection, parent_type), selection.selection_set,
+                    multiplier, depth, visited
+                )
+            else:
+                name = selection.name.value
+                fields = getattr(parent_type, 'fields', {})
+                if name.startswith('__') or name not in fields:
+                    continue
+                field = fields[name]
+                field_type = unwrap(field.type)
+                args = {
+                    argument.name.value: literal_value(argument.value, self.variables)
+                    for argument in selection.arguments or []
+                }
+                rows = multiplier * self.field_size(parent_type, field, args)
+                sub_cost = rows if getattr(graphene_meta(field_type), 'model', None) else 0
+                sub_depth = depth
+                if selection.selection_set:
+                    child_cost, sub_depth = self.selection_cost(
+                        field_type, selection.selection_set, rows, depth + 1, visited
+                    )
+                    sub_cost += child_cost
+            cost += sub_cost
+            max_depth = max(max_depth, sub_depth)
+        return cost, max_depth
+
+
+def check_query_cost(schema, document, variables, operation_name, config):
+    analyzer = QueryCostAnalyzer(schema, document, variables, config['GRAPHQL_LIST_LIMIT'])
+    cost, depth = analyzer.analyze(operation_name)
+    if depth > config['GRAPHQL_MAX_DEPTH']:
+        raise QueryTooExpensive(
+            f"Query depth {depth} exceeds the maximum of {config['GRAPHQL_MAX_DEPTH']}"
+        )
+    if cost > config['GRAPHQL_MAX_COST']:
+        raise QueryTooExpensive(
+            f"Query would load an estimated {cost} rows, more than the maximum of "
+            f"{config['GRAPHQL_MAX_COST']}; add first/limit arguments to narrow it"
+        )
+    return cost, depth
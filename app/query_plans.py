@@ -0,0 +1,31 @@
+import itertools
+from .metrics import explain
+from .models import db
+
+# Filter values for checking that every combination of the REST filters is
+# planned as an index lookup (tests/test_query_plans.py, benchmarks/query_plans.py)
+SAMPLE_FILTERS = {
+    'ifsc': 'SBIN0001',
+    'city': 'Mumbai',
+    'state': 'Maharashtra',
+    'district': 'Mumbai',
+    'bank_name': 'State Bank of India',
+}
+FILTER_COMBINATIONS = [
+    (match, names)
+    for match in ('exact', 'prefix')
+    for size in range(1, len(SAMPLE_FILTERS) + 1)
+    for names in itertools.combinations(SAMPLE_FILTERS, size)
+]
+
+
+def query_plan(query):
+    # Explained with bound parameters, as the app runs it: SQLite may plan
+    # an inlined literal differently from a ? placeholder
+    compiled = query.statement.compile(dialect=db.engine.dialect, compile_kwargs={'render_postcompile': True})
+    params = compiled.construct_params()
+    return explain(compiled.string, tuple(params[name] for name in compiled.positiontup))
+
+
+def table_scans(plan):
+    return [detail for detail in plan if detail.startswith(('SCAN branches', 'SCAN banks'))]
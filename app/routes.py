@@ -1,12 +1,43 @@
-from flask import request, jsonify
+from flask import request, jsonify, current_app, stream_with_context
 from flask import request as flask_request
 from .models import db, Bank, Branch
-from .schema import schema
+from .schema import schema, graphql_context
+from .ifsc_index import get_ifsc_index
+from .serializers import branch_rows, serialize_bank, serialize_banks, serialize_branches
+from .search import search_branches as full_text_search, search_branches_after
+from .database import reload_status, start_background_reload
+from .stats import get_stats_snapshot
+from .suggest import MAX_SUGGESTIONS, SUGGEST_FIELDS, suggest
+from .cache import response_cache
+from .version import get_dataset_version
+from .bulk import InvalidBulkRequest, normalize_codes, stream_bulk_response
+from .export import EXPORT_FORMATS, export_rows, stream_csv, stream_ndjson
+from .filters import MATCH_MODES, InvalidFilter, bank_filter, filter_branches
+from .bank_codes import validate_ifsc
+from .pagination import InvalidCursor, keyset_paginate, cursor_pagination, wants_total
+from .persisted_queries import PersistedQueryMismatch, PersistedQueryNotFound, query_cache, resolve_query
+from .query_cost import QueryTooExpensive, check_query_cost
+from graphql.execution import execute as execute_graphql
 import logging
 
 logger = logging.getLogger(__name__)
 
+def ilike_search_query(search_term):
+    return Branch.query.join(Bank).filter(
+        db.or_(
+            Branch.ifsc.ilike(f'%{search_term}%'),
+            Branch.branch.ilike(f'%{search_term}%'),
+            Branch.city.ilike(f'%{search_term}%'),
+            Branch.district.ilike(f'%{search_term}%'),
+            Branch.state.ilike(f'%{search_term}%'),
+            Branch.address.ilike(f'%{search_term}%'),
+            Bank.name.ilike(f'%{search_term}%')
+        )
+    )
+
 def register_routes(app):
+    query_cache.max_entries = app.config.get('GRAPHQL_QUERY_CACHE_SIZE', query_cache.max_entries)
+
     @app.route('/api/banks', methods=['GET'])
     def get_banks():
         try:
@@ -19,7 +50,7 @@ def register_routes(app):
             
             return jsonify({
                 'success': True,
-                'data': [bank.to_dict() for bank in banks.items],
+                'data': serialize_banks(banks.items),
                 'pagination': {
                     'page': page,
                     'per_page': per_page,
@@ -39,16 +70,21 @@ def register_routes(app):
             page = request.args.get('page', 1, type=int)
             per_page = request.args.get('per_page', 100, type=int)
             
+            after = request.args.get('after')
+            
             bank = Bank.query.get_or_404(bank_id)
-            branches = Branch.query.filter_by(bank_id=bank_id).paginate(
-                page=page, per_page=per_page, error_out=False
-            )
+            query = branch_rows(Branch.query.filter(bank_filter([bank_id])))
             
-            return jsonify({
-                'success': True,
-                'bank': bank.to_dict(),
-                'branches': [branch.to_dict() for branch in branches.items],
-                'pagination': {
+            if after is not None:
+                branches = keyset_paginate(
+                    query, Branch.id, after, per_page, with_total=wants_total(request.args)
+                )
+                pagination = cursor_pagination(branches)
+            else:
+                branches = query.paginate(
+                    page=page, per_page=per_page, error_out=False
+                )
+                pagination = {
                     'page': page,
                     'per_page': per_page,
                     'total': branches.total,
@@ -56,7 +92,15 @@ def register_routes(app):
                     'has_next': branches.has_next,
                     'has_prev': branches.has_prev
                 }
+            
+            return jsonify({
+                'success': True,
+                'bank': serialize_bank(bank),
+                'branches': serialize_branches(branches.items),
+                'pagination': pagination
             })
+        except InvalidCursor as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         except Exception as e:
             logger.error(f"Error in get_bank_branches: {str(e)}")
             return jsonify({'success': False, 'error': str(e)}), 500
@@ -69,68 +113,151 @@ def register_routes(app):
             state = request.args.get('state')
             district = request.args.get('district')
             bank_name = request.args.get('bank_name')
+            match = request.args.get('match', 'substring')
             
             page = request.args.get('page', 1, type=int)
             per_page = request.args.get('per_page', 100, type=int)
+            after = request.args.get('after')
             
-            query = Branch.query
-            
-            if ifsc:
-                query = query.filter(Branch.ifsc.ilike(f'%{ifsc}%'))
-            if city:
-                query = query.filter(Branch.city.ilike(f'%{city}%'))
-            if state:
-                query = query.filter(Branch.state.ilike(f'%{state}%'))
-            if district:
-                query = query.filter(Branch.district.ilike(f'%{district}%'))
-            if bank_name:
-                query = query.join(Bank).filter(Bank.name.ilike(f'%{bank_name}%'))
-            
-            branches = query.paginate(
-                page=page, per_page=per_page, error_out=False
+            query = filter_branches(
+                Branch.query, ifsc=ifsc, city=city, state=state, district=district,
+                bank_name=bank_name, match=match
             )
             
+            if after is not None:
+                branches = keyset_paginate(
+                    branch_rows(query), Branch.id, after, per_page,
+                    with_total=wants_total(request.args)
+                )
+                pagination = cursor_pagination(branches)
+            else:
+                branches = branch_rows(query).paginate(
+                    page=page, per_page=per_page, error_out=False
+                )
+                pagination = {
+                    'page': page,
+                    'per_page': per_page,
+                    'total': branches.total,
+                    'pages': branches.pages,
+                    'has_next': branches.has_next,
+                    'has_prev': branches.has_prev
+                }
+            
             return jsonify({
                 'success': True,
-                'data': [branch.to_dict() for branch in branches.items],
+                'data': serialize_branches(branches.items),
                 'filters': {
                     'ifsc': ifsc,
                     'city': city,
                     'state': state,
                     'district': district,
-                    'bank_name': bank_name
+                    'bank_name': bank_name,
+                    'match': match
                 },
-                'pagination': {
-                    'page': page,
-                    'per_page': per_page,
-                    'total': branches.total,
-                    'pages': branches.pages,
-                    'has_next': branches.has_next,
-                    'has_prev': branches.has_prev
-                }
+                'pagination': pagination
             })
+        except (InvalidCursor, InvalidFilter) as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         except Exception as e:
             logger.error(f"Error in get_branches: {str(e)}")
             return jsonify({'success': False, 'error': str(e)}), 500
 
+    @app.route('/api/export', methods=['GET'])
+    def export_branches():
+        try:
+            export_format = request.args.get('format', 'ndjson')
+            if export_format not in EXPORT_FORMATS:
+                return jsonify({
+                    'success': False,
+                    'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"
+                }), 400
+            
+            filters = {
+                'ifsc': request.args.get('ifsc'),
+                'city': request.args.get('city'),
+                'state': request.args.get('state'),
+                'district': request.args.get('district'),
+                'bank_name': request.args.get('bank_name'),
+                'match': request.args.get('match', 'substring')
+            }
+            if filters['match'] not in MATCH_MODES:
+                return jsonify({
+                    'success': False,
+                    'error': f"match must be one of: {', '.join(MATCH_MODES)}"
+                }), 400
+            rows = export_rows(filters)
+            
+            if export_format == 'csv':
+                return app.response_class(
+                    stream_with_context(stream_csv(rows)),
+                    mimetype='text/csv',
+                    headers={'Content-Disposition': 'attachment; filename=branches.csv'}
+                )
+            return app.response_class(
+                stream_with_context(stream_ndjson(rows)),
+                mimetype='application/x-ndjson'
+            )
+        except InvalidFilter as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        except Exception as e:
+            logger.error(f"Error in export_branches: {str(e)}")
+            return jsonify({'success': False, 'error': str(e)}), 500
+
+    @app.route('/api/branches/bulk', methods=['POST'])
+    def get_branches_bulk():
+        try:
+            data = request.get_json(silent=True)
+            # Any JSON body other than an object gets the same 400 as a missing ifscs
+            ifscs = data.get('ifscs') if isinstance(data, dict) else None
+            codes = normalize_codes(ifscs, current_app.config['BULK_LOOKUP_MAX_CODES'])
+            
+            body = stream_bulk_response(codes)
+            if len(codes) > current_app.config['BULK_LOOKUP_STREAM_THRESHOLD']:
+                return app.response_class(stream_with_context(body), mimetype='application/json')
+            return app.response_class(''.join(body), mimetype='application/json')
+        except InvalidBulkRequest as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        except Exception as e:
+            logger.error(f"Error in get_branches_bulk: {str(e)}")
+            return jsonify({'success': False, 'error': str(e)}), 500
+
     @app.route('/api/branches/<ifsc>', methods=['GET'])
     def get_branch_by_ifsc(ifsc):
         try:
+            index = get_ifsc_index()
+            if index is not None:
+                payload = index.get(ifsc.upper())
+                if payload is None:
+                    return jsonify({'success': False, 'error': 'Branch not found'}), 404
+                return app.response_class(
+                    '{"data":' + payload + ',"success":true}\n',
+                    mimetype='application/json'
+                )
+
             branch = Branch.query.filter_by(ifsc=ifsc.upper()).first_or_404()
             return jsonify({
                 'success': True,
-                'data': branch.to_dict()
+                'data': serialize_branches([branch])[0]
             })
         except Exception as e:
             logger.error(f"Error in get_branch_by_ifsc: {str(e)}")
             return jsonify({'success': False, 'error': str(e)}), 500
 
+    @app.route('/api/ifsc/<code>/validate', methods=['GET'])
+    def validate_ifsc_code(code):
+        try:
+            return jsonify({'success': True, 'data': validate_ifsc(code)})
+        except Exception as e:
+            logger.error(f"Error in validate_ifsc_code: {str(e)}")
+            return jsonify({'success': False, 'error': str(e)}), 500
+
     @app.route('/api/search', methods=['GET'])
     def search_branches():
         try:
             search_term = request.args.get('q', '').strip()
             page = request.args.get('page', 1, type=int)
             per_page = request.args.get('per_page', 50, type=int)
+            after = request.args.get('after')
             
             if not search_term:
                 return jsonify({
@@ -138,27 +265,26 @@ def register_routes(app):
                     'error': 'Search term (q) is required'
                 }), 400
             
-            query = Branch.query.join(Bank).filter(
-                db.or_(
-                    Branch.ifsc.ilike(f'%{search_term}%'),
-                    Branch.branch.ilike(f'%{search_term}%'),
-                    Branch.city.ilike(f'%{search_term}%'),
-                    Branch.district.ilike(f'%{search_term}%'),
-                    Branch.state.ilike(f'%{search_term}%'),
-                    Branch.address.ilike(f'%{search_term}%'),
-                    Bank.name.ilike(f'%{search_term}%')
-                )
-            )
-            
-            branches = query.paginate(
-                page=page, per_page=per_page, error_out=False
-            )
+            use_fts = current_app.config.get('SEARCH_BACKEND') == 'fts'
             
-            return jsonify({
-                'success': True,
-                'search_term': search_term,
-                'data': [branch.to_dict() for branch in branches.items],
-                'pagination': {
+            if after is not None:
+                with_total = wants_total(request.args)
+                if use_fts:
+                    branches = search_branches_after(search_term, after, per_page, with_total)
+                else:
+                    branches = keyset_paginate(
+                        branch_rows(ilike_search_query(search_term)), Branch.id, after,
+                        per_page, with_total=with_total
+                    )
+                pagination = cursor_pagination(branches)
+            else:
+                if use_fts:
+                    branches = full_text_search(search_term, page, per_page)
+                else:
+                    branches = branch_rows(ilike_search_query(search_term)).paginate(
+                        page=page, per_page=per_page, error_out=False
+                    )
+                pagination = {
                     'page': page,
                     'per_page': per_page,
                     'total': branches.total,
@@ -166,7 +292,15 @@ def register_routes(app):
                     'has_next': branches.has_next,
                     'has_prev': branches.has_prev
                 }
+            
+            return jsonify({
+                'success': True,
+                'search_term': search_term,
+                'data': serialize_branches(branches.items),
+                'pagination': pagination
             })
+        except InvalidCursor as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         except Exception as e:
             logger.error(f"Error in search_branches: {str(e)}")
             return jsonify({'success': False, 'error': str(e)}), 500
@@ -174,42 +308,157 @@ def register_routes(app):
     @app.route('/api/stats', methods=['GET'])
     def get_stats():
         try:
-            total_banks = Bank.query.count()
-            total_branches = Branch.query.count()
+            return jsonify({
+                'success': True,
+                'data': get_stats_snapshot().summary()
+            })
+        except Exception as e:
+            logger.error(f"Error in get_stats: {str(e)}")
+            return jsonify({'success': False, 'error': str(e)}), 500
+
+    @app.route('/api/stats/<breakdown>', methods=['GET'])
+    def get_stats_breakdown(breakdown):
+        try:
+            limit = request.args.get('limit', 50, type=int)
+            snapshot = get_stats_snapshot()
             
-            top_banks = db.session.query(
-                Bank.name,
-                db.func.count(Branch.id).label('branch_count')
-            ).join(Branch).group_by(Bank.id, Bank.name).order_by(
-                db.func.count(Branch.id).desc()
-            ).limit(10).all()
+            if breakdown == 'districts_by_state':
+                state = request.args.get('state')
+                if state:
+                    districts = snapshot.districts_for_state(state)
+                    if districts is None:
+                        return jsonify({'success': False, 'error': 'State not found'}), 404
+                    data = districts[:limit]
+                else:
+                    data = {
+                        state: districts[:limit]
+                        for state, districts in snapshot.districts_by_state.items()
+                    }
+            elif breakdown in snapshot.breakdowns:
+                data = snapshot.breakdowns[breakdown][:limit]
+            else:
+                return jsonify({
+                    'success': False,
+                    'error': f"Unknown breakdown '{breakdown}'",
+                    'available': sorted([*snapshot.breakdowns, 'districts_by_state'])
+                }), 404
             
-            branches_by_state = db.session.query(
-                Branch.state,
-                db.func.count(Branch.id).label('branch_count')
-            ).group_by(Branch.state).order_by(
-                db.func.count(Branch.id).desc()
-            ).limit(10).all()
+            return jsonify({
+                'success': True,
+                'breakdown': breakdown,
+                'data': data
+            })
+        except Exception as e:
+            logger.error(f"Error in get_stats_breakdown: {str(e)}")
+            return jsonify({'success': False, 'error': str(e)}), 500
+
+    @app.route('/api/suggest', methods=['GET'])
+    def get_suggestions():
+        try:
+            prefix = request.args.get('q', '').strip()
+            field = request.args.get('field')
+            limit = request.args.get('limit', 10, type=int)
+            
+            if not prefix:
+                return jsonify({
+                    'success': False,
+                    'error': 'Prefix (q) is required'
+                }), 400
+            if field is not None and field not in SUGGEST_FIELDS:
+                return jsonify({
+                    'success': False,
+                    'error': f"field must be one of: {', '.join(SUGGEST_FIELDS)}"
+                }), 400
             
+            suggestions = suggest(prefix, [field] if field else SUGGEST_FIELDS, limit)
             return jsonify({
                 'success': True,
-                'data': {
-                    'total_banks': total_banks,
-                    'total_branches': total_branches,
-                    'top_banks_by_branches': [
-                        {'bank_name': bank[0], 'branch_count': bank[1]} 
-                        for bank in top_banks
-                    ],
-                    'top_states_by_branches': [
-                        {'state': state[0], 'branch_count': state[1]} 
-                        for state in branches_by_state
-                    ]
-                }
+                'query': prefix,
+                'limit': max(1, min(limit, MAX_SUGGESTIONS)),
+                'data': suggestions[field] if field else suggestions
             })
         except Exception as e:
-            logger.error(f"Error in get_stats: {str(e)}")
+            logger.error(f"Error in get_suggestions: {str(e)}")
+            return jsonify({'success': False, 'error': str(e)}), 500
+
+    @app.route('/api/geo/states', methods=['GET'])
+    def get_geo_states():
+        try:
+            return jsonify({'success': True, 'data': get_stats_snapshot().geo.states})
+        except Exception as e:
+            logger.error(f"Error in get_geo_states: {str(e)}")
             return jsonify({'success': False, 'error': str(e)}), 500
 
+    @app.route('/api/geo/states/<state>/districts', methods=['GET'])
+    def get_geo_districts(state):
+        try:
+            districts = get_stats_snapshot().geo.districts_for_state(state)
+            if districts is None:
+                return jsonify({'success': False, 'error': 'State not found'}), 404
+            return jsonify({'success': True, 'state': state, 'data': districts})
+        except Exception as e:
+            logger.error(f"Error in get_geo_districts: {str(e)}")
+            return jsonify({'success': False, 'error': str(e)}), 500
+
+    @app.route('/api/geo/districts/<district>/cities', methods=['GET'])
+    def get_geo_cities(district):
+        try:
+            state = request.args.get('state')
+            cities = get_stats_snapshot().geo.cities_for_district(district, state)
+            if cities is None:
+                return jsonify({'success': False, 'error': 'District not found'}), 404
+            return jsonify({'success': True, 'district': district, 'state': state, 'data': cities})
+        except Exception as e:
+            logger.error(f"Error in get_geo_cities: {str(e)}")
+            return jsonify({'success': False, 'error': str(e)}), 500
+
+    @app.route('/api/geo/cities/<city>/banks', methods=['GET'])
+    def get_geo_banks(city):
+        try:
+            district = request.args.get('district')
+            state = request.args.get('state')
+            banks = get_stats_snapshot().geo.banks_for_city(city, district, state)
+            if banks is None:
+                return jsonify({'success': False, 'error': 'City not found'}), 404
+            return jsonify({
+                'success': True, 'city': city, 'district': district, 'state': state, 'data': banks
+            })
+        except Exception as e:
+            logger.error(f"Error in get_geo_banks: {str(e)}")
+            return jsonify({'success': False, 'error': str(e)}), 500
+
+    @app.route('/api/cache/stats', methods=['GET'])
+    def get_cache_stats():
+        return jsonify({
+            'success': True,
+            'data': {
+                'dataset_version': get_dataset_version(),
+                'response_cache': response_cache.stats(),
+                'graphql_query_cache': query_cache.stats()
+            }
+        })
+
+    def admin_authorized():
+        token = current_app.config.get('ADMIN_TOKEN')
+        return bool(token) and request.headers.get('X-Admin-Token') == token
+
+    @app.route('/api/admin/reload', methods=['GET', 'POST'])
+    def admin_reload():
+        if not admin_authorized():
+            return jsonify({'success': False, 'error': 'Forbidden'}), 403
+
+        if request.method == 'POST':
+            incremental = request.args.get('mode', 'full') == 'sync'
+            if not start_background_reload(current_app._get_current_object(), incremental=incremental):
+                return jsonify({
+                    'success': False,
+                    'error': 'A reload is already running',
+                    'data': reload_status
+                }), 409
+            return jsonify({'success': True, 'data': reload_status}), 202
+
+        return jsonify({'success': True, 'data': reload_status})
+
     @app.route('/gql', methods=['GET', 'POST'])
     def graphql_server():
         if flask_request.method == 'GET':
@@ -295,28 +544,47 @@ query GetSBIBranches {
             try:
                 data = flask_request.get_json()
                 query = data.get('query')
-                variables = data.get('variables')
+                variables = data.get('variables') or {}
+                operation_name = data.get('operationName')
+                persisted = (data.get('extensions') or {}).get('persistedQuery') or {}
+                
+                try:
+                    prepared = resolve_query(schema, query, persisted.get('sha256Hash'))
+                except PersistedQueryNotFound:
+                    return jsonify({'errors': [{
+                        'message': 'PersistedQueryNotFound',
+                        'extensions': {'code': 'PERSISTED_QUERY_NOT_FOUND'}
+                    }]})
+                if prepared.errors:
+                    return jsonify({'data': None, 'errors': [str(error) for error in prepared.errors]})
                 
-                result = schema.execute(query, variables=variables)
+                check_query_cost(schema, prepared.document, variables, operation_name, current_app.config)
+                result = execute_graphql(
+                    schema, prepared.document, context_value=graphql_context(),
+                    variable_values=variables, operation_name=operation_name
+                )
                 
                 response_data = {'data': result.data}
                 if result.errors:
                     response_data['errors'] = [str(error) for error in result.errors]
                 
                 return jsonify(response_data)
+            except (PersistedQueryMismatch, QueryTooExpensive) as e:
+                return jsonify({'errors': [str(e)]}), 400
             except Exception as e:
                 logger.error(f"Error in GraphQL endpoint: {str(e)}")
                 return jsonify({'errors': [str(e)]}), 400
 
     @app.route('/')
     def index():
+        snapshot = get_stats_snapshot()
         return jsonify({
             'message': '🏦 Indian Banks API Server',
             'description': 'Complete API for Indian bank branches with IFSC codes',
             'data_source': 'Based on RBI data via https://github.com/snarayanank2/indian_banks',
             'total_records': {
-                'banks': Bank.query.count() if Bank.query.first() else 0,
-                'branches': Branch.query.count() if Branch.query.first() else 0
+                'banks': snapshot.total_banks,
+                'branches': snapshot.total_branches
             },
             'endpoints': {
                 'REST API': {
@@ -324,8 +592,19 @@ query GetSBIBranches {
                     'GET /api/banks/<bank_id>/branches': 'Get branches for specific bank',
                     'GET /api/branches': 'Get all branches (supports filtering & pagination)',
                     'GET /api/branches/<ifsc>': 'Get specific branch by IFSC',
+                    'POST /api/branches/bulk': 'Look up many IFSC codes at once ({"ifscs": [...]})',
+                    'GET /api/ifsc/<code>/validate': 'Check an IFSC code format, bank code and existence without a database lookup',
                     'GET /api/search?q=<term>': 'Search across all fields',
-                    'GET /api/stats': 'Get database statistics'
+                    'GET /api/suggest?q=<prefix>&field=<field>': 'Typeahead completions for bank, city, district, state and branch names',
+                    'GET /api/export': 'Stream branches as NDJSON or CSV (same filters as /api/branches)',
+                    'GET /api/stats': 'Get database statistics',
+                    'GET /api/geo/states': 'States with branch, bank and district counts',
+                    'GET /api/geo/states/<state>/districts': 'Districts of a state with branch, bank and city counts',
+                    'GET /api/geo/districts/<district>/cities': 'Cities of a district (optionally ?state=) with branch and bank counts',
+                    'GET /api/geo/cities/<city>/banks': 'Banks present in a city (optionally ?district=&state=) with branch counts',
+                    'GET /api/cache/stats': 'Get response cache hit/miss counters',
+                    'GET /metrics': 'Prometheus metrics: per-route latency, SQL and serialization histograms',
+                    'GET /api/stats/<breakdown>': 'Get a precomputed breakdown (banks, states, districts, cities, banks_per_city, districts_by_state)'
                 },
                 'GraphQL': {
                     'POST /gql': 'GraphQL endpoint',
@@ -338,6 +617,7 @@ query GetSBIBranches {
                     'Banks with pagination': '/api/banks?page=1&per_page=10',
                     'Filter by city': '/api/branches?city=Mumbai&page=1',
                     'Filter by state': '/api/branches?state=Maharashtra',
+                    'Exact location filter': '/api/branches?state=Maharashtra&city=Mumbai&match=exact',
                     'Filter by bank name': '/api/branches?bank_name=State%20Bank',
                     'Search everything': '/api/search?q=Mumbai',
                     'Specific IFSC': '/api/branches/SBIN0000001',
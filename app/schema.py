@@ -1,43 +1,234 @@
 import graphene
+from flask import current_app
 from graphene_sqlalchemy import SQLAlchemyObjectType, SQLAlchemyConnectionField
+from graphene_sqlalchemy.utils import get_query
+from graphene.relay.connection import PageInfo
 from graphene.relay.node import Node
-from .models import Bank, Branch
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm.util import identity_key
+from .models import db, Bank, Branch
+from .ifsc_index import get_ifsc_index, load_bank, load_branch
+from .bank_codes import validate_ifsc
+from .filters import bank_filter, matching_bank_ids
+from .stats import get_stats_snapshot
+from .pagination import InvalidCursor, decode_cursor, encode_cursor
+from .loaders import create_loaders
+from .bulk import normalize_codes, lookup_branches
+
+def selects_field(info, name, selection_set=None):
+    if selection_set is None:
+        return any(
+            field.selection_set and selects_field(info, name, field.selection_set)
+            for field in info.field_asts
+        )
+    for selection in selection_set.selections:
+        if type(selection).__name__ == 'FragmentSpread':
+            if selects_field(info, name, info.fragments[selection.name.value].selection_set):
+                return True
+        elif type(selection).__name__ == 'InlineFragment' or selection.name.value != name:
+            if selection.selection_set and selects_field(info, name, selection.selection_set):
+                return True
+        else:
+            return True
+    return False
+
+def prime_banks(info, branches):
+    loader = info.context.get('bank_loader') if isinstance(info.context, dict) else None
+    if loader is not None and branches and selects_field(info, 'bank'):
+        loader.prime_for(branches)
+    return branches
+
+def list_limit(limit):
+    # Unbounded list fields are capped; explicit limits are priced by the cost check
+    return current_app.config['GRAPHQL_LIST_LIMIT'] if limit is None else limit
 
 class BankObject(SQLAlchemyObjectType):
     class Meta:
         model = Bank
         interfaces = (Node, )
 
+    def resolve_branches(self, info, **kwargs):
+        # A query lets the connection slice with LIMIT instead of loading every branch
+        return Branch.query.filter(bank_filter([self.id])).order_by(Branch.id)
+
 class BranchObject(SQLAlchemyObjectType):
     class Meta:
         model = Branch
         interfaces = (Node, )
+        exclude_fields = tuple(Branch.NORMALIZED_COLUMNS)
+
+    def resolve_bank(self, info):
+        loader = info.context.get('bank_loader') if isinstance(info.context, dict) else None
+        if loader is None or 'bank' in sa_inspect(self).dict:
+            return self.bank
+        bank = db.session.identity_map.get(identity_key(Bank, self.bank_id))
+        if bank is not None:
+            return bank
+        return loader.load(self.bank_id)
+
+class BranchLookupResult(graphene.ObjectType):
+    branches = graphene.List(BranchObject)
+    missing = graphene.List(graphene.String)
+
+class IfscValidation(graphene.ObjectType):
+    ifsc = graphene.String()
+    valid = graphene.Boolean()
+    valid_format = graphene.Boolean()
+    bank_code = graphene.String()
+    bank = graphene.Field(BankObject)
+    bank_branch_count = graphene.Int()
+    exists = graphene.Boolean()
+    reason = graphene.String()
+
+    def resolve_bank(self, info):
+        return load_bank(self.bank) if self.bank and 'name' in self.bank else None
+
+class GeoState(graphene.ObjectType):
+    state = graphene.String()
+    branch_count = graphene.Int()
+    bank_count = graphene.Int()
+    district_count = graphene.Int()
+
+class GeoDistrict(graphene.ObjectType):
+    district = graphene.String()
+    state = graphene.String()
+    branch_count = graphene.Int()
+    bank_count = graphene.Int()
+    city_count = graphene.Int()
+
+class GeoCity(graphene.ObjectType):
+    city = graphene.String()
+    district = graphene.String()
+    state = graphene.String()
+    branch_count = graphene.Int()
+    bank_count = graphene.Int()
+
+class GeoBank(graphene.ObjectType):
+    bank_id = graphene.Int()
+    bank_name = graphene.String()
+    city = graphene.String()
+    district = graphene.String()
+    state = graphene.String()
+    branch_count = graphene.Int()
+
+class KeysetConnectionField(SQLAlchemyConnectionField):
+    # Pages forward on the primary key instead of OFFSET and skips the
+    # COUNT(*); backward paging and legacy offset cursors use the default.
+    @classmethod
+    def resolve_connection(cls, connection_type, model, info, args, resolved):
+        after = args.get('after')
+        if resolved is not None or args.get('last') is not None or args.get('before') is not None:
+            return super().resolve_connection(connection_type, model, info, args, resolved)
+
+        try:
+            values = decode_cursor(after, int) if after else None
+        except InvalidCursor:
+            return super().resolve_connection(connection_type, model, info, args, resolved)
+
+        primary_key = model.__mapper__.primary_key[0]
+        query = get_query(model, info.context)
+        if values is not None:
+            query = query.filter(primary_key > values[0])
+        query = query.order_by(primary_key)
+
+        # Without first, a page is capped like the unbounded list fields
+        first = list_limit(args.get('first'))
+        nodes = query.limit(first + 1).all()
+        has_next_page = len(nodes) > first
+        if has_next_page:
+            nodes = nodes[:first]
+
+        edges = [
+            connection_type.Edge(node=node, cursor=encode_cursor(getattr(node, primary_key.key)))
+            for node in nodes
+        ]
+        connection = connection_type(
+            edges=edges,
+            page_info=PageInfo(
+                start_cursor=edges[0].cursor if edges else None,
+                end_cursor=edges[-1].cursor if edges else None,
+                has_previous_page=values is not None,
+                has_next_page=has_next_page
+            )
+        )
+        if model is Branch:
+            prime_banks(info, nodes)
+        connection.iterable = nodes
+        return connection
 
 class Query(graphene.ObjectType):
     node = Node.Field()
     
-    branches = SQLAlchemyConnectionField(BranchObject)
+    branches = KeysetConnectionField(BranchObject)
     
-    banks = SQLAlchemyConnectionField(BankObject)
+    banks = KeysetConnectionField(BankObject)
     
     branch_by_ifsc = graphene.Field(BranchObject, ifsc=graphene.String(required=True))
     
-    branches_by_bank = graphene.List(BranchObject, bank_name=graphene.String(required=True))
+    branches_by_ifscs = graphene.Field(
+        BranchLookupResult,
+        ifscs=graphene.List(graphene.NonNull(graphene.String), required=True)
+    )
+    
+    validate_ifsc = graphene.Field(IfscValidation, ifsc=graphene.String(required=True))
+    
+    geo_states = graphene.List(GeoState)
+    
+    geo_districts = graphene.List(GeoDistrict, state=graphene.String(required=True))
+    
+    geo_cities = graphene.List(GeoCity, district=graphene.String(required=True), state=graphene.String())
+    
+    geo_banks = graphene.List(
+        GeoBank, city=graphene.String(required=True), district=graphene.String(), state=graphene.String()
+    )
+    
+    branches_by_bank = graphene.List(BranchObject, bank_name=graphene.String(required=True), limit=graphene.Int())
     
-    branches_by_city = graphene.List(BranchObject, city=graphene.String(required=True))
+    branches_by_city = graphene.List(BranchObject, city=graphene.String(required=True), limit=graphene.Int())
     
-    branches_by_state = graphene.List(BranchObject, state=graphene.String(required=True))
+    branches_by_state = graphene.List(BranchObject, state=graphene.String(required=True), limit=graphene.Int())
     
     def resolve_branch_by_ifsc(self, info, ifsc):
+        index = get_ifsc_index()
+        if index is not None:
+            payload = index.get(ifsc)
+            return load_branch(payload) if payload is not None else None
         return Branch.query.filter_by(ifsc=ifsc).first()
     
-    def resolve_branches_by_bank(self, info, bank_name):
-        return Branch.query.join(Bank).filter(Bank.name.ilike(f'%{bank_name}%')).all()
+    def resolve_branches_by_ifscs(self, info, ifscs):
+        codes = normalize_codes(ifscs, current_app.config['BULK_LOOKUP_MAX_CODES'])
+        branches, missing = lookup_branches(codes)
+        return BranchLookupResult(branches=prime_banks(info, branches), missing=missing)
     
-    def resolve_branches_by_city(self, info, city):
-        return Branch.query.filter(Branch.city.ilike(f'%{city}%')).all()
+    def resolve_validate_ifsc(self, info, ifsc):
+        return IfscValidation(**validate_ifsc(ifsc))
     
-    def resolve_branches_by_state(self, info, state):
-        return Branch.query.filter(Branch.state.ilike(f'%{state}%')).all()
+    def resolve_geo_states(self, info):
+        return get_stats_snapshot().geo.states
+    
+    def resolve_geo_districts(self, info, state):
+        return get_stats_snapshot().geo.districts_for_state(state)
+    
+    def resolve_geo_cities(self, info, district, state=None):
+        return get_stats_snapshot().geo.cities_for_district(district, state)
+    
+    def resolve_geo_banks(self, info, city, district=None, state=None):
+        return get_stats_snapshot().geo.banks_for_city(city, district, state)
+    
+    def resolve_branches_by_bank(self, info, bank_name, limit=None):
+        bank_ids = matching_bank_ids(bank_name, 'substring')
+        branches = Branch.query.filter(bank_filter(bank_ids)).limit(list_limit(limit)).all()
+        return prime_banks(info, branches)
+    
+    def resolve_branches_by_city(self, info, city, limit=None):
+        branches = Branch.query.filter(Branch.city.ilike(f'%{city}%')).limit(list_limit(limit)).all()
+        return prime_banks(info, branches)
+    
+    def resolve_branches_by_state(self, info, state, limit=None):
+        branches = Branch.query.filter(Branch.state.ilike(f'%{state}%')).limit(list_limit(limit)).all()
+        return prime_banks(info, branches)
 
 schema = graphene.Schema(query=Query)
+
+def graphql_context():
+    return create_loaders()
@@ -0,0 +1,133 @@
+import logging
+import math
+import re
+from sqlalchemy import text
+from .models import db, Branch
+from .serializers import branch_rows
+from .pagination import CursorPage, decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+SEARCH_COLUMNS = ('ifsc', 'branch', 'bank_name', 'city', 'district', 'state', 'address')
+
+# bm25 weights, in SEARCH_COLUMNS order
+SEARCH_WEIGHTS = (10.0, 5.0, 3.0, 4.0, 2.0, 2.0, 1.0)
+
+RANK_EXPRESSION = f"bm25(branches_fts, {', '.join(str(weight) for weight in SEARCH_WEIGHTS)})"
+
+
+class SearchPage:
+    def __init__(self, items, page, per_page, total):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+        self.pages = int(math.ceil(total / per_page)) if per_page and total else 0
+        self.has_prev = page > 1
+        self.has_next = page < self.pages
+
+
+def create_search_index(name='branches_fts'):
+    exists = db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {'name': name}
+    ).first()
+    if exists:
+        return False
+
+    db.session.execute(text(
+        f"CREATE VIRTUAL TABLE {name} USING fts5("
+        f"{', '.join(SEARCH_COLUMNS)}, tokenize = 'unicode61', prefix = '2 3 4')"
+    ))
+    db.session.commit()
+    return True
+
+
+def populate_search_index(name='branches_fts', branches='branches', banks='banks'):
+    db.session.execute(text(f"DELETE FROM {name}"))
+    db.session.execute(text(
+        f"INSERT INTO {name} (rowid, {', '.join(SEARCH_COLUMNS)}) "
+        f"SELECT {branches}.id, {branches}.ifsc, {branches}.branch, {banks}.name, "
+        f"{branches}.city, {branches}.district, {branches}.state, {branches}.address "
+        f"FROM {branches} JOIN {banks} ON {banks}.id = {branches}.bank_id"
+    ))
+    db.session.execute(text(f"INSERT INTO {name} ({name}) VALUES ('optimize')"))
+    db.session.commit()
+
+
+def rebuild_search_index():
+    create_search_index()
+    populate_search_index()
+    logger.info("Full-text search index rebuilt")
+
+
+def build_match_query(term):
+    tokens = re.findall(r'\w+', term)
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def count_matches(match):
+    return db.session.execute(
+        text("SELECT count(*) FROM branches_fts WHERE branches_fts MATCH :match"),
+        {'match': match}
+    ).scalar()
+
+
+def load_branches(ids):
+    branches = {}
+    if ids:
+        branches = {
+            branch.id: branch
+            for branch in branch_rows(Branch.query.filter(Branch.id.in_(ids)))
+        }
+    return [branches[i] for i in ids if i in branches]
+
+
+def search_branches(term, page, per_page):
+    page = max(page, 1)
+    match = build_match_query(term)
+    if not match or per_page < 1:
+        return SearchPage([], page, per_page, 0)
+
+    total = count_matches(match)
+
+    ids = [row[0] for row in db.session.execute(
+        text(
+            "SELECT rowid FROM branches_fts WHERE branches_fts MATCH :match "
+            f"ORDER BY {RANK_EXPRESSION}, rowid LIMIT :limit OFFSET :offset"
+        ),
+        {'match': match, 'limit': per_page, 'offset': (page - 1) * per_page}
+    )]
+
+    return SearchPage(load_branches(ids), page, per_page, total)
+
+
+def search_branches_after(term, after, per_page, with_total=False):
+    per_page = max(per_page, 1)
+    match = build_match_query(term)
+    if not match:
+        return CursorPage([], per_page, None, 0 if with_total else None)
+
+    total = count_matches(match) if with_total else None
+
+    params = {'match': match, 'limit': per_page + 1}
+    keyset = ''
+    if after:
+        params['score'], params['id'] = decode_cursor(after, (int, float), int)
+        keyset = "AND (score > :score OR (score = :score AND rowid > :id)) "
+
+    rows = db.session.execute(
+        text(
+            f"SELECT rowid, {RANK_EXPRESSION} AS score FROM branches_fts "
+            f"WHERE branches_fts MATCH :match {keyset}"
+            "ORDER BY score, rowid LIMIT :limit"
+        ),
+        params
+    ).all()
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(rows[-1].score, rows[-1].rowid)
+
+    return CursorPage(load_branches([row.rowid for row in rows]), per_page, next_cursor, total)
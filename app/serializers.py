@@ -0,0 +1,86 @@
+import logging
+from .models import db, Bank, Branch
+from .encoding import shared_json
+from .indexes import current_indexes
+
+logger = logging.getLogger(__name__)
+
+# Columns behind a serialized branch; list endpoints select just these as
+# tuples and take the nested bank from the cached bank payloads.
+BRANCH_COLUMNS = (
+    Branch.id, Branch.ifsc, Branch.branch, Branch.address,
+    Branch.city, Branch.district, Branch.state, Branch.bank_id
+)
+
+
+def build_branch_counts():
+    counts = dict(
+        db.session.query(Branch.bank_id, db.func.count(Branch.id))
+        .group_by(Branch.bank_id)
+        .all()
+    )
+    logger.info(f"Cached branch counts for {len(counts)} banks")
+    return counts
+
+
+def get_branch_counts():
+    return current_indexes().branch_counts
+
+
+def build_bank_payloads(counts):
+    return {
+        bank_id: {'id': bank_id, 'name': name, 'total_branches': counts.get(bank_id, 0)}
+        for bank_id, name in db.session.query(Bank.id, Bank.name)
+    }
+
+
+def get_bank_payloads():
+    return current_indexes().bank_payloads
+
+
+def eager_banks(query):
+    return query.options(db.selectinload(Branch.bank))
+
+
+def branch_rows(query):
+    return query.with_entities(*BRANCH_COLUMNS)
+
+
+def serialize_bank(bank, counts=None):
+    if bank is None:
+        return None
+    if counts is None:
+        counts = get_branch_counts()
+    return {
+        'id': bank.id,
+        'name': bank.name,
+        'total_branches': counts.get(bank.id, 0)
+    }
+
+
+def serialize_banks(banks):
+    counts = get_branch_counts()
+    return [serialize_bank(bank, counts) for bank in banks]
+
+
+def serialize_branches(branches):
+    # Accepts Branch objects or BRANCH_COLUMNS rows. The result must be
+    # encoded with the app's JSON provider (jsonify / current_app.json).
+    bank_payloads = get_bank_payloads()
+    bank_dicts = {}
+    data = []
+    for branch in branches:
+        if branch.bank_id not in bank_dicts:
+            bank_dicts[branch.bank_id] = shared_json(bank_payloads.get(branch.bank_id))
+        data.append({
+            'id': branch.id,
+            'ifsc': branch.ifsc,
+            'branch': branch.branch,
+            'address': branch.address,
+            'city': branch.city,
+            'district': branch.district,
+            'state': branch.state,
+            'bank_id': branch.bank_id,
+            'bank': bank_dicts[branch.bank_id]
+        })
+    return data
@@ -0,0 +1,35 @@
+import fcntl
+import logging
+from contextlib import contextmanager
+from .config import BuildConfig
+from .snapshot import verify_snapshot
+
+logger = logging.getLogger(__name__)
+
+@contextmanager
+def file_lock(path):
+    with open(path, 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def prepare_database(config_class=BuildConfig):
+    # Create, migrate and load the database once, before any worker starts.
+    # The lock keeps concurrent deploys sharing a volume from racing.
+    from . import create_app
+
+    if config_class.SNAPSHOT_MANIFEST:
+        path, manifest = verify_snapshot(config_class.SNAPSHOT_MANIFEST)
+        logger.info(f"Snapshot {manifest['version']} at {path} verified")
+        return
+
+    with file_lock(config_class.DATA_LOCK_PATH):
+        logger.info("Preparing database for serving...")
+        create_app(config_class)
+        logger.info("Database ready")
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    prepare_database()
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime, timezone
+from .config import BuildConfig
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'manifest.json'
+CHECKSUM_CHUNK_SIZE = 1024 * 1024
+
+
+class SnapshotError(RuntimeError):
+    pass
+
+
+def file_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as snapshot:
+        for chunk in iter(lambda: snapshot.read(CHECKSUM_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_manifest(manifest_path):
+    try:
+        with open(manifest_path) as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError) as e:
+        raise SnapshotError(f"Cannot read snapshot manifest {manifest_path}: {e}")
+
+    path = os.path.join(os.path.dirname(os.path.abspath(manifest_path)), manifest['file'])
+    return path, manifest
+
+
+def verify_snapshot(manifest_path, checksum=True):
+    path, manifest = read_manifest(manifest_path)
+    if not os.path.exists(path):
+        raise SnapshotError(f"Snapshot file {path} is missing")
+    if os.path.getsize(path) != manifest['size_bytes']:
+        raise SnapshotError(f"Snapshot file {path} does not match its manifest size")
+    if checksum and file_checksum(path) != manifest['sha256']:
+        raise SnapshotError(f"Snapshot file {path} does not match its manifest checksum")
+    return path, manifest
+
+
+def configure_snapshot(app):
+    # Point the app at an immutable prebuilt database instead of loading data
+    manifest_path = app.config.get('SNAPSHOT_MANIFEST')
+    if not manifest_path:
+        return None
+
+    path, manifest = verify_snapshot(manifest_path, app.config.get('SNAPSHOT_VERIFY_CHECKSUM'))
+    pragmas = {
+        name: value for name, value in (app.config.get('SQLITE_PRAGMAS') or {}).items()
+        if name != 'journal_mode'
+    }
+    pragmas['mmap_size'] = max(int(pragmas.get('mmap_size', 0)), manifest['size_bytes'])
+    pragmas['query_only'] = 'ON'
+
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f'sqlite:///file:{path}?mode=ro&immutable=1&uri=true',
+        SQLITE_PRAGMAS=pragmas,
+        LOAD_DATA_ON_STARTUP=False,
+        DATASET_VERSION_CHECK_INTERVAL=None
+    )
+    logger.info(f"Serving dataset snapshot {manifest['version']} from {path}")
+    return manifest
+
+
+def compact_database(path):
+    connection = sqlite3.connect(path, isolation_level=None)
+    try:
+        connection.execute("PRAGMA journal_mode = DELETE")
+        connection.execute("INSERT INTO branches_fts(branches_fts) VALUES ('optimize')")
+        connection.execute("ANALYZE")
+        connection.execute("VACUUM")
+    finally:
+        connection.close()
+
+
+def build_snapshot(output_dir, source=None):
+    from . import create_app
+    from .bank_codes import bank_code_count_rows
+    from .ifsc_index import get_ifsc_index, store_ifsc_index
+    from .models import db
+    from .stats import location_count_rows
+    from .stored_counts import store_counts
+    from .suggest import branch_name_count_rows
+    from .version import latest_dataset_version
+
+    os.makedirs(output_dir, exist_ok=True)
+    building_path = os.path.abspath(os.path.join(output_dir, 'building.db'))
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(building_path + suffix):
+            os.remove(building_path + suffix)
+
+    start = time.perf_counter()
+    config_class = type('SnapshotBuildConfig', (BuildConfig,), {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{building_path}',
+        'DATA_SOURCE': source,
+        'SNAPSHOT_MANIFEST': None,
+        'IFSC_INDEX_ENABLED': True
+    })
+    app = create_app(config_class)
+    with app.app_context():
+        store_ifsc_index(get_ifsc_index())
+        store_counts('stats_counts', location_count_rows())
+        store_counts('branch_name_counts', branch_name_count_rows())
+        store_counts('bank_code_counts', bank_code_count_rows())
+        version = latest_dataset_version()
+        manifest = {
+            'version': version.version,
+            'total_banks': version.total_banks,
+            'total_branches': version.total_branches
+        }
+        db.session.remove()
+        db.engine.dispose()
+
+    compact_database(building_path)
+
+    file_name = f"indian_banks-{manifest['version']}.db"
+    path = os.path.join(output_dir, file_name)
+    os.replace(building_path, path)
+    manifest.update({
+        'file': file_name,
+        'size_bytes': os.path.getsize(path),
+        'sha256': file_checksum(path),
+        'built_at': datetime.now(timezone.utc).isoformat(),
+        'sqlite_version': sqlite3.sqlite_version,
+        'build_seconds': round(time.perf_counter() - start, 3)
+    })
+
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(f'{manifest_path}.tmp', 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    os.replace(f'{manifest_path}.tmp', manifest_path)
+    logger.info(f"Built dataset snapshot {manifest['version']} at {path}")
+    return manifest
@@ -0,0 +1,97 @@
+import logging
+from collections import Counter, defaultdict
+from .models import db, Bank, Branch
+from .geo import GeoHierarchy
+from .indexes import current_indexes
+from .stored_counts import load_stored_counts
+
+logger = logging.getLogger(__name__)
+
+
+def ranked(counts, key):
+    return [
+        {key: name, 'branch_count': count}
+        for name, count in sorted(counts.items(), key=lambda item: (-item[1], item[0] or ''))
+    ]
+
+
+class StatsSnapshot:
+    def __init__(self, bank_names, rows):
+        self.geo = GeoHierarchy(bank_names, rows)
+        root = self.geo.root
+        by_bank = Counter()
+        for bank_id, count in root.banks.items():
+            by_bank[bank_names[bank_id]] += count
+        by_state = Counter()
+        by_district = Counter()
+        by_city = Counter()
+        districts_by_state = defaultdict(Counter)
+        banks_by_city = defaultdict(set)
+
+        for state_node in root.children.values():
+            by_state[state_node.name] += state_node.branch_count
+            for district_node in state_node.children.values():
+                by_district[district_node.name] += district_node.branch_count
+                districts_by_state[state_node.name][district_node.name] += district_node.branch_count
+                for city_node in district_node.children.values():
+                    by_city[city_node.name] += city_node.branch_count
+                    banks_by_city[city_node.name].update(city_node.banks)
+
+        self.total_banks = len(bank_names)
+        self.total_branches = root.branch_count
+        self.breakdowns = {
+            'banks': ranked(by_bank, 'bank_name'),
+            'states': ranked(by_state, 'state'),
+            'districts': ranked(by_district, 'district'),
+            'cities': ranked(by_city, 'city'),
+            'banks_per_city': [
+                {'city': city, 'bank_count': len(banks)}
+                for city, banks in sorted(
+                    banks_by_city.items(), key=lambda item: (-len(item[1]), item[0] or '')
+                )
+            ]
+        }
+        self.districts_by_state = {
+            state: ranked(districts, 'district')
+            for state, districts in districts_by_state.items()
+        }
+        self.state_names = {
+            (state or '').upper(): state for state in self.districts_by_state
+        }
+
+    def districts_for_state(self, state):
+        key = state.upper()
+        if key not in self.state_names:
+            return None
+        return self.districts_by_state[self.state_names[key]]
+
+    def summary(self, limit=10):
+        return {
+            'total_banks': self.total_banks,
+            'total_branches': self.total_branches,
+            'top_banks_by_branches': self.breakdowns['banks'][:limit],
+            'top_states_by_branches': self.breakdowns['states'][:limit]
+        }
+
+
+def location_count_rows():
+    return db.session.query(
+        Branch.bank_id, Branch.state, Branch.district, Branch.city, db.func.count(Branch.id)
+    ).group_by(Branch.bank_id, Branch.state, Branch.district, Branch.city).all()
+
+
+def build_stats_snapshot():
+    bank_names = dict(db.session.query(Bank.id, Bank.name).all())
+    rows = load_stored_counts('stats_counts')
+    if rows is None:
+        rows = location_count_rows()
+    snapshot = StatsSnapshot(bank_names, rows)
+    logger.info(
+        f"Stats snapshot built for {snapshot.total_banks} banks "
+        f"and {snapshot.total_branches} branches"
+    )
+    return snapshot
+
+
+def get_stats_snapshot():
+    return current_indexes().stats
@@ -0,0 +1,63 @@
+from sqlalchemy import text
+from .models import db
+from .version import latest_dataset_version
+
+# Grouped branch counts persisted into database snapshots next to the IFSC
+# index, so workers read a few thousand aggregated rows at startup instead
+# of grouping every branch for the stats, suggest and bank code indexes.
+STORED_COUNTS = {
+    'stats_counts': ('bank_id INTEGER', 'state TEXT', 'district TEXT', 'city TEXT', 'branch_count INTEGER'),
+    'branch_name_counts': ('branch TEXT', 'branch_count INTEGER'),
+    'bank_code_counts': ('code TEXT', 'bank_id INTEGER', 'branch_count INTEGER'),
+}
+# The dataset version each table was stored for; a table left behind by an
+# older version is ignored rather than trusted
+VERSIONS_TABLE = 'stored_count_versions'
+
+
+def column_names(name):
+    return [column.split()[0] for column in STORED_COUNTS[name]]
+
+
+def store_counts(name, rows):
+    columns = column_names(name)
+    db.session.execute(text(f"DROP TABLE IF EXISTS {name}"))
+    db.session.execute(text(f"CREATE TABLE {name} ({', '.join(STORED_COUNTS[name])})"))
+    db.session.execute(
+        text(f"INSERT INTO {name} VALUES ({', '.join(f':{column}' for column in columns)})"),
+        [dict(zip(columns, row)) for row in rows]
+    )
+    db.session.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {VERSIONS_TABLE} (name TEXT PRIMARY KEY, version TEXT NOT NULL)"
+    ))
+    db.session.execute(
+        text(f"INSERT OR REPLACE INTO {VERSIONS_TABLE} (name, version) VALUES (:name, :version)"),
+        {'name': name, 'version': latest_dataset_version().version}
+    )
+    db.session.commit()
+
+
+def drop_stored_counts():
+    for name in (*STORED_COUNTS, VERSIONS_TABLE):
+        db.session.execute(text(f"DROP TABLE IF EXISTS {name}"))
+    db.session.commit()
+
+
+def load_stored_counts(name):
+    # None unless the database has a copy for the current dataset version;
+    # callers then group the branches themselves
+    exists = db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {'name': VERSIONS_TABLE}
+    ).first()
+    if not exists:
+        return None
+    stored = db.session.execute(
+        text(f"SELECT version FROM {VERSIONS_TABLE} WHERE name = :name"), {'name': name}
+    ).scalar()
+    latest = latest_dataset_version()
+    if stored is None or latest is None or stored != latest.version:
+        return None
+    return [
+        tuple(row) for row in db.session.execute(text(f"SELECT {', '.join(column_names(name))} FROM {name}"))
+    ]
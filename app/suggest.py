@@ -0,0 +1,116 @@
+import heapq
+import logging
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from .indexes import current_indexes
+from .models import db, Branch
+from .stored_counts import load_stored_counts
+
+logger = logging.getLogger(__name__)
+
+SUGGEST_FIELDS = ('bank', 'city', 'district', 'state', 'branch')
+MAX_SUGGESTIONS = 50
+SCAN_LIMIT = 256
+
+
+def suggest_key(value):
+    return ' '.join(value.upper().split())
+
+
+# Sorted (key, value id) pairs with one key per word of each value, so
+# "andh" finds both "ANDHERI EAST" and "MUMBAI ANDHERI". A prefix maps to a
+# contiguous slice found with bisect; values are ranked by branch count.
+class PrefixIndex:
+    def __init__(self, counts):
+        merged = defaultdict(Counter)
+        for value, count in counts.items():
+            if value and value.strip():
+                merged[suggest_key(value)][value] += count
+
+        self.values = []
+        self.counts = []
+        entries = []
+        for key, variants in merged.items():
+            value_id = len(self.values)
+            self.values.append(variants.most_common(1)[0][0])
+            self.counts.append(sum(variants.values()))
+            words = key.split(' ')
+            for position in range(len(words)):
+                entries.append((' '.join(words[position:]), value_id))
+        entries.sort()
+        self.keys = [key for key, _ in entries]
+        self.ids = [value_id for _, value_id in entries]
+
+        # Prefixes matching more than SCAN_LIMIT keys get their completions
+        # ranked once here, so a lookup never scans more than that many keys
+        self.top = {}
+        groups = [(0, len(self.keys), 1)]
+        while groups:
+            start, end, length = groups.pop()
+            while start < end:
+                prefix = self.keys[start][:length]
+                if len(prefix) < length:
+                    start += 1
+                    continue
+                group_end = bisect_left(self.keys, prefix + '\uffff', start, end)
+                if group_end - start > SCAN_LIMIT:
+                    self.top[prefix] = self.rank(self.ids[start:group_end], MAX_SUGGESTIONS)
+                    groups.append((start, group_end, length + 1))
+                start = group_end
+
+    def rank(self, ids, limit):
+        return heapq.nsmallest(
+            limit, set(ids), key=lambda value_id: (-self.counts[value_id], self.values[value_id])
+        )
+
+    def complete(self, prefix, limit):
+        prefix = suggest_key(prefix)
+        if not prefix:
+            return []
+        ranked = self.top.get(prefix)
+        if ranked is None:
+            start = bisect_left(self.keys, prefix)
+            end = bisect_left(self.keys, prefix + '\uffff', start)
+            ranked = self.rank(self.ids[start:end], limit)
+        return [
+            {'value': self.values[value_id], 'count': self.counts[value_id]}
+            for value_id in ranked[:limit]
+        ]
+
+    def __len__(self):
+        return len(self.values)
+
+
+def branch_name_count_rows():
+    return db.session.query(Branch.branch, db.func.count(Branch.id)).group_by(Branch.branch).all()
+
+
+def build_suggest_index(snapshot):
+    breakdown_counts = {
+        'bank': ('banks', 'bank_name'),
+        'city': ('cities', 'city'),
+        'district': ('districts', 'district'),
+        'state': ('states', 'state'),
+    }
+    counts = {
+        field: {row[key]: row['branch_count'] for row in snapshot.breakdowns[breakdown]}
+        for field, (breakdown, key) in breakdown_counts.items()
+    }
+    branch_counts = load_stored_counts('branch_name_counts')
+    counts['branch'] = dict(branch_counts if branch_counts is not None else branch_name_count_rows())
+    index = {field: PrefixIndex(counts[field]) for field in SUGGEST_FIELDS}
+    logger.info(
+        "Suggest index built: "
+        + ', '.join(f"{len(values)} {field} values" for field, values in index.items())
+    )
+    return index
+
+
+def get_suggest_index():
+    return current_indexes().suggest
+
+
+def suggest(prefix, fields=SUGGEST_FIELDS, limit=10):
+    index = get_suggest_index()
+    limit = max(1, min(limit, MAX_SUGGESTIONS))
+    return {field: index[field].complete(prefix, limit) for field in fields}
@@ -0,0 +1,196 @@
+import hashlib
+import logging
+from collections import namedtuple
+from sqlalchemy import bindparam, text
+from .models import db, Bank, Branch, DatasetChange
+from .search import SEARCH_COLUMNS
+from .version import compute_dataset_hash, record_dataset_version
+
+logger = logging.getLogger(__name__)
+
+HASHED_FIELDS = ('branch', 'address', 'city', 'district', 'state', 'bank_name')
+CHUNK_SIZE = 500
+
+INSERT, UPDATE, DELETE = 'insert', 'update', 'delete'
+
+# What an incremental sync changed: every IFSC it touched, the banks whose
+# branches changed, and the banks whose branch count (and so every cached
+# payload embedding it) changed.
+ChangeSet = namedtuple(
+    'ChangeSet',
+    ['version', 'base_version', 'inserted', 'updated', 'deleted', 'bank_ids', 'resized_bank_ids']
+)
+
+
+def row_hash(row):
+    return hashlib.sha1('\x1f'.join(row[field] or '' for field in HASHED_FIELDS).encode()).digest()
+
+
+def chunks(items, size=CHUNK_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def current_rows():
+    rows = db.session.query(
+        Branch.id, Branch.ifsc, Branch.bank_id, Branch.branch, Branch.address,
+        Branch.city, Branch.district, Branch.state, Bank.name.label('bank_name')
+    ).join(Bank).yield_per(10000)
+    return {row.ifsc: (row.id, row.bank_id, row_hash(row._mapping)) for row in rows}
+
+
+def diff_rows(rows, current):
+    inserts = []
+    updates = []
+    seen = set()
+    for row in rows:
+        ifsc = row['ifsc']
+        if ifsc in seen:
+            continue
+        seen.add(ifsc)
+        existing = current.get(ifsc)
+        if existing is None:
+            inserts.append(row)
+        elif existing[2] != row_hash(row):
+            updates.append((existing, row))
+    deletes = [(ifsc, existing) for ifsc, existing in current.items() if ifsc not in seen]
+    return inserts, updates, deletes
+
+
+def resolve_bank_ids(rows):
+    # Banks are identified by name, so IDs survive every sync
+    bank_ids = dict(db.session.query(Bank.name, Bank.id).all())
+    next_id = max(bank_ids.values(), default=0) + 1
+    for row in rows:
+        name = row.pop('bank_name')
+        bank_id = bank_ids.get(name)
+        if bank_id is None:
+            bank_id = bank_ids[name] = next_id
+            next_id += 1
+            db.session.execute(Bank.__table__.insert(), {'id': bank_id, 'name': name})
+        row['bank_id'] = bank_id
+
+
+def delete_search_rows(ids):
+    for chunk in chunks(ids):
+        db.session.execute(
+            text("DELETE FROM branches_fts WHERE rowid IN :ids").bindparams(
+                bindparam('ids', expanding=True)
+            ),
+            {'ids': chunk}
+        )
+
+
+def insert_search_rows(codes):
+    for chunk in chunks(codes):
+        db.session.execute(
+            text(
+                f"INSERT INTO branches_fts (rowid, {', '.join(SEARCH_COLUMNS)}) "
+                "SELECT branches.id, branches.ifsc, branches.branch, banks.name, "
+                "branches.city, branches.district, branches.state, branches.address "
+                "FROM branches JOIN banks ON banks.id = branches.bank_id "
+                "WHERE branches.ifsc IN :codes"
+            ).bindparams(bindparam('codes', expanding=True)),
+            {'codes': chunk}
+        )
+
+
+def apply_changes(inserts, updates, deletes):
+    resolve_bank_ids(inserts + [row for _, row in updates])
+    branches = Branch.__table__
+
+    deleted_ids = [existing[0] for _, existing in deletes]
+    updated_ids = [existing[0] for existing, _ in updates]
+    delete_search_rows(deleted_ids + updated_ids)
+    for chunk in chunks(deleted_ids):
+        db.session.execute(branches.delete().where(branches.c.id.in_(chunk)))
+
+    if updates:
+        db.session.execute(
+            branches.update().where(branches.c.id == bindparam('row_id')).values(
+                **{name: bindparam(f'new_{name}') for name in updates[0][1]}
+            ),
+            [
+                {'row_id': existing[0], **{f'new_{name}': value for name, value in row.items()}}
+                for existing, row in updates
+            ]
+        )
+    for chunk in chunks(inserts, 5000):
+        db.session.execute(branches.insert(), chunk)
+
+    insert_search_rows([row['ifsc'] for row in inserts] + [row['ifsc'] for _, row in updates])
+
+    # Drop banks left without branches
+    touched = {existing[1] for _, existing in deletes} | {existing[1] for existing, _ in updates}
+    if touched:
+        db.session.execute(
+            Bank.__table__.delete()
+            .where(Bank.id.in_(touched))
+            .where(~Bank.id.in_(db.session.query(Branch.bank_id).distinct()))
+        )
+
+
+def change_records(inserts, updates, deletes):
+    records = [(row['ifsc'], INSERT, row['bank_id'], None) for row in inserts]
+    records += [(row['ifsc'], UPDATE, row['bank_id'], existing[1]) for existing, row in updates]
+    records += [(ifsc, DELETE, None, existing[1]) for ifsc, existing in deletes]
+    return records
+
+
+def change_set(version, base_version, records):
+    inserted, updated, deleted = set(), set(), set()
+    bank_ids = set()
+    resized_bank_ids = set()
+    for ifsc, operation, bank_id, previous_bank_id in records:
+        {INSERT: inserted, UPDATE: updated, DELETE: deleted}[operation].add(ifsc)
+        banks = {bank_id, previous_bank_id} - {None}
+        bank_ids |= banks
+        if operation != UPDATE or bank_id != previous_bank_id:
+            resized_bank_ids |= banks
+    return ChangeSet(version, base_version, inserted, updated, deleted, bank_ids, resized_bank_ids)
+
+
+def load_change_set(version, base_version):
+    records = db.session.query(
+        DatasetChange.ifsc, DatasetChange.operation,
+        DatasetChange.bank_id, DatasetChange.previous_bank_id
+    ).filter_by(version=version, base_version=base_version).all()
+    if not records:
+        return None
+    return change_set(version, base_version, records)
+
+
+def sync_branch_rows(rows, base_version):
+    """Apply the difference between rows and the live tables; None if nothing changed."""
+    inserts, updates, deletes = diff_rows(rows, current_rows())
+    if not (inserts or updates or deletes):
+        return None
+
+    apply_changes(inserts, updates, deletes)
+    records = change_records(inserts, updates, deletes)
+    version = compute_dataset_hash()
+    db.session.execute(DatasetChange.__table__.insert(), [
+        {
+            'version': version,
+            'base_version': base_version,
+            'ifsc': ifsc,
+            'operation': operation,
+            'bank_id': bank_id,
+            'previous_bank_id': previous_bank_id
+        }
+        for ifsc, operation, bank_id, previous_bank_id in records
+    ])
+    record_dataset_version(version)
+    return change_set(version, base_version, records)
+
+
+def affected_ifscs(changes):
+    # Cached branch payloads embed their bank's branch count
+    codes = changes.inserted | changes.updated | changes.deleted
+    if changes.resized_bank_ids:
+        codes |= {
+            ifsc for (ifsc,) in db.session.query(Branch.ifsc)
+            .filter(Branch.bank_id.in_(changes.resized_bank_ids))
+        }
+    return codes
@@ -0,0 +1,49 @@
+import hashlib
+import logging
+from datetime import datetime, timezone
+from .indexes import get_indexes
+from .models import db, Bank, Branch, DatasetVersion
+
+logger = logging.getLogger(__name__)
+
+
+def compute_dataset_hash():
+    # Ids are hashed too: they appear in response bodies, and a reload that
+    # renumbers rows must not keep the version (and with it the ETags)
+    digest = hashlib.sha256()
+    rows = db.session.query(
+        Branch.id, Branch.ifsc, Branch.branch, Branch.address, Branch.city,
+        Branch.district, Branch.state, Branch.bank_id, Bank.name
+    ).join(Bank).order_by(Branch.ifsc).yield_per(10000)
+    for row in rows:
+        digest.update('\x1f'.join('' if value is None else str(value) for value in row).encode())
+        digest.update(b'\x1e')
+    return digest.hexdigest()[:16]
+
+
+def record_dataset_version(version_hash=None):
+    version = DatasetVersion(
+        version=version_hash or compute_dataset_hash(),
+        loaded_at=datetime.now(timezone.utc),
+        total_banks=Bank.query.count(),
+        total_branches=Branch.query.count()
+    )
+    db.session.add(version)
+    db.session.commit()
+    logger.info(f"Recorded dataset version {version.version}")
+    return version
+
+
+def latest_dataset_version():
+    return DatasetVersion.query.order_by(DatasetVersion.id.desc()).first()
+
+
+def current_dataset_version():
+    latest = latest_dataset_version() or record_dataset_version()
+    return latest.version
+
+
+def get_dataset_version():
+    # The version the published in-memory indexes were built from
+    indexes = get_indexes()
+    return indexes.version if indexes is not None else None
@@ -0,0 +1,4 @@
+from app.asgi import create_asgi_app
+from app.config import ProductionConfig
+
+app = create_asgi_app(ProductionConfig)
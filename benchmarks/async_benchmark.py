@@ -0,0 +1,119 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+SERVERS = {
+    'sync': [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--log-level', 'warning'],
+    'async': [sys.executable, '-m', 'uvicorn', 'asgi:app', '--log-level', 'warning', '--no-access-log'],
+}
+
+
+async def fetch(reader, writer, path):
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode())
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    length = 0
+    for line in head.split(b'\r\n'):
+        if line.lower().startswith(b'content-length:'):
+            length = int(line.split(b':', 1)[1])
+    return status, await reader.readexactly(length)
+
+
+async def sample_ifsc_paths(port, count):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    _, body = await fetch(reader, writer, f'/api/branches?per_page={count}')
+    writer.close()
+    return [f"/api/branches/{branch['ifsc']}" for branch in json.loads(body)['data']]
+
+
+async def connection(port, paths, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        i = 0
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            status, _ = await fetch(reader, writer, paths[i % len(paths)])
+            latencies.append((time.perf_counter() - start) * 1000)
+            errors[0] += status != 200
+            i += 1
+    finally:
+        writer.close()
+
+
+async def drive(port, paths, concurrency, duration):
+    latencies = []
+    errors = [0]
+    deadline = time.monotonic() + duration
+    await asyncio.gather(*(
+        connection(port, paths, deadline, latencies, errors) for _ in range(concurrency)
+    ))
+    return latencies, errors[0]
+
+
+def wait_for_server(port, timeout=60):
+    async def probe():
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        await fetch(reader, writer, '/api/stats')
+        writer.close()
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            asyncio.run(probe())
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def run(kind, args, paths):
+    env = dict(os.environ, WEB_CONCURRENCY='1', GUNICORN_THREADS=str(args.threads),
+               ASGI_MAX_THREADS=str(args.threads), BIND=f'127.0.0.1:{args.port}')
+    command = SERVERS[kind] + (['--port', str(args.port)] if kind == 'async' else [])
+    server = subprocess.Popen(command, cwd=ROOT, env=env)
+    try:
+        wait_for_server(args.port)
+        paths = paths or asyncio.run(sample_ifsc_paths(args.port, 100))
+        latencies, errors = asyncio.run(drive(args.port, paths, args.concurrency, args.duration))
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies.sort()
+    return {
+        'rps': len(latencies) / args.duration,
+        'p50': statistics.median(latencies),
+        'p99': latencies[int(len(latencies) * 0.99)],
+        'errors': errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the sync (gunicorn) and async (uvicorn) apps')
+    parser.add_argument('--concurrency', type=int, default=256)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('paths', nargs='*', help='Paths to request (defaults to 100 IFSC lookups)')
+    args = parser.parse_args()
+
+    # uvicorn has no pre-fork hook, so prepare the database up front
+    subprocess.run([sys.executable, '-m', 'app.serving'], cwd=ROOT, check=True)
+
+    print(f"{'app':<8}{'concurrency':>12}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for kind in ('sync', 'async'):
+        result = run(kind, args, args.paths)
+        print(f"{kind:<8}{args.concurrency:>12}{result['rps']:>10.0f}"
+              f"{result['p50']:>10.1f}{result['p99']:>10.1f}{result['errors']:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+import argparse
+import csv
+import itertools
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+FIELDS = ('ifsc', 'bank_id', 'branch', 'address', 'city', 'district', 'state', 'bank_name')
+
+# Largest banks by branch count, in rank order, with their IFSC bank codes
+BANKS = [
+    ('STATE BANK OF INDIA', 'SBIN'), ('PUNJAB NATIONAL BANK', 'PUNB'), ('BANK OF BARODA', 'BARB'),
+    ('CANARA BANK', 'CNRB'), ('UNION BANK OF INDIA', 'UBIN'), ('BANK OF INDIA', 'BKID'),
+    ('HDFC BANK', 'HDFC'), ('ICICI BANK LIMITED', 'ICIC'), ('CENTRAL BANK OF INDIA', 'CBIN'),
+    ('INDIAN BANK', 'IDIB'), ('AXIS BANK', 'UTIB'), ('INDIAN OVERSEAS BANK', 'IOBA'),
+    ('UCO BANK', 'UCBA'), ('BANK OF MAHARASHTRA', 'MAHB'), ('KOTAK MAHINDRA BANK LIMITED', 'KKBK'),
+    ('IDBI BANK', 'IBKL'), ('PUNJAB AND SIND BANK', 'PSIB'), ('INDUSIND BANK', 'INDB'),
+    ('YES BANK', 'YESB'), ('FEDERAL BANK', 'FDRL'), ('BANDHAN BANK LIMITED', 'BDBL'),
+    ('KARNATAKA BANK LIMITED', 'KARB'), ('SOUTH INDIAN BANK', 'SIBL'), ('KARUR VYSYA BANK', 'KVBL'),
+    ('CITY UNION BANK LIMITED', 'CIUB'), ('TAMILNAD MERCANTILE BANK LIMITED', 'TMBL'),
+    ('JAMMU AND KASHMIR BANK LIMITED', 'JAKA'), ('IDFC FIRST BANK LTD', 'IDFB'),
+    ('RBL BANK LIMITED', 'RATN'), ('AU SMALL FINANCE BANK LIMITED', 'AUBL'),
+    ('EQUITAS SMALL FINANCE BANK LIMITED', 'ESFB'), ('UJJIVAN SMALL FINANCE BANK LIMITED', 'UJVN'),
+    ('DCB BANK LIMITED', 'DCBL'), ('DHANALAKSHMI BANK', 'DLXB'), ('CSB BANK LIMITED', 'CSBK'),
+    ('KERALA GRAMIN BANK', 'KLGB'), ('ANDHRA PRADESH GRAMEENA VIKAS BANK', 'APGV'),
+    ('THE SHAMRAO VITHAL CO-OPERATIVE BANK', 'SVCB'), ('SARASWAT COOPERATIVE BANK LIMITED', 'SRCB'),
+    ('THE COSMOS CO-OPERATIVE BANK LIMITED', 'COSB'),
+]
+TAIL_BANK_SUFFIXES = (
+    'DISTRICT CENTRAL CO-OPERATIVE BANK LIMITED', 'URBAN CO-OPERATIVE BANK LIMITED',
+    'GRAMIN BANK', 'STATE CO-OPERATIVE BANK LIMITED', 'MERCANTILE CO-OPERATIVE BANK LIMITED',
+)
+
+# State: (share of branches, number of districts, best-known districts first)
+STATES = {
+    'UTTAR PRADESH': (10.5, 75, ['LUCKNOW', 'KANPUR NAGAR', 'GHAZIABAD', 'AGRA', 'VARANASI', 'PRAYAGRAJ', 'MEERUT']),
+    'MAHARASHTRA': (10.0, 36, ['MUMBAI', 'PUNE', 'THANE', 'NAGPUR', 'NASHIK', 'AURANGABAD', 'KOLHAPUR']),
+    'TAMIL NADU': (8.0, 38, ['CHENNAI', 'COIMBATORE', 'MADURAI', 'TIRUCHIRAPPALLI', 'SALEM', 'TIRUNELVELI']),
+    'KARNATAKA': (7.5, 31, ['BANGALORE URBAN', 'MYSORE', 'DAKSHINA KANNADA', 'BELGAUM', 'DHARWAD']),
+    'GUJARAT': (6.0, 33, ['AHMEDABAD', 'SURAT', 'VADODARA', 'RAJKOT', 'BHAVNAGAR', 'JAMNAGAR']),
+    'WEST BENGAL': (6.0, 23, ['KOLKATA', 'NORTH 24 PARGANAS', 'HOWRAH', 'HOOGHLY', 'DARJEELING']),
+    'RAJASTHAN': (5.5, 33, ['JAIPUR', 'JODHPUR', 'UDAIPUR', 'KOTA', 'AJMER', 'BIKANER']),
+    'ANDHRA PRADESH': (5.0, 26, ['VISAKHAPATNAM', 'KRISHNA', 'GUNTUR', 'EAST GODAVARI', 'CHITTOOR']),
+    'MADHYA PRADESH': (5.0, 52, ['INDORE', 'BHOPAL', 'JABALPUR', 'GWALIOR', 'UJJAIN']),
+    'KERALA': (5.0, 14, ['ERNAKULAM', 'THIRUVANANTHAPURAM', 'THRISSUR', 'KOZHIKODE', 'MALAPPURAM']),
+    'TELANGANA': (4.5, 33, ['HYDERABAD', 'RANGAREDDY', 'MEDCHAL', 'WARANGAL', 'KARIMNAGAR']),
+    'BIHAR': (4.0, 38, ['PATNA', 'GAYA', 'MUZAFFARPUR', 'BHAGALPUR', 'DARBHANGA']),
+    'PUNJAB': (4.0, 23, ['LUDHIANA', 'AMRITSAR', 'JALANDHAR', 'PATIALA', 'BATHINDA']),
+    'HARYANA': (3.5, 22, ['GURGAON', 'FARIDABAD', 'PANIPAT', 'AMBALA', 'HISAR']),
+    'ODISHA': (3.5, 30, ['KHORDHA', 'CUTTACK', 'GANJAM', 'SUNDARGARH', 'BALASORE']),
+    'DELHI': (3.0, 11, ['NEW DELHI', 'SOUTH DELHI', 'NORTH WEST DELHI', 'EAST DELHI', 'WEST DELHI']),
+    'JHARKHAND': (2.0, 24, ['RANCHI', 'DHANBAD', 'EAST SINGHBHUM', 'BOKARO', 'HAZARIBAGH']),
+    'CHHATTISGARH': (1.8, 33, ['RAIPUR', 'BILASPUR', 'DURG', 'KORBA']),
+    'ASSAM': (1.6, 35, ['KAMRUP METROPOLITAN', 'DIBRUGARH', 'NAGAON', 'CACHAR']),
+    'UTTARAKHAND': (1.5, 13, ['DEHRADUN', 'HARIDWAR', 'NAINITAL', 'UDHAM SINGH NAGAR']),
+    'HIMACHAL PRADESH': (1.2, 12, ['SHIMLA', 'KANGRA', 'MANDI', 'SOLAN']),
+    'JAMMU AND KASHMIR': (1.0, 20, ['JAMMU', 'SRINAGAR', 'ANANTNAG', 'BARAMULLA']),
+    'GOA': (0.6, 2, ['NORTH GOA', 'SOUTH GOA']),
+    'CHANDIGARH': (0.4, 1, ['CHANDIGARH']),
+    'TRIPURA': (0.3, 8, ['WEST TRIPURA', 'GOMATI']),
+    'PUDUCHERRY': (0.25, 4, ['PUDUCHERRY', 'KARAIKAL']),
+    'MEGHALAYA': (0.2, 12, ['EAST KHASI HILLS', 'WEST GARO HILLS']),
+    'MANIPUR': (0.15, 16, ['IMPHAL WEST', 'IMPHAL EAST']),
+    'NAGALAND': (0.15, 16, ['KOHIMA', 'DIMAPUR']),
+    'ARUNACHAL PRADESH': (0.12, 25, ['PAPUM PARE', 'LOHIT']),
+    'MIZORAM': (0.1, 11, ['AIZAWL', 'LUNGLEI']),
+    'SIKKIM': (0.1, 4, ['EAST SIKKIM', 'SOUTH SIKKIM']),
+    'LADAKH': (0.05, 2, ['LEH', 'KARGIL']),
+}
+
+SYLLABLES = (
+    'AN', 'BA', 'CHA', 'DA', 'GA', 'HA', 'JA', 'KA', 'KHE', 'LA', 'MA', 'NA', 'PA', 'PU', 'RA',
+    'SA', 'SHI', 'TA', 'THA', 'VA', 'YA', 'DHA', 'GIR', 'KOT', 'NAG', 'PUR', 'PET', 'GANJ',
+    'WADI', 'NAGAR', 'PALLI', 'GARH', 'ABAD', 'HALLI', 'KERE', 'UR', 'DI', 'LI', 'RI', 'NI',
+)
+PLACE_ENDINGS = ('PUR', 'NAGAR', 'GANJ', 'ABAD', 'PALLI', 'GARH', 'HALLI', 'PET', 'WADI', 'KOTE', 'UR')
+STREETS = ('MAIN ROAD', 'STATION ROAD', 'MG ROAD', 'MARKET ROAD', 'BAZAR', 'COLLEGE ROAD',
+           'GANDHI CHOWK', 'NEHRU ROAD', 'TEMPLE STREET', 'BUS STAND ROAD', 'NATIONAL HIGHWAY')
+BRANCH_SUFFIXES = ('', '', '', ' MAIN', ' BAZAR', ' TOWN', ' ROAD', ' CHOWK', ' COLONY', ' MARKET')
+IFSC_DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+def zipf_weights(count, exponent):
+    return [1 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+def place_name(rng, used):
+    while True:
+        name = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 2))) + rng.choice(PLACE_ENDINGS)
+        if name not in used:
+            used.add(name)
+            return name
+
+
+def ifsc_suffix(number):
+    # Scrambled but unique: 7919 is coprime to 36**6
+    number *= 7919
+    digits = []
+    for _ in range(6):
+        number, digit = divmod(number, len(IFSC_DIGITS))
+        digits.append(IFSC_DIGITS[digit])
+    return ''.join(reversed(digits))
+
+
+def make_banks(rng, count):
+    banks = list(BANKS[:count])
+    used_codes = {code for _, code in banks}
+    used_places = set()
+    while len(banks) < count:
+        place = place_name(rng, used_places)
+        code = ''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') for _ in range(4))
+        if code in used_codes:
+            continue
+        used_codes.add(code)
+        banks.append((f"{place} {rng.choice(TAIL_BANK_SUFFIXES)}", code))
+    return banks
+
+
+def make_geography(rng):
+    # (state, district, city, locality names) with their relative weights
+    used = set()
+    places = []
+    weights = []
+    for state, (share, district_count, known) in STATES.items():
+        district_count = max(len(known), district_count)
+        districts = known + [place_name(rng, used) for _ in range(district_count - len(known))]
+        district_weights = zipf_weights(len(districts), 0.9)
+        total = sum(district_weights)
+        for district, district_weight in zip(districts, district_weights):
+            cities = [district] + [place_name(rng, used) for _ in range(rng.randint(1, 6))]
+            city_weights = zipf_weights(len(cities), 1.3)
+            city_total = sum(city_weights)
+            for city, city_weight in zip(cities, city_weights):
+                localities = [place_name(rng, set()) for _ in range(rng.randint(2, 12))]
+                places.append((state, district, city, localities, rng.randint(110000, 855999)))
+                weights.append(share * district_weight / total * city_weight / city_total)
+    return places, weights
+
+
+def generate_rows(rows, seed=42, bank_count=170):
+    """Yield rows shaped like bank_branches.csv; the same seed gives the same rows."""
+    rng = random.Random(seed)
+    banks = make_banks(rng, bank_count)
+    places, place_weights = make_geography(rng)
+    bank_weights = list(itertools.accumulate(zipf_weights(len(banks), 1.1)))
+    place_weights = list(itertools.accumulate(place_weights))
+    counters = [0] * len(banks)
+
+    for start in range(0, rows, 10000):
+        size = min(10000, rows - start)
+        bank_picks = rng.choices(range(len(banks)), cum_weights=bank_weights, k=size)
+        place_picks = rng.choices(places, cum_weights=place_weights, k=size)
+        for bank_index, (state, district, city, localities, pin) in zip(bank_picks, place_picks):
+            bank_name, code = banks[bank_index]
+            number = counters[bank_index]
+            counters[bank_index] += 1
+            locality = rng.choice(localities)
+            branch = locality if rng.random() < 0.6 else f"{city}{rng.choice(BRANCH_SUFFIXES)}"
+            yield {
+                'ifsc': f"{code}0{ifsc_suffix(number)}",
+                'bank_id': bank_index + 1,
+                'branch': branch,
+                'address': (
+                    f"{rng.randint(1, 999)}, {rng.choice(STREETS)}, {locality}, {city}, "
+                    f"{district}, PIN {pin + rng.randint(0, 99)}"
+                ),
+                'city': city,
+                'district': district,
+                'state': state,
+                'bank_name': bank_name
+            }
+
+
+def write_csv(path, rows, seed=42):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(generate_rows(rows, seed))
+
+
+def load_csv(path, database):
+    # Load through the normal ingestion path into a fresh database file
+    from app import create_app
+    from app.config import BuildConfig
+
+    config_class = type('SyntheticConfig', (BuildConfig,), {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.abspath(database)}",
+        'DATA_SOURCE': os.path.abspath(path),
+        'DATASET_VERSION_CHECK_INTERVAL': None,
+    })
+    return create_app(config_class)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a seeded synthetic bank_branches.csv')
+    parser.add_argument('--rows', type=int, default=127000, help='Branches to generate, e.g. 127000, 1000000, 10000000')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='synthetic_branches.csv')
+    parser.add_argument('--load', metavar='DATABASE', help='Also load the CSV into this (new) SQLite file')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    write_csv(args.output, args.rows, args.seed)
+    print(f"wrote {args.rows} rows to {args.output} in {time.perf_counter() - start:.1f}s")
+    if args.load:
+        if os.path.exists(args.load):
+            parser.error(f"{args.load} already exists")
+        start = time.perf_counter()
+        load_csv(args.output, args.load)
+        print(f"loaded into {args.load} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
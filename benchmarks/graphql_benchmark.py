@@ -0,0 +1,59 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import event
+
+from app import create_app
+from app.models import db
+from app.schema import schema, graphql_context
+
+QUERIES = {
+    'branchByIfsc': '{ branchByIfsc(ifsc: "SBIN0000001") { ifsc branch bank { name } } }',
+    'branchesByCity': '{ branchesByCity(city: "Mumbai", limit: 500) { ifsc branch bank { name } } }',
+    'branchesByBank': '{ branchesByBank(bankName: "HDFC", limit: 500) { ifsc city bank { name } } }',
+    'branchesByState': '{ branchesByState(state: "Karnataka", limit: 500) { ifsc city bank { name } } }',
+    'branches': '{ branches(first: 500) { edges { node { ifsc bank { name } } } } }',
+    'banks': '{ banks(first: 20) { edges { node { name } } } }',
+}
+
+
+def run_query(query, context):
+    statements = []
+
+    def count(*args):
+        statements.append(args[2])
+
+    event.listen(db.engine, 'before_cursor_execute', count)
+    try:
+        start = time.perf_counter()
+        result = schema.execute(query, context_value=context)
+        elapsed = (time.perf_counter() - start) * 1000
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count)
+        db.session.remove()
+
+    if result.errors:
+        raise RuntimeError(result.errors)
+    return len(statements), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Count SQL statements per GraphQL query')
+    parser.add_argument('names', nargs='*', default=list(QUERIES))
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        print(f"{'query':<18}{'unbatched sql':>15}{'ms':>10}{'batched sql':>15}{'ms':>10}")
+        for name in args.names:
+            unbatched, unbatched_ms = run_query(QUERIES[name], {})
+            batched, batched_ms = run_query(QUERIES[name], graphql_context())
+            print(f"{name:<18}{unbatched:>15}{unbatched_ms:>10.1f}{batched:>15}{batched_ms:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
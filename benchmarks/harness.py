@@ -0,0 +1,287 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import event
+
+from app import create_app
+from app.config import Config
+from app.models import db, Bank, Branch
+from generate_dataset import load_csv, write_csv
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+GRAPHQL_QUERIES = {
+    # The examples shown in GraphiQL
+    'gql_example_banks': ('query GetBanks { banks { edges { node { id name } } } }', {}),
+    'gql_example_branch_by_ifsc': (
+        'query GetBranchByIFSC($ifsc: String!) { branchByIfsc(ifsc: $ifsc) '
+        '{ ifsc branch city state bank { name } } }',
+        {'ifsc': '{ifsc}'}
+    ),
+    'gql_example_branches_by_bank': (
+        'query GetSBIBranches($bankName: String!) { branchesByBank(bankName: $bankName) '
+        '{ ifsc branch city state } }',
+        {'bankName': '{bank_name}'}
+    ),
+    'gql_branches_by_city': (
+        'query ($city: String!) { branchesByCity(city: $city, limit: 100) { ifsc branch bank { name } } }',
+        {'city': '{city}'}
+    ),
+    'gql_branches_by_ifscs': (
+        'query ($ifscs: [String!]!) { branchesByIfscs(ifscs: $ifscs) { branches { ifsc } missing } }',
+        {'ifscs': '{ifscs}'}
+    ),
+    'gql_branches_connection': (
+        '{ branches(first: 100) { edges { node { ifsc city bank { name } } } pageInfo { endCursor } } }',
+        {}
+    ),
+}
+
+
+def dataset_database(rows, seed):
+    # Generated once per (rows, seed) and reused by later runs
+    os.makedirs(DATA_DIR, exist_ok=True)
+    database = os.path.join(DATA_DIR, f'synthetic-{rows}-{seed}.db')
+    if not os.path.exists(database):
+        csv_path = os.path.join(DATA_DIR, f'synthetic-{rows}-{seed}.csv')
+        start = time.perf_counter()
+        write_csv(csv_path, rows, seed)
+        print(f"generated {rows} rows in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        start = time.perf_counter()
+        load_csv(csv_path, database)
+        print(f"loaded {database} in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        os.remove(csv_path)
+    return database
+
+
+def make_app(database, cache):
+    config_class = type('HarnessConfig', (Config,), {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.abspath(database)}",
+        'ALLOW_SAMPLE_DATA': False,
+        'RESPONSE_CACHE_ENABLED': cache,
+        'SLOW_REQUEST_THRESHOLD_MS': None,
+        'DATASET_VERSION_CHECK_INTERVAL': None,
+    })
+    return create_app(config_class)
+
+
+def sample_values(app):
+    with app.app_context():
+        ifscs = [ifsc for (ifsc,) in db.session.query(Branch.ifsc).order_by(Branch.id).limit(100)]
+        bank_id, bank_name = db.session.query(Bank.id, Bank.name).order_by(Bank.id).first()
+        city, district, state = db.session.query(Branch.city, Branch.district, Branch.state).group_by(
+            Branch.city, Branch.district, Branch.state
+        ).order_by(db.func.count(Branch.id).desc()).first()
+        db.session.remove()
+    return {
+        'ifsc': ifscs[0], 'ifscs': ifscs, 'bank_id': bank_id, 'bank_name': bank_name,
+        'city': city, 'district': district, 'state': state
+    }
+
+
+def fill(value, values):
+    if isinstance(value, str) and value.startswith('{') and value.endswith('}'):
+        return values[value[1:-1]]
+    return value
+
+
+def scenarios(values):
+    v = values
+    rest = {
+        'index': '/',
+        'banks': '/api/banks',
+        'bank_branches': f"/api/banks/{v['bank_id']}/branches",
+        'bank_branches_cursor': f"/api/banks/{v['bank_id']}/branches?after=",
+        'branches': '/api/branches',
+        'branches_cursor': '/api/branches?after=&per_page=100',
+        'branches_city_exact': f"/api/branches?city={v['city']}&match=exact",
+        'branches_state_prefix': f"/api/branches?state={v['state'][:3]}&match=prefix",
+        'branches_district_substring': f"/api/branches?district={v['district'][1:5]}",
+        'branch_by_ifsc': f"/api/branches/{v['ifsc']}",
+        'ifsc_validate': f"/api/ifsc/{v['ifsc']}/validate",
+        'search': f"/api/search?q={v['city']}",
+        'search_cursor': f"/api/search?q={v['city']}&after=",
+        'suggest': f"/api/suggest?q={v['city'][:3]}",
+        'export_ndjson': f"/api/export?city={v['city']}&match=exact",
+        'export_csv': f"/api/export?city={v['city']}&match=exact&format=csv",
+        'stats': '/api/stats',
+        'stats_cities': '/api/stats/cities',
+        'stats_districts_by_state': f"/api/stats/districts_by_state?state={v['state']}",
+        'geo_states': '/api/geo/states',
+        'geo_districts': f"/api/geo/states/{v['state']}/districts",
+        'geo_cities': f"/api/geo/districts/{v['district']}/cities?state={v['state']}",
+        'geo_banks': f"/api/geo/cities/{v['city']}/banks?district={v['district']}",
+        'cache_stats': '/api/cache/stats',
+        'metrics': '/metrics',
+    }
+    result = {name: ('GET', path, None) for name, path in rest.items()}
+    result['bulk_lookup'] = ('POST', '/api/branches/bulk', {'ifscs': v['ifscs']})
+    for name, (query, variables) in GRAPHQL_QUERIES.items():
+        variables = {key: fill(value, values) for key, value in variables.items()}
+        result[name] = ('POST', '/gql', {'query': query, 'variables': variables})
+    return result
+
+
+def request(client, method, path, body, headers):
+    if method == 'POST':
+        response = client.post(path, json=body, headers=headers)
+    else:
+        response = client.get(path, headers=headers)
+    size = sum(len(chunk) for chunk in response.response)
+    response.close()
+    return response.status_code, size
+
+
+def run_scenario(client, method, path, body, headers, iterations, max_seconds, statements):
+    status, size = request(client, method, path, body, headers)
+
+    # Python allocations of one request, outside the timed loop
+    tracemalloc.start()
+    request(client, method, path, body, headers)
+    peak_alloc = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    timings = []
+    errors = 0
+    statements[0] = 0
+    deadline = time.perf_counter() + max_seconds
+    started = time.perf_counter()
+    while len(timings) < iterations and (len(timings) < 5 or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        code, _ = request(client, method, path, body, headers)
+        timings.append(time.perf_counter() - start)
+        errors += code >= 400
+    elapsed = time.perf_counter() - started
+
+    timings.sort()
+    return {
+        'method': method,
+        'path': path,
+        'status': status,
+        'response_bytes': size,
+        'requests': len(timings),
+        'errors': errors,
+        'throughput_rps': round(len(timings) / elapsed, 1),
+        'p50_ms': round(statistics.median(timings) * 1000, 3),
+        'p99_ms': round(timings[max(int(len(timings) * 0.99) - 1, 0)] * 1000, 3),
+        'sql_statements': round(statements[0] / len(timings), 2),
+        'peak_alloc_kb': round(peak_alloc / 1024, 1),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, tolerance):
+    # A scenario regresses when its p50 grows or its throughput drops by more than tolerance
+    regressions = []
+    print(f"{'scenario':<30}{'p50 base':>10}{'p50 now':>10}{'rps base':>11}{'rps now':>11}", file=sys.stderr)
+    for name, now in results['scenarios'].items():
+        base = baseline['scenarios'].get(name)
+        if base is None:
+            continue
+        flag = ''
+        if (now['p50_ms'] > base['p50_ms'] * (1 + tolerance)
+                or now['throughput_rps'] < base['throughput_rps'] * (1 - tolerance)):
+            regressions.append(name)
+            flag = '  REGRESSED'
+        print(
+            f"{name:<30}{base['p50_ms']:>10.2f}{now['p50_ms']:>10.2f}"
+            f"{base['throughput_rps']:>11.1f}{now['throughput_rps']:>11.1f}{flag}",
+            file=sys.stderr
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Drive every REST route and the GraphQL examples through the test client and report JSON'
+    )
+    parser.add_argument('--rows', type=int, default=127000, help='Synthetic dataset size (127000, 1000000, 10000000)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database', help='Benchmark an existing database instead of a synthetic one')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--max-seconds', type=float, default=5.0, help='Time budget per scenario')
+    parser.add_argument('--cache', action='store_true', help='Keep the response cache enabled')
+    parser.add_argument('--accept-encoding', help='Accept-Encoding sent with every request, e.g. "br, gzip"')
+    parser.add_argument('--only', nargs='+', help='Scenario names to run')
+    parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+    parser.add_argument('--compare', help='Baseline JSON report to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.1)
+    args = parser.parse_args()
+
+    database = args.database or dataset_database(args.rows, args.seed)
+    start = time.perf_counter()
+    app = make_app(database, args.cache)
+    startup_seconds = time.perf_counter() - start
+    values = sample_values(app)
+
+    statements = [0]
+    with app.app_context():
+        @event.listens_for(db.engine, 'before_cursor_execute')
+        def count_statement(*args):
+            statements[0] += 1
+
+    client = app.test_client()
+    headers = {'Accept-Encoding': args.accept_encoding} if args.accept_encoding else {}
+    results = {}
+    for name, (method, path, body) in scenarios(values).items():
+        if args.only and name not in args.only:
+            continue
+        results[name] = run_scenario(
+            client, method, path, body, headers, args.iterations, args.max_seconds, statements
+        )
+        print(f"{name}: {results[name]['p50_ms']}ms p50", file=sys.stderr)
+
+    with app.app_context():
+        branches = Branch.query.count()
+
+    report = {
+        'commit': git_commit(),
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'database': os.path.abspath(database),
+        'rows': branches,
+        'seed': None if args.database else args.seed,
+        'response_cache': args.cache,
+        'json_encoder': type(app.json).__name__,
+        'accept_encoding': args.accept_encoding,
+        'startup_seconds': round(startup_seconds, 3),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'scenarios': results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print(f"regressed: {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
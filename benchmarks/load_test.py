@@ -0,0 +1,95 @@
+import argparse
+import http.client
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+DEFAULT_PATHS = [
+    '/api/branches/SBIN0000001',
+    '/api/branches?city=Mumbai&match=exact&per_page=50',
+    '/api/banks',
+    '/api/stats',
+    '/api/search?q=Mumbai&per_page=20',
+]
+
+
+def client(port, paths, duration, results):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    requests = errors = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        for path in paths:
+            connection.request('GET', path)
+            response = connection.getresponse()
+            response.read()
+            requests += 1
+            errors += response.status != 200
+    connection.close()
+    results.put((requests, errors))
+
+
+def wait_for_server(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/api/stats')
+            connection.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def run(workers, threads, clients, duration, port, paths):
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), GUNICORN_THREADS=str(threads),
+               BIND=f'127.0.0.1:{port}')
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--log-level', 'warning'],
+        cwd=ROOT, env=env
+    )
+    try:
+        wait_for_server(port)
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=client, args=(port, paths, duration, results))
+            for _ in range(clients)
+        ]
+        for process in processes:
+            process.start()
+        totals = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+    finally:
+        server.terminate()
+        server.wait()
+
+    requests = sum(count for count, _ in totals)
+    errors = sum(count for _, count in totals)
+    return requests / duration, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure throughput as gunicorn workers scale')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('paths', nargs='*', default=DEFAULT_PATHS)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8}{'threads':>9}{'clients':>9}{'req/s':>10}{'scaling':>9}{'errors':>8}")
+    baseline = None
+    for workers in args.workers:
+        rate, errors = run(workers, args.threads, args.clients, args.duration, args.port, args.paths)
+        baseline = baseline or rate
+        print(f"{workers:>8}{args.threads:>9}{args.clients:>9}{rate:>10.0f}{rate / baseline:>9.2f}{errors:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.filters import filter_branches
+from app.models import Branch
+from app.query_plans import FILTER_COMBINATIONS, SAMPLE_FILTERS, query_plan, table_scans
+
+
+def main():
+    app = create_app()
+    failures = 0
+    with app.app_context():
+        for match, names in FILTER_COMBINATIONS:
+            filters = {name: SAMPLE_FILTERS[name] for name in names}
+            plan = query_plan(filter_branches(Branch.query, match=match, **filters))
+            ok = not table_scans(plan)
+            failures += not ok
+            print(f"{'ok  ' if ok else 'SCAN'} match={match} {','.join(names)}")
+            for detail in plan:
+                print(f"       {detail}")
+
+    print(f"{failures} filter combinations scan the branches table")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.models import Branch
+from app.routes import ilike_search_query
+from app.search import search_branches
+
+DEFAULT_TERMS = ['Mumbai', 'SBIN', 'Andheri', 'Karnataka', 'HDFC', 'Main Road', 'Kolkata', 'xyzzy']
+
+
+def ilike_search(term, page, per_page):
+    return ilike_search_query(term).paginate(page=page, per_page=per_page, error_out=False)
+
+
+def time_search(func, term, repeat, per_page):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(term, 1, per_page)
+        timings.append((time.perf_counter() - start) * 1000)
+    return result.total, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare FTS5 search with the ilike scan')
+    parser.add_argument('terms', nargs='*', default=DEFAULT_TERMS)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--per-page', type=int, default=50)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        print(f"branches: {Branch.query.count()}")
+        print(f"{'term':<15}{'ilike hits':>12}{'ilike ms':>12}{'fts hits':>12}{'fts ms':>12}")
+        for term in args.terms:
+            ilike_total, ilike_ms = time_search(ilike_search, term, args.repeat, args.per_page)
+            fts_total, fts_ms = time_search(search_branches, term, args.repeat, args.per_page)
+            print(f"{term:<15}{ilike_total:>12}{ilike_ms:>12.2f}{fts_total:>12}{fts_ms:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.config import Config
+from app.filters import filter_branches
+from app.models import db, Branch
+from app.search import build_match_query
+from app.serializers import branch_rows, eager_banks, serialize_branches
+from sqlalchemy import text
+
+
+def search_query():
+    ids = [row[0] for row in db.session.execute(
+        text("SELECT rowid FROM branches_fts WHERE branches_fts MATCH :match LIMIT 1000"),
+        {'match': build_match_query('Mumbai')}
+    )]
+    return Branch.query.filter(Branch.id.in_(ids))
+
+
+# The page query behind each list endpoint
+ENDPOINTS = {
+    '/api/branches': lambda: Branch.query,
+    '/api/branches?city=': lambda: filter_branches(Branch.query, city='Mumbai', match='exact'),
+    '/api/banks/1/branches': lambda: Branch.query.filter_by(bank_id=1),
+    '/api/search?q=': search_query,
+}
+
+
+def orm_page(app, query, per_page):
+    # The previous pipeline: ORM entities with eagerly loaded banks
+    branches = eager_banks(query).order_by(Branch.id).limit(per_page).all()
+    return app.json.response({'data': serialize_branches(branches)}).get_data()
+
+
+def current_page(app, query, per_page):
+    branches = branch_rows(query).order_by(Branch.id).limit(per_page).all()
+    return app.json.response({'data': serialize_branches(branches)}).get_data()
+
+
+def time_page(app, func, repeat):
+    timings = []
+    with app.app_context():
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+            db.session.remove()
+    return statistics.median(timings)
+
+
+def make_app(encoder):
+    config_class = type(f'{encoder.title()}Config', (Config,), {'JSON_ENCODER': encoder})
+    return create_app(config_class)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time building and encoding one page per list endpoint')
+    parser.add_argument('--per-page', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    stdlib_app = make_app('stdlib')
+    orjson_app = make_app('orjson')
+    print(f"encoders: {type(stdlib_app.json).__name__}, {type(orjson_app.json).__name__}")
+    print(f"{'endpoint':<24}{'orm+stdlib':>12}{'rows+stdlib':>13}{'rows+orjson':>13}{'speedup':>9}")
+    for name, make_query in ENDPOINTS.items():
+        orm = time_page(
+            stdlib_app, lambda: orm_page(stdlib_app, make_query(), args.per_page), args.repeat
+        )
+        stdlib = time_page(
+            stdlib_app, lambda: current_page(stdlib_app, make_query(), args.per_page), args.repeat
+        )
+        fast = time_page(
+            orjson_app, lambda: current_page(orjson_app, make_query(), args.per_page), args.repeat
+        )
+        print(f"{name:<24}{orm:>12.2f}{stdlib:>13.2f}{fast:>13.2f}{orm / fast:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.stats import get_stats_snapshot
+from app.suggest import SUGGEST_FIELDS, build_suggest_index, get_suggest_index, suggest
+
+
+def sample_prefixes(index, field, count, rng):
+    values = index[field].values
+    prefixes = []
+    for _ in range(count):
+        value = rng.choice(values)
+        prefixes.append(value[:rng.randint(1, min(len(value), 8))])
+    return prefixes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time /api/suggest index builds and lookups')
+    parser.add_argument('--lookups', type=int, default=2000)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    app = create_app()
+    rng = random.Random(args.seed)
+    with app.app_context():
+        start = time.perf_counter()
+        build_suggest_index(get_stats_snapshot())
+        print(f"index build: {(time.perf_counter() - start) * 1000:.1f}ms")
+        index = get_suggest_index()
+
+        print(f"{'field':<10}{'values':>9}{'median us':>11}{'p99 us':>9}{'max us':>9}")
+        for field in SUGGEST_FIELDS:
+            timings = []
+            for prefix in sample_prefixes(index, field, args.lookups, rng):
+                start = time.perf_counter()
+                suggest(prefix, [field], args.limit)
+                timings.append((time.perf_counter() - start) * 1e6)
+            timings.sort()
+            p99 = timings[int(len(timings) * 0.99) - 1]
+            print(
+                f"{field:<10}{len(index[field]):>9}{statistics.median(timings):>11.1f}"
+                f"{p99:>9.1f}{timings[-1]:>9.1f}"
+            )
+
+
+if __name__ == '__main__':
+    main()
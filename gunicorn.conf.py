@@ -0,0 +1,21 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+
+wsgi_app = 'wsgi:app'
+bind = os.environ.get('BIND', '0.0.0.0:8000')
+
+# SQLite reads release the GIL, so a few threads per process help; scale
+# processes with cores for the CPU-bound serialization work.
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+preload_app = False
+keepalive = 5
+timeout = 30
+
+
+def on_starting(server):
+    # Load the dataset once in a short-lived process instead of in every worker
+    subprocess.run([sys.executable, '-m', 'app.serving'], check=True)
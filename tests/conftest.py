@@ -0,0 +1,86 @@
+import csv
+import pytest
+from sqlalchemy import event
+from app import create_app
+from app.config import Config
+from app.models import db
+
+BANKS = [
+    ('SBIN', 'STATE BANK OF INDIA'),
+    ('HDFC', 'HDFC BANK'),
+    ('ICIC', 'ICICI BANK LIMITED'),
+    ('UTIB', 'AXIS BANK'),
+]
+PLACES = [
+    ('MUMBAI', 'MUMBAI', 'MAHARASHTRA'),
+    ('PUNE', 'PUNE', 'MAHARASHTRA'),
+    ('BANGALORE', 'BANGALORE URBAN', 'KARNATAKA'),
+    ('MYSORE', 'MYSORE', 'KARNATAKA'),
+    ('NEW DELHI', 'NEW DELHI', 'DELHI'),
+    ('CHENNAI', 'CHENNAI', 'TAMIL NADU'),
+]
+ROWS_PER_BANK = 300
+
+
+def write_dataset(path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ifsc', 'bank_id', 'branch', 'address', 'city', 'district', 'state', 'bank_name'])
+        for bank_id, (code, name) in enumerate(BANKS, 1):
+            for number in range(ROWS_PER_BANK):
+                city, district, state = PLACES[number % len(PLACES)]
+                writer.writerow([
+                    f'{code}0{number:06d}', bank_id, f'{city} BRANCH {number}',
+                    f'{number} MAIN ROAD, {city}', city, district, state, name
+                ])
+
+
+@pytest.fixture(scope='session')
+def config_class(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('data')
+    source = directory / 'bank_branches.csv'
+    write_dataset(source)
+    database = directory / 'test.db'
+    return type('TestConfig', (Config,), {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database}',
+        'DATA_SOURCE': str(source),
+        'DATA_LOCK_PATH': str(directory / 'test.db.lock'),
+        'ALLOW_SAMPLE_DATA': False,
+        'RESPONSE_CACHE_ENABLED': False,
+        'SLOW_REQUEST_THRESHOLD_MS': None,
+        'TESTING': True,
+    })
+
+
+@pytest.fixture(scope='session')
+def app(config_class):
+    return create_app(config_class)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_client(app, config_class):
+    # A client for another app on the session database, with config overrides
+    def make(**overrides):
+        overrides.setdefault('LOAD_DATA_ON_STARTUP', False)
+        return create_app(type('OverrideConfig', (config_class,), overrides)).test_client()
+    return make
+
+
+@pytest.fixture
+def statements(app):
+    # SQL statements executed while the test runs
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    yield executed
+    event.remove(engine, 'before_cursor_execute', record)
@@ -0,0 +1,59 @@
+import asyncio
+import pytest
+from app.asgi import AsgiApp
+from app.cache import CachedResponse, response_cache
+from app.version import get_dataset_version
+
+
+@pytest.fixture
+def asgi(app):
+    asgi_app = AsgiApp(app, 2)
+    yield asgi_app
+    asgi_app.executor.shutdown()
+
+
+def call(asgi_app, path, headers=()):
+    scope = {
+        'type': 'http', 'method': 'GET', 'path': path, 'query_string': b'', 'http_version': '1.1',
+        'headers': [(name.lower().encode(), value.encode()) for name, value in headers],
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(asgi_app(scope, receive, send))
+    return messages
+
+
+def test_buffered_response_is_sent_in_one_body_message(asgi):
+    messages = call(asgi, '/api/banks')
+    assert [message['type'] for message in messages] == ['http.response.start', 'http.response.body']
+    assert messages[1]['body'].startswith(b'{')
+
+
+def test_streamed_response_is_sent_in_chunks(asgi):
+    messages = call(asgi, '/api/export')
+    assert messages[0]['status'] == 200
+    assert messages[-1] == {'type': 'http.response.body', 'body': b''}
+    assert all(message.get('more_body') for message in messages[1:-1])
+
+
+def test_ifsc_fast_path_uses_the_cached_etag(app, asgi, monkeypatch):
+    monkeypatch.setitem(app.config, 'RESPONSE_CACHE_ENABLED', True)
+    path = '/api/branches/SBIN0000001'
+    entry = CachedResponse(b'{"data":{},"success":true}\n', 'application/json', 'carried', {})
+    response_cache.put((get_dataset_version(), path), entry)
+    try:
+        start = call(asgi, path)[0]
+        headers = dict(start['headers'])
+        assert headers[b'etag'] == b'"carried"'
+        assert headers[b'vary'] == b'Accept-Encoding'
+
+        start = call(asgi, path, [('If-None-Match', '"carried"')])[0]
+        assert start['status'] == 304
+    finally:
+        response_cache.clear()
@@ -0,0 +1,33 @@
+import pytest
+
+
+def validate(client, code):
+    response = client.get(f'/api/ifsc/{code}/validate')
+    assert response.status_code == 200
+    return response.get_json()['data']
+
+
+@pytest.mark.parametrize('code', ['SBIN000001', 'SBIN1000001', 'SBIN00000011', 'SBIN'])
+def test_malformed_code_has_no_bank(client, code):
+    result = validate(client, code)
+    assert result['valid_format'] is False
+    assert result['valid'] is False
+    assert result['bank_code'] is None
+    assert result['bank'] is None
+    assert result['bank_branch_count'] is None
+
+
+def test_valid_code(client):
+    result = validate(client, 'sbin0000001')
+    assert result['valid'] is True
+    assert result['bank_code'] == 'SBIN'
+    assert result['bank']['name'] == 'STATE BANK OF INDIA'
+    assert result['exists'] is True
+
+
+def test_unknown_bank_code(client):
+    result = validate(client, 'ABCD0000001')
+    assert result['valid_format'] is True
+    assert result['bank_code'] == 'ABCD'
+    assert result['bank'] is None
+    assert result['reason'] == 'Unknown bank code'
@@ -0,0 +1,38 @@
+import pytest
+
+INVALID = {'success': False, 'error': 'ifscs must be a list of strings'}
+
+
+@pytest.mark.parametrize('body', [['SBIN0000001'], 'SBIN0000001', 42, None, {}, {'ifscs': [1]}])
+def test_bulk_rejects_bodies_without_an_ifscs_list(client, body):
+    response = client.post('/api/branches/bulk', json=body)
+    assert response.status_code == 400
+    assert response.get_json() == INVALID
+
+
+def test_bulk_lookup(client):
+    response = client.post('/api/branches/bulk', json={'ifscs': ['sbin0000001', 'XXXX0000000']})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [branch['ifsc'] for branch in body['data']] == ['SBIN0000001']
+    assert body['missing'] == ['XXXX0000000']
+
+
+def test_bulk_lookup_without_the_ifsc_index_matches_the_index(client, make_client):
+    body = {'ifscs': ['HDFC0000002', 'sbin0000001', 'XXXX0000000', 'UTIB0000299']}
+    unindexed = make_client(IFSC_INDEX_ENABLED=False)
+    response = unindexed.post('/api/branches/bulk', json=body)
+    assert response.status_code == 200
+    assert response.data == client.post('/api/branches/bulk', json=body).data
+    assert response.get_json()['found'] == 3
+
+
+def test_graphql_bulk_lookup(client):
+    query = '{ branchesByIfscs(ifscs: ["SBIN0000001", "XXXX0000000"]) { branches { ifsc bank { name } } missing } }'
+    response = client.post('/gql', json={'query': query})
+    assert response.status_code == 200
+    result = response.get_json()['data']['branchesByIfscs']
+    assert result == {
+        'branches': [{'ifsc': 'SBIN0000001', 'bank': {'name': 'STATE BANK OF INDIA'}}],
+        'missing': ['XXXX0000000']
+    }
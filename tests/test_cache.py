@@ -0,0 +1,76 @@
+import csv
+import pytest
+from app.cache import response_cache
+from app.database import reload_dataset
+
+
+@pytest.fixture
+def cached_client(make_client):
+    client = make_client(RESPONSE_CACHE_ENABLED=True)
+    response_cache.clear()
+    yield client
+    response_cache.clear()
+
+
+def revalidate(client, path, response):
+    return client.get(path, headers={'If-None-Match': response.headers['ETag']})
+
+
+def test_hit_and_304(cached_client):
+    first = cached_client.get('/api/banks')
+    assert first.status_code == 200 and first.headers['ETag']
+    hits = response_cache.stats()['hits']
+
+    second = cached_client.get('/api/banks')
+    assert second.get_data() == first.get_data()
+    assert second.headers['ETag'] == first.headers['ETag']
+    assert response_cache.stats()['hits'] == hits + 1
+
+    not_modified = revalidate(cached_client, '/api/banks', first)
+    assert not_modified.status_code == 304
+    assert not_modified.get_data() == b''
+
+
+def test_lru_eviction(cached_client, monkeypatch):
+    sizes = [len(cached_client.get(path).get_data()) for path in ('/api/geo/states', '/api/stats')]
+    response_cache.clear()
+    # Room for either entry but not both
+    monkeypatch.setattr(response_cache, 'max_bytes', max(sizes))
+    cached_client.get('/api/geo/states')
+    evictions = response_cache.stats()['evictions']
+    cached_client.get('/api/stats')
+    stats = response_cache.stats()
+    assert stats['evictions'] == evictions + 1
+    assert stats['entries'] == 1
+
+
+def test_version_change_after_sync_invalidates(cached_client, config_class, tmp_path):
+    with open(config_class.DATA_SOURCE, newline='') as f:
+        rows = list(csv.DictReader(f))
+    changed = rows[1]['ifsc']
+    rows[1]['branch'] = 'RENAMED BRANCH'
+    modified = tmp_path / 'modified.csv'
+    with open(modified, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+
+    paths = ['/api/stats', f'/api/branches/{changed}', '/api/branches/SBIN0000000']
+    before = {path: cached_client.get(path) for path in paths}
+    app = cached_client.application
+    try:
+        with app.app_context():
+            assert reload_dataset(str(modified), incremental=True)
+        after = {path: revalidate(cached_client, path, before[path]) for path in paths}
+        assert after['/api/stats'].status_code == 200
+        assert after['/api/stats'].headers['ETag'] != before['/api/stats'].headers['ETag']
+        assert after[f'/api/branches/{changed}'].get_json()['data']['branch'] == 'RENAMED BRANCH'
+        # Untouched branches keep their cached entry and ETag across the sync
+        assert after['/api/branches/SBIN0000000'].status_code == 304
+    finally:
+        with app.app_context():
+            assert reload_dataset(config_class.DATA_SOURCE, incremental=True)
+
+    # Syncing back to the original rows restores the original version and ETags
+    restored = revalidate(cached_client, f'/api/branches/{changed}', before[f'/api/branches/{changed}'])
+    assert restored.status_code == 304
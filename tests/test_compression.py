@@ -0,0 +1,93 @@
+import gzip
+import pytest
+from app.cache import response_cache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+LIST_PATH = '/api/branches?limit=50'
+needs_brotli = pytest.mark.skipif(brotli is None, reason='brotli is not installed')
+
+
+@pytest.fixture
+def compressed_client(make_client):
+    return make_client(COMPRESSION_ENABLED=True, COMPRESSION_MIN_SIZE=1024)
+
+
+@pytest.fixture
+def cached_client(make_client):
+    client = make_client(COMPRESSION_ENABLED=True, COMPRESSION_MIN_SIZE=1024, RESPONSE_CACHE_ENABLED=True)
+    response_cache.clear()
+    yield client
+    response_cache.clear()
+
+
+def get(client, path, encoding=None, **headers):
+    if encoding:
+        headers['Accept-Encoding'] = encoding
+    return client.get(path, headers=headers)
+
+
+@pytest.mark.parametrize('encoding', ['gzip', pytest.param('br', marks=needs_brotli)])
+def test_responses_are_compressed_for_the_accepted_encoding(compressed_client, encoding):
+    plain = get(compressed_client, LIST_PATH)
+    assert 'Content-Encoding' not in plain.headers
+    assert 'Accept-Encoding' in plain.headers['Vary']
+
+    response = get(compressed_client, LIST_PATH, encoding)
+    assert response.headers['Content-Encoding'] == encoding
+    assert 'Accept-Encoding' in response.headers['Vary']
+    decompress = brotli.decompress if encoding == 'br' else gzip.decompress
+    assert decompress(response.data) == plain.data
+
+
+@needs_brotli
+def test_brotli_is_preferred(compressed_client):
+    assert get(compressed_client, LIST_PATH, 'gzip, deflate, br').headers['Content-Encoding'] == 'br'
+    assert get(compressed_client, LIST_PATH, 'br;q=0.5, gzip').headers['Content-Encoding'] == 'gzip'
+
+
+def test_small_responses_are_not_compressed(compressed_client):
+    response = get(compressed_client, '/api/branches/SBIN0000001', 'gzip')
+    assert len(response.data) < 1024
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+
+def test_streamed_exports_are_compressed(compressed_client):
+    plain = get(compressed_client, '/api/export?format=csv&state=KARNATAKA')
+    response = get(compressed_client, '/api/export?format=csv&state=KARNATAKA', 'gzip')
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    assert gzip.decompress(response.data) == plain.data
+
+
+@needs_brotli
+def test_cached_entries_keep_one_variant_per_encoding(cached_client):
+    plain = get(cached_client, LIST_PATH)
+    gzipped = get(cached_client, LIST_PATH, 'gzip')
+    compressed = get(cached_client, LIST_PATH, 'br')
+    assert (plain.headers['ETag'], gzipped.headers['ETag'], compressed.headers['ETag']) == tuple(
+        f'"{plain.get_etag()[0]}{suffix}"' for suffix in ('', '-gzip', '-br')
+    )
+    (entry,) = response_cache.entries.values()
+    assert set(entry.variants) == {'gzip', 'br'}
+    assert gzipped.data == entry.variants['gzip']
+
+    hits = response_cache.stats()['hits']
+    again = get(cached_client, LIST_PATH, 'gzip')
+    assert response_cache.stats()['hits'] == hits + 1
+    assert again.data == gzipped.data
+    assert again.headers['ETag'] == gzipped.headers['ETag']
+    assert 'Accept-Encoding' in again.headers['Vary']
+
+
+def test_encoded_etag_revalidates_to_304(cached_client):
+    gzipped = get(cached_client, LIST_PATH, 'gzip')
+    response = get(cached_client, LIST_PATH, 'gzip', **{'If-None-Match': gzipped.headers['ETag']})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == gzipped.headers['ETag']
+    assert 'Accept-Encoding' in response.headers['Vary']
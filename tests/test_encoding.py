@@ -0,0 +1,45 @@
+import json
+import orjson
+import pytest
+from datetime import datetime
+
+PATHS = [
+    '/api/banks',
+    '/api/banks/1/branches?limit=5',
+    '/api/branches?city=MUMBAI&limit=20',
+    '/api/branches/SBIN0000001',
+    '/api/ifsc/SBIN0000001/validate',
+    '/api/search?q=PUNE&limit=10',
+    '/api/stats',
+    '/api/stats/districts_by_state',
+    '/api/suggest?q=MUM',
+    '/api/geo/states',
+]
+
+
+@pytest.fixture
+def stdlib_client(make_client):
+    return make_client(JSON_ENCODER='stdlib')
+
+
+@pytest.mark.parametrize('path', PATHS)
+def test_orjson_responses_match_stdlib_bytes(app, client, stdlib_client, path):
+    assert app.json.supports_fragments
+    response = client.get(path)
+    assert response.status_code == 200
+    assert response.data == stdlib_client.get(path).data
+
+
+def test_dumps_maps_indent_and_sort_keys(app):
+    obj = {'b': 1, 'a': [1, {'d': None, 'c': True}]}
+    assert app.json.dumps(obj) == json.dumps(obj, sort_keys=True, separators=(',', ':'))
+    assert app.json.dumps(obj, indent=2) == json.dumps(obj, sort_keys=True, indent=2)
+    assert app.json.dumps(obj, sort_keys=False) == json.dumps(obj, separators=(',', ':'))
+
+
+def test_dumps_falls_back_to_stdlib_with_fragments(app):
+    obj = {'bank': orjson.Fragment(b'{"id":1,"name":"SBI"}'), 'at': datetime(2024, 1, 2)}
+    assert app.json.dumps(obj, indent=4) == json.dumps(
+        {'at': 'Tue, 02 Jan 2024 00:00:00 GMT', 'bank': {'id': 1, 'name': 'SBI'}}, indent=4
+    )
+    assert json.loads(app.json.dumps(obj, ensure_ascii=True))['bank'] == {'id': 1, 'name': 'SBI'}
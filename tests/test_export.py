@@ -0,0 +1,47 @@
+import csv
+import io
+import json
+from sqlalchemy import text
+from app import export
+
+
+def test_export_ndjson(client):
+    response = client.get('/api/export?city=MUMBAI&match=exact')
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(rows) == 200
+    assert {row['city'] for row in rows} == {'MUMBAI'}
+
+
+def test_invalid_match_is_a_400(client):
+    response = client.get('/api/export?city=MUMBAI&match=fuzzy')
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_query_errors_surface_before_streaming(client, monkeypatch):
+    def broken_filter(query, **filters):
+        return query.filter(text('no_such_column = 1'))
+
+    monkeypatch.setattr(export, 'filter_branches', broken_filter)
+    response = client.get('/api/export')
+    assert response.status_code == 500
+    assert response.get_json()['success'] is False
+
+
+def failing_rows():
+    yield (1, 'SBIN0000001', 'MAIN', '', 'MUMBAI', 'MUMBAI', 'MAHARASHTRA', 1, 'STATE BANK OF INDIA')
+    raise RuntimeError('connection lost')
+
+
+def test_errors_mid_stream_end_with_an_error_record():
+    lines = ''.join(export.stream_ndjson(failing_rows())).splitlines()
+    assert json.loads(lines[0])['ifsc'] == 'SBIN0000001'
+    assert json.loads(lines[-1]) == {'success': False, 'error': 'Export failed: connection lost'}
+
+
+def test_csv_errors_mid_stream_end_with_an_error_row():
+    rows = list(csv.reader(io.StringIO(''.join(export.stream_csv(failing_rows())))))
+    assert rows[0] == list(export.EXPORT_COLUMNS)
+    assert rows[1][1] == 'SBIN0000001'
+    assert rows[-1] == ['ERROR', 'Export failed: connection lost']
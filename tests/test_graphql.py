@@ -0,0 +1,95 @@
+import pytest
+from app.persisted_queries import query_cache, query_hash
+
+BANKS_QUERY = '{ banks(first: 2) { edges { node { name } } } }'
+NESTED_QUERY = '{ banks(first: 1) { edges { node { branches(first: 1) { edges { node { bank { name } } } } } } } }'
+
+
+def execute(client, **body):
+    return client.post('/gql', json=body)
+
+
+@pytest.fixture
+def persisted_client(client):
+    query_cache.clear()
+    yield client
+    query_cache.clear()
+
+
+def test_query(client):
+    response = execute(client, query=BANKS_QUERY)
+    assert response.status_code == 200
+    edges = response.get_json()['data']['banks']['edges']
+    assert [edge['node']['name'] for edge in edges] == ['STATE BANK OF INDIA', 'HDFC BANK']
+
+
+def test_depth_limit(make_client):
+    assert execute(make_client(), query=NESTED_QUERY).status_code == 200
+
+    response = execute(make_client(GRAPHQL_MAX_DEPTH=6), query=NESTED_QUERY)
+    assert response.status_code == 400
+    assert response.get_json()['errors'][0].startswith('Query depth 8 exceeds the maximum of 6')
+
+
+def test_cost_limit_counts_rows_of_unpaged_fields(make_client):
+    limited = make_client(GRAPHQL_MAX_COST=100)
+    # A whole page of GRAPHQL_LIST_LIMIT branches
+    response = execute(limited, query='{ branches { edges { node { ifsc } } } }')
+    assert response.status_code == 400
+    assert 'estimated 1000 rows' in response.get_json()['errors'][0]
+
+    # Paged: 10 branches, each with its bank
+    response = execute(limited, query='{ branches(first: 10) { edges { node { ifsc bank { name } } } } }')
+    assert response.status_code == 200
+    assert len(response.get_json()['data']['branches']['edges']) == 10
+
+
+def test_persisted_query_by_hash(persisted_client):
+    sha = query_hash(BANKS_QUERY)
+    extensions = {'persistedQuery': {'version': 1, 'sha256Hash': sha}}
+
+    unknown = execute(persisted_client, extensions=extensions)
+    assert unknown.status_code == 200
+    assert unknown.get_json()['errors'][0]['extensions']['code'] == 'PERSISTED_QUERY_NOT_FOUND'
+
+    registered = execute(persisted_client, query=BANKS_QUERY, extensions=extensions)
+    hits = query_cache.stats()['hits']
+    by_hash = execute(persisted_client, extensions=extensions)
+    assert by_hash.status_code == 200
+    assert by_hash.get_json() == registered.get_json()
+    assert query_cache.stats()['hits'] == hits + 1
+
+
+def test_persisted_query_hash_mismatch(persisted_client):
+    extensions = {'persistedQuery': {'version': 1, 'sha256Hash': query_hash('{ banks { edges { node { id } } } }')}}
+    response = execute(persisted_client, query=BANKS_QUERY, extensions=extensions)
+    assert response.status_code == 400
+    assert response.get_json() == {'errors': ['provided sha does not match query']}
+
+
+def test_only_parsed_queries_are_cached(persisted_client):
+    # Validation errors are cached with the document; syntax errors are not
+    hits = query_cache.stats()['hits']
+    for _ in range(2):
+        response = execute(persisted_client, query='{ banks { edges { node { missingField } } } }')
+        assert response.get_json()['data'] is None
+        assert response.get_json()['errors']
+        assert execute(persisted_client, query='{ banks ').get_json()['errors']
+    assert query_cache.stats()['entries'] == 1
+    assert query_cache.stats()['hits'] == hits + 1
+
+
+def test_connections_without_first_are_capped(make_client):
+    client = make_client(GRAPHQL_LIST_LIMIT=500)
+    query = '{ branches%s { edges { cursor node { ifsc } } pageInfo { hasNextPage endCursor } } }'
+    nodes = []
+    after = ''
+    while True:
+        arguments = f'(after: "{after}")' if after else ''
+        result = execute(client, query=query % arguments).get_json()['data']['branches']
+        assert len(result['edges']) <= 500
+        nodes += [edge['node']['ifsc'] for edge in result['edges']]
+        if not result['pageInfo']['hasNextPage']:
+            break
+        after = result['pageInfo']['endCursor']
+    assert len(nodes) == len(set(nodes)) == 1200
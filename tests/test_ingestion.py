@@ -0,0 +1,48 @@
+import io
+import pytest
+from app import database
+from app.database import iter_branch_rows, open_csv_source, reload_dataset
+from app.models import db, Bank, Branch
+
+HEADER = 'ifsc,bank_id,branch,address,city,district,state,bank_name\n'
+
+
+def test_rows_are_stripped_and_normalized():
+    lines = io.StringIO(HEADER + ' SBIN0000001 ,1, Main ,, Navi Mumbai ,,  maharashtra ,STATE BANK OF INDIA \n')
+    (row,) = iter_branch_rows(lines)
+    assert row == {
+        'ifsc': 'SBIN0000001',
+        'branch': 'Main',
+        'address': '',
+        'city': 'Navi Mumbai',
+        'district': '',
+        'state': 'maharashtra',
+        'city_norm': 'NAVI MUMBAI',
+        'district_norm': '',
+        'state_norm': 'MAHARASHTRA',
+        'bank_name': 'STATE BANK OF INDIA'
+    }
+
+
+@pytest.mark.parametrize('kind', ['path', 'bytes', 'text'])
+def test_sources_are_read_as_text(config_class, kind):
+    path = config_class.DATA_SOURCE
+    with open(path, 'rb') as f:
+        data = f.read()
+    source = {'path': path, 'bytes': io.BytesIO(data), 'text': io.StringIO(data.decode(), newline='')}[kind]
+    with open_csv_source(source) as lines:
+        assert sum(1 for _ in iter_branch_rows(lines)) == 1200
+
+
+def test_full_reload_inserts_in_batches(app, config_class, statements, monkeypatch):
+    monkeypatch.setattr(database, 'BATCH_SIZE', 500)
+    with app.app_context():
+        bank_ids = dict(db.session.query(Bank.name, Bank.id).all())
+        with open(config_class.DATA_SOURCE, 'rb') as f:
+            assert reload_dataset(f)
+        inserts = [statement for statement in statements if statement.startswith('INSERT INTO branches_new')]
+        # 500 + 500 + 200 rows, each batch one executemany
+        assert len(inserts) == 3
+        assert Branch.query.count() == 1200
+        assert dict(db.session.query(Bank.name, Bank.id).all()) == bank_ids
+        assert database.reload_status['branches'] == 1200
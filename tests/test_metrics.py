@@ -0,0 +1,39 @@
+import logging
+import pytest
+from flask import g
+from sqlalchemy.exc import OperationalError
+from app.metrics import explain_worker
+from app.models import db
+
+
+@pytest.fixture
+def slow_client(make_client):
+    # Every request counts as slow
+    return make_client(SLOW_REQUEST_THRESHOLD_MS=0)
+
+
+def test_slow_request_defers_query_plans(slow_client, caplog):
+    with caplog.at_level(logging.WARNING, logger='app.metrics'):
+        response = slow_client.get('/api/branches?city=MUMBAI&match=exact')
+        assert response.status_code == 200
+        assert any(message.startswith('Slow request GET /api/branches') for message in caplog.messages)
+        explain_worker.queue.join()
+    plans = [message for message in caplog.messages if message.startswith('Query plan for GET /api/branches')]
+    assert plans
+    assert any('USING INDEX' in message for message in plans)
+
+
+def test_statements_are_not_recorded_without_a_threshold(app, client):
+    assert app.config['SLOW_REQUEST_THRESHOLD_MS'] is None
+    with app.test_request_context():
+        app.preprocess_request()
+        assert g.metrics_sql_log is None
+
+
+def test_failed_statements_leave_no_timing_state(app):
+    with app.app_context(), db.engine.connect() as connection:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                connection.exec_driver_sql('SELECT * FROM missing_table')
+        connection.exec_driver_sql('SELECT 1')
+        assert 'metrics_query_start' not in connection.info
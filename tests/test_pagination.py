@@ -0,0 +1,37 @@
+import base64
+import json
+import pytest
+from app.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+
+def forged(values):
+    raw = json.dumps(values).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def test_decode_cursor_round_trip():
+    assert decode_cursor(encode_cursor(12.5, 7), (int, float), int) == [12.5, 7]
+
+
+@pytest.mark.parametrize('values', [[{'a': 1}], ['1'], [True], [1, 2], [], {'id': 1}])
+def test_decode_cursor_rejects_wrong_shape(values):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(forged(values), int)
+
+
+@pytest.mark.parametrize('path', [
+    '/api/branches?after={}',
+    '/api/banks/1/branches?after={}',
+    '/api/search?q=mumbai&after={}',
+])
+@pytest.mark.parametrize('values', [[{'a': 1}], [[1]], ['x', 1], [1.5, 'x']])
+def test_forged_cursor_is_rejected(client, path, values):
+    response = client.get(path.format(forged(values)))
+    assert response.status_code == 400
+    assert response.get_json() == {'success': False, 'error': 'Invalid cursor'}
+
+
+def test_cursor_pages_follow_on(client):
+    first = client.get('/api/branches?after=&per_page=5').get_json()
+    second = client.get(f"/api/branches?after={first['pagination']['next_cursor']}&per_page=5").get_json()
+    assert first['data'][-1]['id'] < second['data'][0]['id']
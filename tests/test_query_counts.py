@@ -0,0 +1,27 @@
+import pytest
+
+PER_PAGE = (1, 10, 100)
+
+
+@pytest.mark.parametrize('path', [
+    '/api/branches',
+    '/api/branches?after=',
+    '/api/search?q=mumbai',
+    '/api/search?q=mumbai&after=',
+    '/api/banks/1/branches',
+    '/api/banks/1/branches?after=',
+])
+def test_statement_count_does_not_grow_with_page_size(client, statements, path):
+    separator = '&' if '?' in path else '?'
+    counts = []
+    for per_page in PER_PAGE:
+        url = f'{path}{separator}per_page={per_page}'
+        client.get(url)
+        statements.clear()
+        response = client.get(url)
+        assert response.status_code == 200
+        body = response.get_json()
+        assert len(body.get('data', body.get('branches'))) == per_page
+        counts.append(len(statements))
+    assert counts[0] > 0
+    assert counts == [counts[0]] * len(PER_PAGE), dict(zip(PER_PAGE, counts))
@@ -0,0 +1,35 @@
+import pytest
+from app.filters import bank_filter, filter_branches
+from app.models import db, Bank, Branch
+from app.query_plans import FILTER_COMBINATIONS, SAMPLE_FILTERS, query_plan, table_scans
+
+
+@pytest.fixture
+def context(app):
+    with app.app_context():
+        yield
+        db.session.remove()
+
+
+@pytest.mark.parametrize(
+    'match,names', FILTER_COMBINATIONS,
+    ids=[f"{match}:{','.join(names)}" for match, names in FILTER_COMBINATIONS]
+)
+def test_filters_use_an_index(context, match, names):
+    filters = {name: SAMPLE_FILTERS[name] for name in names}
+    plan = query_plan(filter_branches(Branch.query, match=match, **filters))
+    assert not table_scans(plan), plan
+
+
+@pytest.mark.parametrize('name,build', [
+    ('branch_by_ifsc', lambda: Branch.query.filter(Branch.ifsc == 'SBIN0000001')),
+    ('branches_by_id', lambda: Branch.query.filter(Branch.id.in_([1, 2, 3]))),
+    ('branches_after_cursor', lambda: Branch.query.filter(Branch.id > 100).order_by(Branch.id).limit(11)),
+    ('bank_branches', lambda: Branch.query.filter(bank_filter([1])).order_by(Branch.id).limit(11)),
+    ('bank_branches_by_id', lambda: Branch.query.filter(Branch.bank_id.in_([1, 2])).limit(11)),
+    ('bank_by_id', lambda: Bank.query.filter(Bank.id == 1)),
+    ('banks_after_cursor', lambda: Bank.query.filter(Bank.id > 1).order_by(Bank.id).limit(11)),
+])
+def test_hot_queries_use_an_index(context, name, build):
+    plan = query_plan(build())
+    assert not table_scans(plan), plan
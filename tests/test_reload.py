@@ -0,0 +1,76 @@
+import csv
+from sqlalchemy import text
+from app.database import reload_dataset, reload_lock, reload_status
+from app.models import db, Branch
+
+
+def test_reload_status_starts_fresh_for_each_run(app, config_class, tmp_path):
+    with app.app_context():
+        assert reload_dataset(config_class.DATA_SOURCE, incremental=True)
+        assert reload_status['mode'] == 'sync'
+        assert 'sync_seconds' in reload_status
+
+        assert reload_dataset(config_class.DATA_SOURCE)
+        assert reload_status['mode'] == 'full'
+        assert reload_status['state'] == 'succeeded'
+        assert not {'inserted', 'updated', 'deleted', 'sync_seconds'} & set(reload_status)
+
+        assert not reload_dataset(str(tmp_path / 'missing.csv'))
+        assert reload_status['state'] == 'failed'
+        assert reload_status['error']
+        assert not {'banks', 'branches', 'version', 'load_seconds'} & set(reload_status)
+
+
+def table_names():
+    return {name for (name,) in db.session.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'"))}
+
+
+def test_reload_swaps_in_the_new_dataset(app, client, config_class, tmp_path):
+    with open(config_class.DATA_SOURCE, newline='') as f:
+        rows = list(csv.DictReader(f))
+    rows[0]['branch'] = 'SHADOWSWAP'
+    modified = tmp_path / 'modified.csv'
+    with open(modified, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+
+    try:
+        with app.app_context():
+            assert reload_dataset(str(modified))
+            assert not any(name.endswith(('_new', '_old')) for name in table_names())
+        assert client.get(f"/api/branches/{rows[0]['ifsc']}").get_json()['data']['branch'] == 'SHADOWSWAP'
+        # The search index was rebuilt in the shadow tables and swapped with them
+        assert client.get('/api/search?q=shadowswap').get_json()['pagination']['total'] == 1
+    finally:
+        with app.app_context():
+            assert reload_dataset(config_class.DATA_SOURCE)
+    assert client.get('/api/search?q=shadowswap').get_json()['pagination']['total'] == 0
+
+
+def test_failed_reload_keeps_the_live_dataset(app, client, tmp_path):
+    broken = tmp_path / 'broken.csv'
+    broken.write_text('ifsc,branch\nSBIN0000001,MAIN\n')
+    before = client.get('/api/branches/SBIN0000001').get_json()
+    with app.app_context():
+        assert not reload_dataset(str(broken))
+        assert Branch.query.count() == 1200
+    assert client.get('/api/branches/SBIN0000001').get_json() == before
+    assert client.get('/api/search?q=mysore').get_json()['pagination']['total'] == 200
+
+
+def test_admin_reload_endpoint(make_client):
+    client = make_client(ADMIN_TOKEN='secret')
+    assert client.get('/api/admin/reload').status_code == 403
+    assert client.get('/api/admin/reload', headers={'X-Admin-Token': 'wrong'}).status_code == 403
+
+    headers = {'X-Admin-Token': 'secret'}
+    response = client.get('/api/admin/reload', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['data'] == reload_status
+
+    # Only one reload at a time
+    with reload_lock:
+        response = client.post('/api/admin/reload', headers=headers)
+    assert response.status_code == 409
+    assert response.get_json()['error'] == 'A reload is already running'
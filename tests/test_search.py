@@ -0,0 +1,62 @@
+import pytest
+
+
+def search(client, query, **params):
+    response = client.get('/api/search', query_string={'q': query, **params})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+@pytest.fixture
+def ilike_client(make_client):
+    return make_client(SEARCH_BACKEND='ilike')
+
+
+def test_search_term_is_required(client):
+    response = client.get('/api/search?q=%20')
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Search term (q) is required'
+
+
+@pytest.mark.parametrize('query,total', [
+    ('mysore', 200),
+    ('bangal', 200),
+    ('axis mysore', 50),
+    ('hdfc new delhi', 50),
+    ('nowhere', 0),
+])
+def test_search_matches_every_token_as_a_prefix(client, query, total):
+    assert search(client, query)['pagination']['total'] == total
+
+
+def test_search_agrees_with_the_ilike_backend_on_single_words(client, ilike_client):
+    for query in ('mysore', 'chennai', 'axis'):
+        assert search(client, query)['pagination']['total'] == search(ilike_client, query)['pagination']['total']
+
+
+def test_exact_ifsc_ranks_first(client):
+    result = search(client, 'SBIN0000007')
+    assert result['data'][0]['ifsc'] == 'SBIN0000007'
+    assert result['data'][0]['bank']['name'] == 'STATE BANK OF INDIA'
+
+
+def test_query_syntax_is_not_interpreted(client):
+    assert search(client, 'mysore OR "pune')['pagination']['total'] == 0
+    assert search(client, 'mysore)')['pagination']['total'] == 200
+    assert search(client, '***')['pagination']['total'] == 0
+
+
+def test_offset_and_cursor_pages_agree(client):
+    offset = [
+        branch['ifsc']
+        for page in (1, 2, 3, 4)
+        for branch in search(client, 'mysore', page=page, per_page=60)['data']
+    ]
+    cursor = []
+    after = ''
+    while after is not None:
+        result = search(client, 'mysore', per_page=60, after=after)
+        cursor += [branch['ifsc'] for branch in result['data']]
+        after = result['pagination']['next_cursor']
+    assert len(offset) == 200
+    assert offset == cursor
@@ -0,0 +1,28 @@
+from app.stats import get_stats_snapshot
+
+
+def test_stats_breakdowns_match_the_geo_hierarchy(app):
+    with app.app_context():
+        snapshot = get_stats_snapshot()
+    geo = snapshot.geo
+    assert snapshot.total_branches == sum(state['branch_count'] for state in geo.states) == 1200
+    assert {row['state']: row['branch_count'] for row in snapshot.breakdowns['states']} == {
+        state['state']: state['branch_count'] for state in geo.states
+    }
+    for state in geo.states:
+        districts = snapshot.districts_for_state(state['state'])
+        geo_districts = geo.districts_for_state(state['state'])
+        assert {row['district']: row['branch_count'] for row in districts} == {
+            row['district']: row['branch_count'] for row in geo_districts
+        }
+
+
+def test_stats_endpoints(client):
+    summary = client.get('/api/stats').get_json()['data']
+    assert summary['total_branches'] == 1200
+    # Ties are broken by name
+    assert summary['top_states_by_branches'][0] == {'state': 'KARNATAKA', 'branch_count': 400}
+    cities = client.get('/api/geo/districts/MUMBAI/cities').get_json()['data']
+    assert cities == [
+        {'city': 'MUMBAI', 'district': 'MUMBAI', 'state': 'MAHARASHTRA', 'branch_count': 200, 'bank_count': 4}
+    ]
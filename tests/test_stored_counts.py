@@ -0,0 +1,48 @@
+import pytest
+from sqlalchemy import text
+from app.bank_codes import bank_code_count_rows
+from app.database import build_indexes
+from app.models import db
+from app.stats import location_count_rows
+from app.stored_counts import STORED_COUNTS, VERSIONS_TABLE, drop_stored_counts, load_stored_counts, store_counts
+from app.suggest import branch_name_count_rows
+
+COUNT_ROWS = {
+    'stats_counts': location_count_rows,
+    'branch_name_counts': branch_name_count_rows,
+    'bank_code_counts': bank_code_count_rows,
+}
+
+
+@pytest.fixture
+def stored(app):
+    with app.app_context():
+        for name, rows in COUNT_ROWS.items():
+            store_counts(name, rows())
+        yield
+        drop_stored_counts()
+
+
+def test_stored_counts_build_the_same_indexes(app, stored, statements):
+    with app.app_context():
+        from_stored = build_indexes()
+        # Only the per-bank branch counts are still grouped
+        grouped_statements = [statement for statement in statements if 'GROUP BY' in statement]
+        assert [statement.split('GROUP BY')[1].split() for statement in grouped_statements] == [['branches.bank_id']]
+        drop_stored_counts()
+        grouped = build_indexes()
+
+    assert from_stored.stats.breakdowns == grouped.stats.breakdowns
+    assert from_stored.stats.districts_by_state == grouped.stats.districts_by_state
+    assert from_stored.stats.geo.states == grouped.stats.geo.states
+    assert from_stored.bank_codes.codes == grouped.bank_codes.codes
+    for field, index in grouped.suggest.items():
+        assert from_stored.suggest[field].complete('m', 50) == index.complete('m', 50)
+
+
+def test_counts_stored_for_another_version_are_ignored(app, stored):
+    with app.app_context():
+        assert sorted(load_stored_counts('stats_counts')) == sorted(map(tuple, location_count_rows()))
+        db.session.execute(text(f"UPDATE {VERSIONS_TABLE} SET version = 'stale'"))
+        db.session.commit()
+        assert all(load_stored_counts(name) is None for name in STORED_COUNTS)
@@ -0,0 +1,59 @@
+import pytest
+from app.suggest import MAX_SUGGESTIONS, PrefixIndex
+
+
+def suggest(client, **params):
+    response = client.get('/api/suggest', query_string=params)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+@pytest.mark.parametrize('params,error', [
+    ({}, 'Prefix (q) is required'),
+    ({'q': 'mu', 'field': 'ifsc'}, 'field must be one of: bank, city, district, state, branch'),
+])
+def test_invalid_requests(client, params, error):
+    response = client.get('/api/suggest', query_string=params)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == error
+
+
+def test_suggests_every_field_by_default(client):
+    data = suggest(client, q='m')['data']
+    assert data['city'] == [{'value': 'MUMBAI', 'count': 200}, {'value': 'MYSORE', 'count': 200}]
+    assert data['state'] == [{'value': 'MAHARASHTRA', 'count': 400}]
+    assert data['bank'] == []
+    assert len(data['branch']) == 10
+
+
+def test_matches_any_word_ignoring_case_and_spacing(client):
+    assert suggest(client, q='  new   DEL', field='city')['data'] == [{'value': 'NEW DELHI', 'count': 200}]
+    assert suggest(client, q='delhi', field='city')['data'] == [{'value': 'NEW DELHI', 'count': 200}]
+    assert suggest(client, q='bank', field='bank')['data'] == [
+        {'value': 'AXIS BANK', 'count': 300},
+        {'value': 'HDFC BANK', 'count': 300},
+        {'value': 'ICICI BANK LIMITED', 'count': 300},
+        {'value': 'STATE BANK OF INDIA', 'count': 300},
+    ]
+
+
+def test_limit_is_clamped(client):
+    result = suggest(client, q='branch', field='branch', limit=500)
+    assert result['limit'] == MAX_SUGGESTIONS
+    assert len(result['data']) == MAX_SUGGESTIONS
+    assert suggest(client, q='branch', field='branch', limit=0)['limit'] == 1
+
+
+def test_precomputed_prefixes_rank_like_a_scan():
+    # Enough values that short prefixes are ranked when the index is built
+    counts = {f'CITY {i:04d}': i % 7 for i in range(1000)}
+    index = PrefixIndex(counts)
+    assert {'C', 'CITY 0', '0'} <= set(index.top)
+
+    for prefix in ('c', 'CITY 0', 'city 01', '0', '099'):
+        words = prefix.upper()
+        expected = sorted(
+            (value for value in counts if value.startswith(words) or value.split()[1].startswith(words)),
+            key=lambda value: (-counts[value], value)
+        )[:20]
+        assert [c['value'] for c in index.complete(prefix, 20)] == expected
@@ -0,0 +1,38 @@
+import pytest
+from sqlalchemy import create_engine, text
+from app.config import ProductionConfig
+from app.models import db
+from app.version import compute_dataset_hash
+
+
+def test_dataset_hash_changes_when_ids_are_renumbered(app):
+    with app.app_context():
+        before = compute_dataset_hash()
+        try:
+            db.session.execute(text("UPDATE branches SET id = 999999 WHERE id = 1"))
+            assert compute_dataset_hash() != before
+        finally:
+            db.session.rollback()
+        assert compute_dataset_hash() == before
+
+
+def create_tables(path, tables):
+    engine = create_engine(f'sqlite:///{path}')
+    db.metadata.create_all(engine, tables=[db.metadata.tables[name] for name in tables])
+    engine.dispose()
+
+
+@pytest.mark.parametrize('tables,error', [
+    (None, 'Cannot open the dataset database'),
+    (['banks'], 'The database is missing tables branches, dataset_versions'),
+    (['banks', 'branches', 'dataset_versions'], 'The database has no recorded dataset version'),
+])
+def test_read_only_startup_requires_a_prepared_database(make_client, tmp_path, tables, error):
+    path = tmp_path / 'unprepared.db'
+    if tables:
+        create_tables(path, tables)
+    with pytest.raises(RuntimeError, match=error):
+        make_client(
+            SQLALCHEMY_DATABASE_URI=f'sqlite:///file:{path}?mode=ro&uri=true',
+            SQLITE_PRAGMAS=ProductionConfig.SQLITE_PRAGMAS
+        )
@@ -0,0 +1,4 @@
+from app import create_app
+from app.config import ProductionConfig
+
+app = create_app(ProductionConfig)